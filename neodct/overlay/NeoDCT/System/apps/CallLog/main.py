@@ -1,15 +1,205 @@
-from System.ui.framework import SoftKeyBar, MessageDialog
+import time
+from System.core.DataService import CALL_DIALED, CALL_MISSED, CALL_RECEIVED, PAGE_SIZE, get_data
+from System.core.PhoneNumbers import get_resolver
+from System.ui.Dialer import call_screen
+from System.ui.framework import (
+    HeaderWidget,
+    MessageDialog,
+    PagedList,
+    SoftKeyBar,
+    VerticalList,
+    WindowedList,
+)
 
-def run(ui):
-    # Clear screen
-    ui.draw.rectangle((0, 0, 240, 210), fill="black")
-    warningmsg = MessageDialog(ui, "This application has not been implemented yet.")
+ROOT_ID_CALL_LOG = 3  # matches "3-1" style header
+
+CALL_LISTS = (
+    # (menu item, call type)
+    ("Missed calls", CALL_MISSED),
+    ("Received calls", CALL_RECEIVED),
+    ("Dialed numbers", CALL_DIALED),
+)
+TYPE_LABELS = {CALL_MISSED: "Missed", CALL_RECEIVED: "Received", CALL_DIALED: "Dialed"}  # also the list titles
+
+def _format_timestamp(ts):
+    if not ts:
+        return "Unknown time"
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+
+def _format_duration(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+
+def _draw_screen(ui, title, header_root, sub_index, lines):
+    ui.draw.rectangle((0, 0, 240, 240), fill="black")
+    ui.draw.text((5, 5), title, font=ui.font_xl, fill="white")
+    ui.draw.line((0, 35, 240, 35), fill="white")
+    HeaderWidget(ui, header_root).draw(sub_index)
+
+    y = 45
+    for text, font, fill in lines:
+        if y > 200:
+            break
+        ui.draw.text((10, y), text, font=font, fill=fill)
+        y += 24
+
+def _show_empty_state(ui, title, header_root, message):
+    w, _ = ui.get_text_size(message, ui.font_n)
+    _draw_screen(ui, title, header_root, None, [])
+    ui.draw.text(((240 - w) // 2, 110), message, font=ui.font_n, fill="white")
+    SoftKeyBar(ui).update("Back", present=False)
     ui.fb.update(ui.canvas)
 
     while True:
-        warningmsg.show()
-        # Wait for a key
         key = ui.wait_for_key()
-        # BACK / MENU / ENTER exits app
-        if key in (46, 28, 50):
+        if key == 14:
+            return
+
+def _call(ui, number, name=None):
+    ui.modem.dial(number)
+    call_screen.show_calling(ui, number, name)
+
+def _show_call_detail(ui, call, header_root, sub_index):
+    """ One call; Options: call back, the number's history, erase. Returns "deleted" or None. """
+    name = get_resolver(ui).display_name(call.number) if call.number else "Unknown"
+    lines = [(name, ui.font_n, "white")]
+    if call.number and name != call.number:
+        lines.append((call.number, ui.font_s, "gray"))
+    lines.append((f"{TYPE_LABELS.get(call.type, call.type)} call", ui.font_s, "gray"))
+    lines.append((_format_timestamp(call.timestamp), ui.font_s, "gray"))
+    if call.type != CALL_MISSED:
+        lines.append((f"Duration {_format_duration(call.duration)}", ui.font_s, "gray"))
+    if call.number:
+        stats = get_data(ui).number_call_stats(call.number)
+        total = sum(s.count for s in stats.values())
+        missed = stats[CALL_MISSED].count if CALL_MISSED in stats else 0
+        lines.append((f"{total} calls logged, {missed} missed", ui.font_s, "gray"))
+
+    softkey = SoftKeyBar(ui)
+    while True:
+        _draw_screen(ui, TYPE_LABELS.get(call.type, "Call"), header_root, sub_index, lines)
+        softkey.update("Options", present=False)
+        ui.fb.update(ui.canvas)
+
+        key = ui.wait_for_key()
+        if key == 14:
+            return None
+        if key not in (28, 96):
+            continue
+        items = ["Call", "Call history", "Erase"] if call.number else ["Erase"]
+        selection = VerticalList(ui, "Options", items, app_id=header_root).show()
+        if selection < 0:
+            continue
+        choice = items[selection]
+        if choice == "Call":
+            _call(ui, call.number, None if name == call.number else name)
+        elif choice == "Call history":
+            _show_number_history(ui, call.number, f"{header_root}-{sub_index}")
+        elif choice == "Erase":
+            get_data(ui).delete_call(call.id)
+            MessageDialog(ui, "Erased!").show()
+            return "deleted"
+
+def _show_calls(ui, title, header_root, fetch_page, label):
+    """ A call list read a page at a time; Enter opens a call. """
+    v_list = WindowedList(ui, title, fetch_page, label, PAGE_SIZE, app_id=header_root)
+    softkey = SoftKeyBar(ui)
+
+    while True:
+        if not v_list.rows:
+            _show_empty_state(ui, title, header_root, "No numbers")
+            return
+
+        softkey.update("Open", present=False)
+        selection_index = v_list.show()
+        if selection_index == -1:
+            return
+        result = _show_call_detail(ui, v_list.rows[selection_index], header_root, selection_index + 1)
+        if result == "deleted":
+            v_list.remove(selection_index)
+
+def _show_call_list(ui, call_type, root_id, sub_index):
+    data = get_data(ui)
+    resolver = get_resolver(ui)
+
+    def label(call):
+        name = resolver.display_name(call.number) if call.number else "Unknown"
+        return f"* {name}" if call.is_new else name
+
+    fetch_page = lambda after, limit: data.calls_page(call_type, after, limit)
+    if call_type == CALL_MISSED and data.summary()["missed_calls"]:
+        # The first page keeps its "*" marks; the badge clears once the list has been seen.
+        first_page = fetch_page(None, PAGE_SIZE)
+        data.mark_missed_calls_seen()
+        fetch_page = lambda after, limit: first_page if after is None else data.calls_page(call_type, after, limit)
+    _show_calls(ui, TYPE_LABELS[call_type], f"{root_id}-{sub_index}", fetch_page, label)
+
+def _show_number_history(ui, number, header_root):
+    """ Every logged call with one number, newest first. """
+    data = get_data(ui)
+
+    def label(call):
+        return f"{TYPE_LABELS.get(call.type, call.type)} {time.strftime('%m-%d', time.localtime(call.timestamp))}"
+
+    _show_calls(ui, "History", header_root, lambda after, limit: data.number_calls_page(number, after, limit), label)
+
+def _show_erase(ui, root_id, sub_index):
+    header_root = f"{root_id}-{sub_index}"
+    items = ["All", "Missed", "Received", "Dialed"]
+    selection = VerticalList(ui, "Erase", items, app_id=header_root).show()
+    if selection < 0:
+        return
+    get_data(ui).clear_calls(None if selection == 0 else CALL_LISTS[selection - 1][1])
+    MessageDialog(ui, "Call lists erased" if selection == 0 else f"{items[selection]} calls erased").show()
+
+def _show_call_duration(ui, root_id, sub_index):
+    header_root = f"{root_id}-{sub_index}"
+    data = get_data(ui)
+    softkey = SoftKeyBar(ui)
+
+    while True:
+        timers = data.call_timers()
+        lines = [
+            ("Dialed calls", ui.font_s, "gray"),
+            (_format_duration(timers[CALL_DIALED]), ui.font_n, "white"),
+            ("Received calls", ui.font_s, "gray"),
+            (_format_duration(timers[CALL_RECEIVED]), ui.font_n, "white"),
+            ("All calls", ui.font_s, "gray"),
+            (_format_duration(timers[CALL_DIALED] + timers[CALL_RECEIVED]), ui.font_n, "white"),
+        ]
+        _draw_screen(ui, "Duration", header_root, None, lines)
+        softkey.update("Clear", present=False)
+        ui.fb.update(ui.canvas)
+
+        key = ui.wait_for_key()
+        if key == 14:
             return
+        if key in (28, 96):
+            data.reset_call_timers()
+            MessageDialog(ui, "Timers cleared").show()
+
+def run(ui):
+    menu = PagedList(
+        ui=ui,
+        title="Call Log",
+        items=[title for title, _ in CALL_LISTS] + [
+            "Erase recent call lists",
+            "Call duration",
+        ],
+        root_id=ROOT_ID_CALL_LOG,
+        show_select_hint=True,
+    )
+
+    while True:
+        missed = get_data(ui).summary()["missed_calls"]
+        menu.items[0] = f"Missed calls ({missed})" if missed else "Missed calls"
+        sel = menu.show()
+        if sel < 0:
+            return
+
+        if sel < len(CALL_LISTS):
+            _show_call_list(ui, CALL_LISTS[sel][1], ROOT_ID_CALL_LOG, sel + 1)
+        elif sel == 3:
+            _show_erase(ui, ROOT_ID_CALL_LOG, 4)
+        elif sel == 4:
+            _show_call_duration(ui, ROOT_ID_CALL_LOG, 5)
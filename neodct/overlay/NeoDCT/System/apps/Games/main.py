@@ -1,9 +1,6 @@
-import os
 import random
-import select
-import struct
-import time
 
+from System.core.Clock import get_clock
 from System.ui.framework import SoftKeyBar
 
 # Input codes (Linux input layer)
@@ -28,13 +25,11 @@ CELL = 12
 BOARD_TOP = 32  # Moved down slightly to give header room
 BOARD_HEIGHT = GRID_H * CELL 
 
-KEYPAD_PATH = "/dev/input/event0"
-
 class SnakeGame:
     def __init__(self, ui):
         self.ui = ui
+        self.clock = get_clock(ui)
         self.softkey = SoftKeyBar(ui)
-        self.keypad_fd = None
         self.reset()
 
     def reset(self):
@@ -43,45 +38,14 @@ class SnakeGame:
         self.direction = (0, -1)
         self.next_direction = self.direction
         self.score = 0
-        random.seed(time.time())
+        random.seed(self.clock.time())
         self.spawn_food()
         self.render()
 
-    def ensure_keypad(self):
-        if self.keypad_fd is not None: return self.keypad_fd
-        if hasattr(self.ui, "keypad_fd"):
-            self.keypad_fd = self.ui.keypad_fd
-            return self.keypad_fd
-        try:
-            self.keypad_fd = os.open(KEYPAD_PATH, os.O_RDONLY | os.O_NONBLOCK)
-        except Exception:
-            self.keypad_fd = None
-        return self.keypad_fd
-
     def poll_key(self, timeout):
-        fd = self.ensure_keypad()
-        if fd is None:
-            time.sleep(timeout)
-            return None
-
-        r, _, _ = select.select([fd], [], [], timeout)
-        if not r: return None
-
-        try:
-            data = os.read(fd, 24)
-            # Handle both 32-bit (16 byte) and 64-bit (24 byte) input events
-            if len(data) == 24:
-                _, _, etype, code, val = struct.unpack("llHHI", data)
-            elif len(data) == 16:
-                _, _, etype, code, val = struct.unpack("IIHHI", data)
-            else:
-                return None
-        except Exception:
-            return None
-
-        if etype == 1 and val == 1: # EV_KEY, Key Press
-            return code
-        return None
+        # Through the UI's runtime (in-process and isolated apps alike), never the keypad fd:
+        # the runtime owns it, and its waits go through the clock.
+        return self.ui.read_keypress(timeout)
 
     def direction_from_key(self, key):
         if key in (KEY_UP, KEY_NUM_2): return (0, -1)
@@ -194,9 +158,9 @@ class SnakeGame:
 
     def loop(self):
         # Similar loop to before
-        next_move = time.time() + self.tick_delay()
+        next_move = self.clock.time() + self.tick_delay()
         while True:
-            now = time.time()
+            now = self.clock.time()
             timeout = max(0, next_move - now)
             key = self.poll_key(timeout)
             
@@ -208,11 +172,11 @@ class SnakeGame:
                     if (new_dir[0] + self.direction[0], new_dir[1] + self.direction[1]) != (0, 0):
                         self.next_direction = new_dir
             
-            if time.time() >= next_move:
+            if self.clock.time() >= next_move:
                 if not self.step():
                     return "dead"
                 self.render()
-                next_move = time.time() + self.tick_delay()
+                next_move = self.clock.time() + self.tick_delay()
 
 def run(ui):
     game = SnakeGame(ui)
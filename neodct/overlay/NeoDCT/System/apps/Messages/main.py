@@ -1,19 +1,21 @@
-import os
-import sqlite3
+import re
 import time
+from System.core.Clock import get_clock
+from System.core.DataService import OUTGOING, PAGE_SIZE, get_data, search_terms
+from System.core.PhoneNumbers import get_resolver
 from System.ui.framework import (
     MessageDialog,
     PagedList,
     HeaderWidget,
+    SearchInput,
     SoftKeyBar,
+    TextInput,
     TextInputLong,
     VerticalList,
+    WindowedList,
 )
 
 ROOT_ID_MESSAGES = 2  # matches "2-1" style header
-DB_DIR = "/NeoDCT/User/db"
-INBOX_DB = f"{DB_DIR}/sms_inbox.db"
-OUTBOX_DB = f"{DB_DIR}/sms_outbox.db"
 
 def _show_stub_screen(ui, title, root_id, sub_index):
     ui.draw.rectangle((0, 0, 240, 240), fill="black")
@@ -71,57 +73,14 @@ def _format_timestamp(ts):
         return "Unknown time"
     return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
 
-def _fetch_inbox_messages():
-    if not os.path.exists(INBOX_DB):
-        return []
-    conn = sqlite3.connect(INBOX_DB)
-    c = conn.cursor()
-    c.execute("SELECT id, message, sender, timestamp, is_read FROM inbox ORDER BY timestamp DESC")
-    data = c.fetchall()
-    conn.close()
-    return data
-
-def _fetch_outbox_messages():
-    if not os.path.exists(OUTBOX_DB):
-        return []
-    conn = sqlite3.connect(OUTBOX_DB)
-    c = conn.cursor()
-    c.execute("SELECT id, message, timestamp FROM outbox ORDER BY timestamp DESC")
-    data = c.fetchall()
-    conn.close()
-    return data
-
-def _delete_inbox_message(message_id):
-    if not os.path.exists(INBOX_DB):
-        return
-    conn = sqlite3.connect(INBOX_DB)
-    c = conn.cursor()
-    c.execute("DELETE FROM inbox WHERE id = ?", (message_id,))
-    conn.commit()
-    conn.close()
-
-def _delete_outbox_message(message_id):
-    if not os.path.exists(OUTBOX_DB):
-        return
-    conn = sqlite3.connect(OUTBOX_DB)
-    c = conn.cursor()
-    c.execute("DELETE FROM outbox WHERE id = ?", (message_id,))
-    conn.commit()
-    conn.close()
-
-def _save_outbox_message(text):
-    os.makedirs(DB_DIR, exist_ok=True)
-    conn = sqlite3.connect(OUTBOX_DB)
-    c = conn.cursor()
-    c.execute(
-        """CREATE TABLE IF NOT EXISTS outbox
-           (id INTEGER PRIMARY KEY AUTOINCREMENT,
-            message TEXT,
-            timestamp INTEGER)"""
-    )
-    c.execute("INSERT INTO outbox (message, timestamp) VALUES (?, ?)", (text, int(time.time())))
-    conn.commit()
-    conn.close()
+def _delete_inbox_message(ui, message_id):
+    get_data(ui).delete_inbox_message(message_id)
+
+def _delete_outbox_message(ui, message_id):
+    get_data(ui).delete_outbox_message(message_id)
+
+def _save_outbox_message(ui, text, recipient=None):
+    get_data(ui).save_outbox_message(text, int(get_clock(ui).time()), recipient)
 
 def _show_empty_state(ui, title, root_id, sub_index, message):
     ui.draw.rectangle((0, 0, 240, 240), fill="black")
@@ -139,14 +98,36 @@ def _show_empty_state(ui, title, root_id, sub_index, message):
         if key == 14:
             return
 
-def _show_message_detail(ui, title, root_id, sub_index, message, message_id=None, sender=None, timestamp=None):
+def _match_spans(line, terms):
+    """ (start, end) of each word prefix in line matching a search term. """
+    spans = []
+    for word in re.finditer(r"\w+", line):
+        lowered = word.group().lower()
+        longest = max((len(t) for t in terms if lowered.startswith(t)), default=0)
+        if longest:
+            spans.append((word.start(), word.start() + longest))
+    return spans
+
+def _draw_highlighted(ui, xy, line, terms, font):
+    """ Draws line with the parts matching terms inverted (black on white). """
+    x, y = xy
+    ui.draw.text((x, y), line, font=font, fill="white")
+    for start, end in _match_spans(line, terms):
+        x0 = x + ui.get_text_size(line[:start], font)[0]
+        x1 = x + ui.get_text_size(line[:end], font)[0]
+        ui.draw.rectangle((x0, y, x1, y + 20), fill="white")
+        ui.draw.text((x0, y), line[start:end], font=font, fill="black")
+
+def _show_message_detail(ui, title, root_id, sub_index, message, message_id=None, sender=None, timestamp=None,
+                         highlight=None):
     softkey = SoftKeyBar(ui)
     header = HeaderWidget(ui, root_id)
 
     timestamp_text = _format_timestamp(timestamp)
     meta_lines = []
     if sender:
-        meta_lines.append(f"From: {sender}")
+        name = get_resolver(ui).display_name(sender)
+        meta_lines.append(f"From: {name}" if name == sender else f"From: {name} ({sender})")
     meta_lines.append(f"Time: {timestamp_text}")
 
     body_lines = _wrap_text(ui, message, 220, ui.font_n)
@@ -166,7 +147,10 @@ def _show_message_detail(ui, title, root_id, sub_index, message, message_id=None
         for line in body_lines:
             if y > 210:
                 break
-            ui.draw.text((10, y), line, font=ui.font_n, fill="white")
+            if highlight:
+                _draw_highlighted(ui, (10, y), line, highlight, ui.font_n)
+            else:
+                ui.draw.text((10, y), line, font=ui.font_n, fill="white")
             y += 22
 
         softkey.update("Options", present=False)
@@ -180,14 +164,14 @@ def _show_message_detail(ui, title, root_id, sub_index, message, message_id=None
                 options = VerticalList(ui, "Options", ["Just Erase for now"], app_id=root_id)
                 selection = options.show()
                 if selection == 0 and message_id is not None:
-                    _delete_inbox_message(message_id)
+                    _delete_inbox_message(ui, message_id)
                     MessageDialog(ui, "Erased!").show()
                     return "deleted"
             elif title == "Outbox":
                 options = VerticalList(ui, "Options", ["Erase", "Send"], app_id=root_id)
                 selection = options.show()
                 if selection == 0 and message_id is not None:
-                    _delete_outbox_message(message_id)
+                    _delete_outbox_message(ui, message_id)
                     MessageDialog(ui, "Erased!").show()
                     return "deleted"
                 if selection == 1:
@@ -197,25 +181,29 @@ def _show_message_detail(ui, title, root_id, sub_index, message, message_id=None
                     ).show()
 
 def _show_inbox(ui, root_id, sub_index):
+    header_root = f"{root_id}-{sub_index}"
+    resolver = get_resolver(ui)
+
+    def label(message):
+        name = resolver.display_name(message.sender)
+        return f"{name}" if message.is_read else f"* {name}"
+
+    v_list = WindowedList(ui, "Inbox", get_data(ui).inbox_page, label, PAGE_SIZE, app_id=header_root)
+    softkey = SoftKeyBar(ui)
+
     while True:
-        messages = _fetch_inbox_messages()
-        if not messages:
-            _show_empty_state(ui, "Inbox", f"{root_id}-{sub_index}", None, "No Messages")
+        if not v_list.rows:
+            _show_empty_state(ui, "Inbox", header_root, None, "No Messages")
             return
 
-        list_items = [
-            f"{sender}" if is_read else f"* {sender}"
-            for _, message, sender, _, is_read in messages
-        ]
-        header_root = f"{root_id}-{sub_index}"
-        v_list = VerticalList(ui, "Inbox", list_items, app_id=header_root)
-        softkey = SoftKeyBar(ui)
-
         softkey.update("Open", present=False)
         selection_index = v_list.show()
         if selection_index == -1:
             return
-        message_id, message, sender, timestamp, _ = messages[selection_index]
+        message_id, message, sender, timestamp, is_read = v_list.rows[selection_index]
+        if not is_read:
+            get_data(ui).mark_message_read(message_id)
+            v_list.update_row(selection_index, v_list.rows[selection_index]._replace(is_read=1))
         result = _show_message_detail(
             ui,
             "Inbox",
@@ -227,25 +215,30 @@ def _show_inbox(ui, root_id, sub_index):
             timestamp=timestamp,
         )
         if result == "deleted":
-            continue
+            v_list.remove(selection_index)
 
 def _show_outbox(ui, root_id, sub_index):
+    header_root = f"{root_id}-{sub_index}"
+    resolver = get_resolver(ui)
+
+    def label(message):
+        if not message.recipient:
+            return message.message
+        return f"{resolver.display_name(message.recipient)}: {message.message}"
+
+    v_list = WindowedList(ui, "Outbox", get_data(ui).outbox_page, label, PAGE_SIZE, app_id=header_root)
+    softkey = SoftKeyBar(ui)
+
     while True:
-        messages = _fetch_outbox_messages()
-        if not messages:
-            _show_empty_state(ui, "Outbox", f"{root_id}-{sub_index}", None, "No Messages")
+        if not v_list.rows:
+            _show_empty_state(ui, "Outbox", header_root, None, "No Messages")
             return
 
-        list_items = [message for _, message, _ in messages]
-        header_root = f"{root_id}-{sub_index}"
-        v_list = VerticalList(ui, "Outbox", list_items, app_id=header_root)
-        softkey = SoftKeyBar(ui)
-
         softkey.update("Open", present=False)
         selection_index = v_list.show()
         if selection_index == -1:
             return
-        message_id, message, timestamp = messages[selection_index]
+        message_id, message, recipient, timestamp = v_list.rows[selection_index]
         result = _show_message_detail(
             ui,
             "Outbox",
@@ -256,21 +249,123 @@ def _show_outbox(ui, root_id, sub_index):
             timestamp=timestamp,
         )
         if result == "deleted":
-            continue
+            v_list.remove(selection_index)
+
+def _show_thread(ui, thread, header_root):
+    """ One conversation, newest first, loaded a page at a time. """
+    data = get_data(ui)
+    title = get_resolver(ui).display_name(thread.display_address or thread.address)
+    if data.summary()["thread_unread"].get(thread.id):
+        data.mark_thread_read(thread.id)
+
+    def label(message):
+        prefix = "Me: " if message.direction == OUTGOING else ""
+        return prefix + (message.body or "")
+
+    v_list = WindowedList(ui, title, lambda after, limit: data.thread_page(thread.id, after, limit), label,
+                          PAGE_SIZE, app_id=header_root)
+    softkey = SoftKeyBar(ui)
+
+    while v_list.rows:
+        softkey.update("Open", present=False)
+        selection_index = v_list.show()
+        if selection_index == -1:
+            return
+        message = v_list.rows[selection_index]
+        result = _show_message_detail(
+            ui,
+            "Outbox" if message.direction == OUTGOING else "Inbox",
+            header_root,
+            selection_index + 1,
+            message.body,
+            message_id=message.id,
+            sender=None if message.direction == OUTGOING else message.sender,
+            timestamp=message.timestamp,
+        )
+        if result == "deleted":
+            v_list.remove(selection_index)
+
+def _show_threads(ui, root_id, sub_index):
+    header_root = f"{root_id}-{sub_index}"
+    resolver = get_resolver(ui)
+    data = get_data(ui)
+
+    def label(thread):
+        name = resolver.display_name(thread.display_address or thread.address)
+        unread = data.summary()["thread_unread"].get(thread.id, 0)
+        return f"* {name} ({unread})" if unread else f"{name} ({thread.message_count})"
+
+    softkey = SoftKeyBar(ui)
+    while True:
+        # Reopened after each conversation: order and counts may have changed.
+        v_list = WindowedList(ui, "Conversations", data.threads_page, label, PAGE_SIZE,
+                              app_id=header_root)
+        if not v_list.rows:
+            _show_empty_state(ui, "Conversations", header_root, None, "No Messages")
+            return
+
+        softkey.update("Open", present=False)
+        selection_index = v_list.show()
+        if selection_index == -1:
+            return
+        _show_thread(ui, v_list.rows[selection_index], f"{header_root}-{selection_index + 1}")
+
+class MessageSearch(SearchInput):
+    """
+    As-you-type search over message bodies: each keystroke re-queries the
+    full-text index (every word as a prefix) and the results refine below.
+    show() returns the chosen message and its index, or None.
+    """
+
+    def __init__(self, ui, header_root):
+        resolver = get_resolver(ui)
+
+        def label(message):
+            who = "Me" if message.direction == OUTGOING else resolver.display_name(message.sender or "")
+            return f"{who}: {message.body or ''}"
+
+        super().__init__(ui, "Search", "Text:", get_data(ui).search_messages, label,
+                         btn_text="Open", header_root=header_root)
+
+    @property
+    def terms(self):
+        return search_terms(self.text)
+
+def _show_search(ui, root_id, sub_index):
+    header_root = f"{root_id}-{sub_index}"
+    search = MessageSearch(ui, header_root)
+    while True:
+        # Keeps the typed text and selection between opened messages.
+        result = search.show()
+        if result is None:
+            return
+        message, selection_index = result
+        _show_message_detail(
+            ui,
+            "Outbox" if message.direction == OUTGOING else "Inbox",
+            header_root,
+            selection_index + 1,
+            message.body,
+            message_id=message.id,
+            sender=None if message.direction == OUTGOING else message.sender,
+            timestamp=message.timestamp,
+            highlight=search.terms,
+        )
 
 def _show_write_message(ui, root_id, sub_index):
     softkey = SoftKeyBar(ui)
     input_widget = TextInputLong(ui, "Write")
 
+    clock = get_clock(ui)
     cursor_on = True
-    last_blink = time.time()
+    last_blink = clock.time()
     input_widget.draw(cursor_on)
     softkey.update("Options")
 
     while True:
-        if time.time() - last_blink > 0.5:
+        if clock.time() - last_blink > 0.5:
             cursor_on = not cursor_on
-            last_blink = time.time()
+            last_blink = clock.time()
             input_widget.draw(cursor_on)
             softkey.update("Options")
 
@@ -287,8 +382,11 @@ def _show_write_message(ui, root_id, sub_index):
                     "This feature requires Telephony. Will hopefully be functional by M3",
                 ).show()
             elif selection == 1:
-                _save_outbox_message(input_widget.get_text())
-                MessageDialog(ui, "Saved!").show()
+                # Blank number: kept as a draft outside any conversation.
+                recipient = TextInput(ui, "Save", "To:").show()
+                if recipient is not None:
+                    _save_outbox_message(ui, input_widget.get_text(), recipient.strip())
+                    MessageDialog(ui, "Saved!").show()
 
             input_widget.draw(cursor_on)
             softkey.update("Options")
@@ -308,12 +406,16 @@ def run(ui):
             "Inbox",
             "Outbox",
             "Write Message",
+            "Conversations",
+            "Search",
         ],
         root_id=ROOT_ID_MESSAGES,
         show_select_hint=True,
     )
 
     while True:
+        unread = get_data(ui).summary()["unread"]
+        menu.items[0] = f"Inbox ({unread})" if unread else "Inbox"
         sel = menu.show()
         if sel < 0:
             return
@@ -324,3 +426,7 @@ def run(ui):
             _show_outbox(ui, ROOT_ID_MESSAGES, 2)
         elif sel == 2:
             _show_write_message(ui, ROOT_ID_MESSAGES, 3)
+        elif sel == 3:
+            _show_threads(ui, ROOT_ID_MESSAGES, 4)
+        elif sel == 4:
+            _show_search(ui, ROOT_ID_MESSAGES, 5)
@@ -6,11 +6,11 @@ Updates:
 """
 
 import os
-import time
 import subprocess
 import signal
 import io
 from PIL import Image, ImageFile
+from System.core.Clock import get_clock
 from System.ui.framework import VerticalList, SoftKeyBar
 
 # 1. Be tolerant of bad MP3 art
@@ -41,6 +41,7 @@ MPV_CMD = [
 class MusicPlayer:
     def __init__(self, ui):
         self.ui = ui
+        self.clock = get_clock(ui)
         self.softkey = SoftKeyBar(ui)
         self.playlist = [] 
         self.current_process = None
@@ -155,7 +156,7 @@ class MusicPlayer:
             except Exception:
                 display_art = None
         
-        start_time = time.time()
+        start_time = self.clock.time()
         paused_at = 0
         total_paused_duration = 0
         
@@ -177,7 +178,7 @@ class MusicPlayer:
                 return
 
             # Calc Time
-            now = time.time()
+            now = self.clock.time()
             if self.is_paused:
                 if paused_at == 0: paused_at = now
                 current_elapsed = paused_at - start_time - total_paused_duration
@@ -1,8 +1,11 @@
+import os
 import sys
-import sqlite3
 import time
-from System.ui.framework import VerticalList, SoftKeyBar, TextInput
+from System.core.Clock import get_clock
+from System.core.DataService import get_data
+from System.ui.framework import MessageDialog, VerticalList, SoftKeyBar, TextInput
 import System.apps.PhoneBook.shared.list_ui as contact_manager
+import System.apps.PhoneBook.shared.vcard as vcard
 
 # Redirect all print() output to Serial
 sys.stdout = open('/dev/ttyAMA0', 'w')
@@ -30,24 +33,13 @@ def run(ui):
 
         # --- SEARCH ---
         elif selection == 0:
-            # 1. Ask what to find
-            search_input = TextInput(ui, "Search", "Name:")
-            query = search_input.show()
+            # 1. Search as you type (results refine on every key)
+            result = contact_manager.ContactSearch(ui, title="Search", btn_text="Options", header_root="1-1").show()
             
-            if query:
-                # 2. Show Filtered List
-                result = contact_manager.show_contact_selector(
-                    ui, 
-                    title="Results", 
-                    btn_text="Options",  # <--- Changed per request!
-                    search_query=query,
-                    header_root="1-1",
-                )
-                
-                if result:
-                    target, selection_index = result
-                    # 3. Open the specific Options Menu for this contact
-                    run_contact_options(ui, target, f"1-1-{selection_index + 1}")
+            if result:
+                target, selection_index = result
+                # 2. Open the specific Options Menu for this contact
+                run_contact_options(ui, target, f"1-1-{selection_index + 1}")
 
         # --- ADD ENTRY ---
         elif selection == 1: 
@@ -86,17 +78,12 @@ def add_entry_action(ui):
     if not number: return
 
     try:
-        conn = sqlite3.connect("/NeoDCT/User/db/phonebook.db")
-        c = conn.cursor()
-        c.execute("INSERT INTO contacts (name, number, speed_dial) VALUES (?, ?, ?)", 
-                  (name, number, 0))
-        conn.commit()
-        conn.close()
+        get_data(ui).add_contact(name, number, 0)
         
         ui.draw.rectangle((0,0,240,210), fill="black")
         ui.draw.text((80, 100), "Saved!", font=ui.font_xl, fill="white")
         ui.fb.update(ui.canvas)
-        time.sleep(1)
+        get_clock(ui).sleep(1)
     except Exception as e:
         print(f"[PB] Save Error: {e}")
 
@@ -112,17 +99,12 @@ def edit_contact_action(ui, contact):
     if new_number is None: return
 
     try:
-        conn = sqlite3.connect("/NeoDCT/User/db/phonebook.db")
-        c = conn.cursor()
-        c.execute("UPDATE contacts SET name=?, number=? WHERE id=?", 
-                  (new_name, new_number, contact_id))
-        conn.commit()
-        conn.close()
+        get_data(ui).update_contact(contact_id, new_name, new_number)
         
         ui.draw.rectangle((0,0,240,210), fill="black")
         ui.draw.text((80, 100), "Updated!", font=ui.font_xl, fill="white")
         ui.fb.update(ui.canvas)
-        time.sleep(1)
+        get_clock(ui).sleep(1)
     except Exception as e:
         print(f"[PB] Update Error: {e}")
 
@@ -130,16 +112,12 @@ def delete_contact_action(ui, contact):
     contact_id, name = contact[0], contact[1]
     # In M3 we can add a "Are you sure?" dialog here
     
-    conn = sqlite3.connect("/NeoDCT/User/db/phonebook.db")
-    c = conn.cursor()
-    c.execute("DELETE FROM contacts WHERE id=?", (contact_id,))
-    conn.commit()
-    conn.close()
+    get_data(ui).delete_contact(contact_id)
             
     ui.draw.rectangle((0,0,240,210), fill="black")
     ui.draw.text((50, 100), "Erased", font=ui.font_xl, fill="white")
     ui.fb.update(ui.canvas)
-    time.sleep(1)
+    get_clock(ui).sleep(1)
 
 # --- SUBMENUS ---
 
@@ -164,7 +142,7 @@ def run_contact_options(ui, contact, header_root):
             ui.draw.text((10, 115), contact[1], font=ui.font_n, fill="white")
             ui.draw.text((10, 140), contact[2], font=ui.font_s, fill="white")
             ui.fb.update(ui.canvas)
-            time.sleep(2)
+            get_clock(ui).sleep(2)
             
         elif sel == 1: # Edit
             edit_contact_action(ui, contact)
@@ -178,10 +156,10 @@ def run_contact_options(ui, contact, header_root):
             ui.draw.rectangle((0,0,240,210), fill="black")
             ui.draw.text((50, 100), "Sent!", font=ui.font_xl, fill="white")
             ui.fb.update(ui.canvas)
-            time.sleep(1)
+            get_clock(ui).sleep(1)
 
 def run_options_submenu(ui):
-    opt_items = ["Type of view", "Memory status"]
+    opt_items = ["Type of view", "Memory status", "Import contacts", "Export contacts"]
     opt_list = VerticalList(ui, "Options", opt_items, app_id="1-6")
     softkey = SoftKeyBar(ui)
     
@@ -191,3 +169,66 @@ def run_options_submenu(ui):
         if selection == -1: return
         elif selection == 0: print("Changing View Type...")
         elif selection == 1: print("Checking Memory...")
+        elif selection == 2: import_vcard_action(ui)
+        elif selection == 3: export_vcard_action(ui)
+
+# --- VCARD IMPORT / EXPORT ---
+
+def draw_progress(ui, title, line1, line2=""):
+    ui.draw.rectangle((0,0,240,210), fill="black")
+    ui.draw.text((10, 60), title, font=ui.font_xl, fill="white")
+    ui.draw.text((10, 115), line1, font=ui.font_n, fill="white")
+    ui.draw.text((10, 140), line2, font=ui.font_s, fill="white")
+    ui.fb.update(ui.canvas)
+
+def import_vcard_action(ui):
+    """ Pick a .vcf file from VCARD_DIR and stream it into the phonebook. """
+    try:
+        files = sorted(f for f in os.listdir(vcard.VCARD_DIR) if f.lower().endswith(".vcf"))
+    except OSError:
+        files = []
+    if not files:
+        MessageDialog(ui, f"No .vcf files in {vcard.VCARD_DIR}").show()
+        return
+
+    file_list = VerticalList(ui, "Import", files, app_id="1-6-3")
+    SoftKeyBar(ui).update("Import")
+    selection = file_list.show()
+    if selection == -1: return
+
+    path = os.path.join(vcard.VCARD_DIR, files[selection])
+    draw_progress(ui, "Importing", files[selection])
+    started = time.monotonic()
+    try:
+        added, skipped = get_data(ui).import_contacts(
+            vcard.read_vcards(path),
+            progress=lambda added, skipped: draw_progress(ui, "Importing", f"{added} added", f"{skipped} skipped"),
+        )
+    except Exception as e:
+        print(f"[PB] Import Error: {e}")
+        MessageDialog(ui, f"Import failed: {e}").show()
+        return
+    print(f"[PB] Imported {added} contacts from {path} ({skipped} skipped) in {time.monotonic() - started:.1f}s")
+    draw_progress(ui, "Imported", f"{added} added", f"{skipped} duplicates skipped")
+    get_clock(ui).sleep(1.5)
+
+def export_vcard_action(ui):
+    """ Write every contact to VCARD_DIR/EXPORT_NAME as vCard 3.0. """
+    path = os.path.join(vcard.VCARD_DIR, vcard.EXPORT_NAME)
+    data = get_data(ui)
+    draw_progress(ui, "Exporting", vcard.EXPORT_NAME)
+    try:
+        os.makedirs(vcard.VCARD_DIR, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8", newline="") as f:
+            count = vcard.write_vcards(
+                f, data.iter_contacts(),
+                progress=lambda count: draw_progress(ui, "Exporting", f"{count} contacts"),
+            )
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"[PB] Export Error: {e}")
+        MessageDialog(ui, f"Export failed: {e}").show()
+        return
+    print(f"[PB] Exported {count} contacts to {path}")
+    draw_progress(ui, "Exported", f"{count} contacts", vcard.EXPORT_NAME)
+    get_clock(ui).sleep(1.5)
@@ -1,33 +1,19 @@
 """
 list_ui.py - Shared Contact Selector
 Updates: Added search filtering logic compatible with 'get_all_contacts'.
+         Added ContactSearch, an as-you-type search screen.
 """
 
-import sqlite3
-import time
-from System.ui.framework import VerticalList, SoftKeyBar
+from System.core.Clock import get_clock
+from System.core.DataService import get_data
+from System.ui.framework import SearchInput, SoftKeyBar, VerticalList
 
-DB_PATH = "/NeoDCT/User/db/phonebook.db"
-
-def get_all_contacts(search_query=None):
+def get_all_contacts(search_query=None, ui=None):
     """ 
     Fetch contacts. 
     If search_query is provided, filters by name (case-insensitive partial match).
     """
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    
-    if search_query:
-        # The % signs act as wildcards before and after the text
-        # e.g. "bo" matches "Bob", "Jimbo", "Robot"
-        sql = "SELECT * FROM contacts WHERE name LIKE ? ORDER BY name ASC"
-        c.execute(sql, ('%' + search_query + '%',))
-    else:
-        c.execute("SELECT * FROM contacts ORDER BY name ASC")
-        
-    data = c.fetchall()
-    conn.close()
-    return data
+    return get_data(ui).contacts(search_query)
 
 def show_contact_selector(ui, title="Contacts", btn_text="Select", search_query=None, header_root="1"):
     """ 
@@ -35,7 +21,7 @@ def show_contact_selector(ui, title="Contacts", btn_text="Select", search_query=
     search_query: Optional string to filter the list.
     """
     # 1. Fetch Data (Filtered or All)
-    contacts = get_all_contacts(search_query)
+    contacts = get_all_contacts(search_query, ui)
     
     # 2. Handle Empty State
     if not contacts:
@@ -47,7 +33,7 @@ def show_contact_selector(ui, title="Contacts", btn_text="Select", search_query=
         ui.draw.text(((240-w)//2, 100), msg, font=ui.font_n, fill="white")
         
         ui.fb.update(ui.canvas)
-        time.sleep(1.5) # Let them read it
+        get_clock(ui).sleep(1.5) # Let them read it
         return None
 
     # 3. Extract names for the UI
@@ -67,3 +53,12 @@ def show_contact_selector(ui, title="Contacts", btn_text="Select", search_query=
             return None # Back pressed
             
         return contacts[selection_index], selection_index
+
+class ContactSearch(SearchInput):
+    """ 
+    As-you-type search over the contact index.
+    show() returns (contact, index) like show_contact_selector, or None.
+    """
+    def __init__(self, ui, title="Search", btn_text="Select", header_root="1-1"):
+        super().__init__(ui, title, "Name:", get_data(ui).search_contacts, lambda contact: contact.name,
+                         btn_text=btn_text, header_root=header_root)
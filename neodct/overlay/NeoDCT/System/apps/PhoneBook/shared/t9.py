@@ -0,0 +1,134 @@
+"""
+t9.py - T9 digit-sequence contact lookup
+Maps every contact to keypad digit keys so digits typed on the home screen
+can be matched against names ("5646" -> John) and numbers ("555" -> 555-1234).
+
+Keys live in one sorted list of (length, digits, contact_id). A lookup walks
+the key lengths from the typed length up, bisecting to the first key of that
+length starting with the typed digits, so exact matches come first, then the
+shortest completions, at O(lengths * log n + results) regardless of phonebook
+size. The index follows phonebook edits made through the DataService
+incrementally and rebuilds itself if another process changed the database
+(checked at most every VERSION_RECHECK seconds).
+"""
+
+import bisect
+import threading
+
+from System.core.DataService import PHONEBOOK_DB, VERSION_RECHECK
+
+KEYPAD = {
+    "2": "abc", "3": "def", "4": "ghi", "5": "jkl",
+    "6": "mno", "7": "pqrs", "8": "tuv", "9": "wxyz",
+}
+LETTER_DIGITS = {letter: digit for digit, letters in KEYPAD.items() for letter in letters}
+
+def word_to_digits(word):
+    """ "John" -> "5646". Digits are kept, anything else is dropped. """
+    out = []
+    for ch in word.lower():
+        if ch.isdigit():
+            out.append(ch)
+        elif ch in LETTER_DIGITS:
+            out.append(LETTER_DIGITS[ch])
+    return "".join(out)
+
+def number_to_digits(number):
+    return "".join(ch for ch in (number or "") if ch.isdigit())
+
+def contact_keys(contact):
+    """
+    Digit keys a contact can be found by: the name from each word onwards
+    ("John Smith" -> "56467648" and "76484") and the phone number's digits.
+    """
+    keys = set()
+    words = [word_to_digits(w) for w in (contact.name or "").split()]
+    words = [w for w in words if w]
+    for i in range(len(words)):
+        keys.add("".join(words[i:]))
+    number = number_to_digits(contact.number)
+    if number:
+        keys.add(number)
+    return keys
+
+class T9Index:
+    MAX_RESULTS = 3
+
+    def __init__(self, data):
+        self.data = data
+        self.entries = []   # sorted (len(digits), digits, contact_id)
+        self.max_length = 0 # longest key in entries
+        self.contacts = {}  # contact_id -> Contact
+        self.version = None # PRAGMA data_version the index was built at; None = not built
+        self.lock = threading.RLock()
+        data.subscribe(PHONEBOOK_DB, self._on_change)
+
+    # --- BUILD / SYNC ---
+    def load(self):
+        with self.lock:
+            version = self.data.data_version(PHONEBOOK_DB)
+            contacts = self.data.contacts()
+            self.contacts = {c.id: c for c in contacts}
+            self.entries = sorted((len(key), key, c.id) for c in contacts for key in contact_keys(c))
+            self.max_length = max((entry[0] for entry in self.entries), default=0)
+            self.version = version
+            print(f"[T9] Indexed {len(contacts)} contacts ({len(self.entries)} keys)")
+
+    def preload(self):
+        """ Builds the index on a background thread so the first digit typed doesn't pay for it. """
+        thread = threading.Thread(target=self.load, name="t9-index", daemon=True)
+        thread.start()
+        return thread
+
+    def _add(self, contact):
+        self.contacts[contact.id] = contact
+        for key in contact_keys(contact):
+            bisect.insort(self.entries, (len(key), key, contact.id))
+            self.max_length = max(self.max_length, len(key))
+
+    def _remove(self, contact_id):
+        contact = self.contacts.pop(contact_id, None)
+        if contact is None:
+            return
+        for key in contact_keys(contact):
+            entry = (len(key), key, contact_id)
+            i = bisect.bisect_left(self.entries, entry)
+            if i < len(self.entries) and self.entries[i] == entry:
+                del self.entries[i]
+
+    def _on_change(self, event, row_id):
+        with self.lock:
+            if self.version is None:
+                return # Not built yet; the first lookup will load fresh data
+            if event == "reset":
+                self.version = None
+                return
+            self._remove(row_id)
+            if event != "delete":
+                contact = self.data.contact(row_id)
+                if contact:
+                    self._add(contact)
+
+    # --- LOOKUP ---
+    def lookup(self, digits, limit=MAX_RESULTS):
+        """ Contacts with a name or number key starting with digits: exact matches first, then shorter keys. """
+        if not digits:
+            return []
+        with self.lock:
+            if (self.version is None
+                    or self.data.data_version(PHONEBOOK_DB, max_age=VERSION_RECHECK) != self.version):
+                self.load()
+
+            found = []
+            for length in range(len(digits), self.max_length + 1):
+                i = bisect.bisect_left(self.entries, (length, digits))
+                while i < len(self.entries) and len(found) < limit:
+                    key_length, key, contact_id = self.entries[i]
+                    if key_length != length or not key.startswith(digits):
+                        break
+                    if contact_id not in found:
+                        found.append(contact_id)
+                    i += 1
+                if len(found) >= limit:
+                    break
+            return [self.contacts[contact_id] for contact_id in found]
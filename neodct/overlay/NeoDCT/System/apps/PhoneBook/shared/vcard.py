@@ -0,0 +1,167 @@
+"""
+vcard.py - vCard 2.1 / 3.0 import and export
+Reads address books one card at a time, so a file of thousands of contacts is
+never held in memory; records go straight into DataService.import_contacts,
+which writes them in batched transactions.
+
+Only what the phonebook stores is kept: a display name (FN, else N) and one
+number per card (the PREF one, else CELL, else the first TEL). Cards without
+a TEL are imported as name-only contacts.
+"""
+
+import quopri
+from collections import namedtuple
+
+VCARD_DIR = "/NeoDCT/User/contacts"
+EXPORT_NAME = "phonebook.vcf"
+FOLD_WIDTH = 75
+PROGRESS_EVERY = 250
+
+VCard = namedtuple("VCard", "name number")
+
+# --- READING ---
+def unfold(lines):
+    """ Joins folded lines: a leading space/tab continues the previous line (3.0),
+    and so does the line after a quoted-printable soft break ending in "=" (2.1). """
+    pending = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if pending is None:
+            pending = line
+        elif line[:1] in (" ", "\t"):
+            pending += line[1:]
+        elif pending.endswith("=") and "QUOTED-PRINTABLE" in pending.split(":", 1)[0].upper():
+            pending = pending[:-1] + line
+        else:
+            yield pending
+            pending = line
+    if pending is not None:
+        yield pending
+
+def _unescape(value):
+    out = []
+    chars = iter(value)
+    for ch in chars:
+        if ch == "\\":
+            ch = next(chars, "")
+            out.append("\n" if ch in ("n", "N") else ch)
+        else:
+            out.append(ch)
+    return "".join(out)
+
+def _split_components(value):
+    """ Splits a structured value (N) on unescaped ";". """
+    parts, current, escaped = [], [], False
+    for ch in value:
+        if escaped:
+            current.append("\\" + ch)
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == ";":
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+    parts.append("".join(current))
+    return [_unescape(p).strip() for p in parts]
+
+def _decode(value, params):
+    """ Applies ENCODING=QUOTED-PRINTABLE / CHARSET= from the property parameters. """
+    if "QUOTED-PRINTABLE" in params or "ENCODING=QUOTED-PRINTABLE" in params:
+        charset = "utf-8"
+        for param in params:
+            if param.startswith("CHARSET="):
+                charset = param[len("CHARSET="):].lower()
+        try:
+            return quopri.decodestring(value.encode("latin-1", "replace")).decode(charset, "replace")
+        except LookupError:
+            return quopri.decodestring(value.encode("latin-1", "replace")).decode("utf-8", "replace")
+    return value
+
+def _tel_types(params):
+    """ "TYPE=CELL,PREF" (3.0) and bare "CELL;PREF" (2.1) both give {"CELL", "PREF"}. """
+    types = set()
+    for param in params:
+        if param.startswith("TYPE="):
+            param = param[len("TYPE="):]
+        types.update(t.strip('"') for t in param.split(","))
+    return types
+
+def _record(card):
+    name = card["fn"]
+    if not name and card["n"]:
+        family, given, additional = (card["n"] + ["", "", ""])[:3]
+        name = " ".join(part for part in (given, additional, family) if part)
+    number = None
+    for rank in ("PREF", "CELL", None):
+        for tel, types in card["tels"]:
+            if rank is None or rank in types:
+                number = tel
+                break
+        if number:
+            break
+    return VCard(name or number or "", number or "")
+
+def iter_vcards(lines):
+    """ Yields a VCard per BEGIN:VCARD ... END:VCARD block in lines (any iterable of str). """
+    card = None
+    for line in unfold(lines):
+        if ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        params = key.split(";")
+        prop = params[0].rsplit(".", 1)[-1].strip().upper() # drop "item1." groups
+        params = [p.strip().upper() for p in params[1:]]
+
+        if prop == "BEGIN" and value.strip().upper() == "VCARD":
+            card = {"fn": None, "n": None, "tels": []}
+        elif card is None:
+            continue
+        elif prop == "END" and value.strip().upper() == "VCARD":
+            record = _record(card)
+            card = None
+            if record.name or record.number:
+                yield record
+        elif prop == "FN":
+            card["fn"] = _unescape(_decode(value, params)).strip()
+        elif prop == "N":
+            card["n"] = _split_components(_decode(value, params))
+        elif prop == "TEL":
+            tel = _decode(value, params).strip()
+            if tel:
+                card["tels"].append((tel, _tel_types(params)))
+
+def read_vcards(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        yield from iter_vcards(f)
+
+# --- WRITING ---
+def _escape(text):
+    return (text or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _fold(line):
+    """ Splits a content line into FOLD_WIDTH-character chunks joined by CRLF + space. """
+    chunks = [line[:FOLD_WIDTH]]
+    for i in range(FOLD_WIDTH, len(line), FOLD_WIDTH - 1):
+        chunks.append(" " + line[i:i + FOLD_WIDTH - 1])
+    return "\r\n".join(chunks) + "\r\n"
+
+def format_vcard(name, number):
+    """ One vCard 3.0 record. """
+    lines = ["BEGIN:VCARD", "VERSION:3.0", f"FN:{_escape(name)}", f"N:;{_escape(name)};;;"]
+    if number:
+        lines.append(f"TEL;TYPE=CELL:{number}")
+    lines.append("END:VCARD")
+    return "".join(_fold(line) for line in lines)
+
+def write_vcards(f, contacts, progress=None, every=PROGRESS_EVERY):
+    """ Writes contacts (anything with .name and .number) to the text file f.
+    progress(count) is called every `every` records. Returns the number written. """
+    count = 0
+    for contact in contacts:
+        f.write(format_vcard(contact.name, contact.number))
+        count += 1
+        if progress and count % every == 0:
+            progress(count)
+    return count
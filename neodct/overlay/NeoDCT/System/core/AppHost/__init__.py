@@ -0,0 +1,252 @@
+"""Process-isolated app host.
+
+Apps whose manifest sets `"isolated": true` run in their own Python process
+(`python3 -m System.core.AppHost`) instead of inside the UI:
+
+- The app draws into a private 240x240 canvas. On `ui.fb.update()` the pixels
+  are copied into a double-buffered shared-memory surface and a frame message
+  is sent to the host. The host releases a buffer once it has copied it out,
+  and the app waits for that release before drawing into the buffer again, so
+  a host that falls behind never composites a half-overwritten frame.
+- Key events are forwarded to the app over a socketpair; the app acks every
+  key it reads.
+- The host composites the latest surface plus system overlays into the real
+  framebuffer. If the app stops acking keys it is marked as not responding and
+  C/Back closes it, so a hung app never freezes the phone.
+- The modem stays in the UI process. The app gets a proxy (`ui.modem`) whose
+  state and signal the host pushes on change, and whose dial/answer/hangup
+  calls the host performs.
+- Keys reach the host through the UI runtime as usual; the host ticks the
+  power manager itself and stops compositing while the display is blanked.
+  The app is told to pause meanwhile: it drops its frames and sends its
+  current canvas once resumed.
+
+Wire format (SOCK_SEQPACKET, one message per packet):
+    host -> app:  b"K" + u16 key code
+                  b"M" + JSON {"state", "signal"}   (modem status)
+                  b"R" + u8 buffer index            (frame copied, buffer free)
+                  b"P" + u8 0/1                     (resume/pause rendering)
+    app -> host:  b"F" + u8 buffer index            (frame ready)
+                  b"A"                              (key consumed)
+                  b"C" + JSON [method, args]        (modem call)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import select
+import signal
+import socket
+import struct
+import subprocess
+import sys
+from multiprocessing import shared_memory
+
+from PIL import Image
+
+from System.core.Clock import get_clock
+
+WIDTH = 240
+HEIGHT = 240
+FRAME_BYTES = WIDTH * HEIGHT * 3  # RGB
+HANG_TIMEOUT = 5.0
+KEY_CLOSE = 14
+MESSAGE_MAX = 512  # bytes per packet
+MODEM_CALLS = ("dial", "answer", "hangup")
+NEODCT_ROOT = "/NeoDCT"
+
+
+def create_surface():
+    """Returns a new shared-memory surface holding two RGB frames."""
+    return shared_memory.SharedMemory(create=True, size=FRAME_BYTES * 2)
+
+
+def read_frame(shm, index):
+    start = FRAME_BYTES * index
+    return Image.frombytes("RGB", (WIDTH, HEIGHT), bytes(shm.buf[start:start + FRAME_BYTES]))
+
+
+def write_frame(shm, index, image):
+    start = FRAME_BYTES * index
+    shm.buf[start:start + FRAME_BYTES] = image.convert("RGB").tobytes()
+
+
+def draw_not_responding(host, canvas):
+    """Default system overlay: banner over a hung app."""
+    if not host.hung:
+        return
+    ui = host.ui
+    ui.draw.rectangle((0, 80, 240, 150), fill="black", outline="white")
+    ui.draw.text((10, 88), f"{host.app['name']}", font=ui.font_n, fill="white")
+    ui.draw.text((10, 115), "Not responding. C: Close", font=ui.font_s, fill="white")
+
+
+class AppHost:
+    def __init__(self, ui, app, hang_timeout=HANG_TIMEOUT):
+        self.ui = ui
+        self.app = app
+        self.hang_timeout = hang_timeout
+        self.clock = get_clock(ui)
+        self.overlays = [draw_not_responding]
+        self.surface = None
+        self.sock = None
+        self.proc = None
+        self.frame = None
+        self.pending_keys = 0
+        self.oldest_key_time = None
+        self.hung = False
+        self.modem_status = None
+        self.paused = False
+
+    # --- PROCESS ---
+    def start(self):
+        self.surface = create_surface()
+        self.sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        cmd = [
+            sys.executable, "-m", "System.core.AppHost",
+            self.app["path"], self.app["exec"], self.surface.name, str(child_sock.fileno()),
+        ]
+        self.proc = subprocess.Popen(
+            cmd,
+            cwd=NEODCT_ROOT,
+            pass_fds=(child_sock.fileno(),),
+            start_new_session=True,  # own process group, so helpers like mpv die with it
+        )
+        child_sock.close()
+        print(f"[APPHOST] Started {self.app['name']} (pid {self.proc.pid})")
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            try:
+                os.killpg(self.proc.pid, signal.SIGTERM)
+                self.proc.wait(timeout=1.0)
+            except Exception:
+                try: os.killpg(self.proc.pid, signal.SIGKILL)
+                except Exception: pass
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        if self.surface:
+            self.surface.close()
+            self.surface.unlink()
+            self.surface = None
+
+    # --- COMPOSITING ---
+    def composite(self):
+        if self.frame is not None:
+            self.ui.canvas.paste(self.frame, (0, 0))
+        else:
+            self.ui.draw.rectangle((0, 0, WIDTH, HEIGHT), fill="black")
+        for overlay in self.overlays:
+            overlay(self, self.ui.canvas)
+        self.ui.fb.update(self.ui.canvas)
+
+    # --- EVENTS ---
+    def _handle_message(self, msg):
+        if msg[:1] == b"F":
+            self.frame = read_frame(self.surface, msg[1])
+            try:
+                self.sock.send(b"R" + msg[1:2])  # copied out; the app may draw into it again
+            except OSError:
+                pass
+            return True
+        if msg[:1] == b"A":
+            self.pending_keys = max(0, self.pending_keys - 1)
+            self.oldest_key_time = self.clock.time() if self.pending_keys else None
+            if self.hung:
+                self.hung = False
+                return True
+        if msg[:1] == b"C":
+            self._modem_call(msg[1:])
+        return False
+
+    def _modem_call(self, payload):
+        try:
+            method, args = json.loads(payload)
+        except ValueError:
+            return
+        if method not in MODEM_CALLS:
+            print(f"[APPHOST] {self.app['name']} sent unknown modem call {method!r}")
+            return
+        try:
+            getattr(self.ui.modem, method)(*args)
+        except Exception as e:
+            print(f"[APPHOST] Modem {method} failed: {e}")
+        self.modem_status = None  # the app guessed the new state; resend the real one
+
+    def _sync_modem(self):
+        """Pushes the modem's state and signal to the app when they change."""
+        status = {"state": self.ui.modem.state, "signal": self.ui.modem.signal_bars()}
+        if status == self.modem_status:
+            return
+        try:
+            self.sock.send(b"M" + json.dumps(status).encode())
+        except OSError:
+            return
+        self.modem_status = status
+
+    def _sync_paused(self, paused):
+        """Pauses the app's rendering while the display is blanked, resumes it after."""
+        if paused == self.paused:
+            return
+        try:
+            self.sock.send(b"P" + bytes((paused,)))
+        except OSError:
+            return
+        self.paused = paused
+
+    def _forward_key(self, key):
+        if self.hung and key == KEY_CLOSE:
+            print(f"[APPHOST] Closing unresponsive {self.app['name']}")
+            return False
+        try:
+            self.sock.send(b"K" + struct.pack("H", key))
+        except OSError:
+            return False
+        if self.pending_keys == 0:
+            self.oldest_key_time = self.clock.time()
+        self.pending_keys += 1
+        return True
+
+    def run(self):
+        """Blocking: runs the app until it exits (or is closed while hung)."""
+        self.start()
+        power = self.ui.power
+        try:
+            while self.proc.poll() is None:
+                r, _, _ = select.select([self.sock, self.ui.keypad_fd], [], [], 0.1)
+                dirty = False
+
+                if self.sock in r:
+                    try:
+                        msg = self.sock.recv(MESSAGE_MAX)
+                    except OSError:
+                        break
+                    if not msg:
+                        break
+                    dirty = self._handle_message(msg)
+
+                # A raw runtime read: never parks in the blanked wait like ui.read_keypress().
+                # Also drains keys the UI runtime queued before the app started.
+                key = self.ui.runtime.read_key(0)
+                if key is None:
+                    self.ui.memory.service()
+                    power.tick()
+                elif power.on_key():
+                    dirty = True  # only woke the display
+                elif not self._forward_key(key):
+                    break
+
+                self._sync_paused(power.blanked)
+                self._sync_modem()
+                if (not self.hung and self.oldest_key_time is not None
+                        and self.clock.time() - self.oldest_key_time > self.hang_timeout):
+                    self.hung = True
+                    dirty = True
+
+                if dirty and not power.blanked:
+                    self.composite()
+        finally:
+            self.stop()
+            print(f"[APPHOST] {self.app['name']} exited")
@@ -0,0 +1,181 @@
+"""App side of System.core.AppHost.
+
+Usage: python3 -m System.core.AppHost <app_path> <exec> <shm_name> <socket_fd>
+
+Builds a `SurfaceUI` that looks like `NeoDCT_UI` to the app (canvas, draw,
+fonts, fb, clock, runtime, data, modem, key reading) but renders into the
+shared surface and reads keys from the host socket, then runs the app's
+`run(ui)`. Only the shared assets are loaded, not the UI itself.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+import socket
+import struct
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+from PIL import Image, ImageDraw
+
+from System.core.AppHost import MESSAGE_MAX, write_frame
+from System.core.Clock import SystemClock
+from System.core.DataService import DATA
+from System.core.Runtime import UIRuntime
+from System.ui.assets import LAYOUT_PATH, WALLPAPER_PATH, load_fonts, load_layout, load_wallpaper, render_element
+
+
+class SurfaceFramebuffer:
+    """
+    Alternates between the surface's two buffers. A buffer is busy from its
+    frame message until the host releases it; update() waits for that (reading
+    host messages through wait_message()) instead of overwriting a frame the
+    host may still be copying. While paused, frames are dropped.
+    """
+
+    def __init__(self, shm, sock, wait_message):
+        self.shm = shm
+        self.sock = sock
+        self.wait_message = wait_message
+        self.index = 0
+        self.busy = [False, False]
+        self.paused = False
+        self.dropped = False
+
+    def release(self, index):
+        self.busy[index] = False
+
+    def update(self, pil_image):
+        if self.paused:
+            self.dropped = True
+            return
+        while self.busy[self.index]:
+            self.wait_message()
+        write_frame(self.shm, self.index, pil_image)
+        self.sock.send(b"F" + bytes((self.index,)))
+        self.busy[self.index] = True
+        self.index ^= 1
+
+
+class RemoteModem:
+    """The UI process's modem as seen from an app: status pushed by the host, calls sent to it."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.state = "IDLE"
+        self.signal = None
+
+    def update(self, status):
+        self.state = status.get("state", self.state)
+        self.signal = status.get("signal")
+
+    def signal_bars(self):
+        return self.signal
+
+    def _call(self, method, *args):
+        self.sock.send(b"C" + json.dumps([method, args]).encode())
+        return True
+
+    # The state changes optimistically; the host pushes the real one after every call.
+    def dial(self, number):
+        self.state = "CALLING"
+        return self._call("dial", number)
+
+    def answer(self):
+        return self._call("answer")
+
+    def hangup(self):
+        self.state = "IDLE"
+        return self._call("hangup")
+
+
+class SurfaceUI:
+    def __init__(self, shm, sock, clock=None):
+        self.sock = sock
+        self.clock = clock or SystemClock()
+        self.font_s, self.font_md, self.font_n, self.font_xl = load_fonts()
+        self.home_layout = load_layout(LAYOUT_PATH)
+        self.wallpaper = load_wallpaper(WALLPAPER_PATH)
+        self.image_cache = {}
+        self.canvas = Image.new("RGB", (240, 240), "black")
+        self.draw = ImageDraw.Draw(self.canvas)
+        self.fb = SurfaceFramebuffer(shm, sock, self._wait_message)
+        self.softkey = None  # present, so app SoftKeyBars draw opaque
+        self.data = DATA
+        self.modem = RemoteModem(sock)
+        # Host messages are read by the runtime's loop, like the keypad in the UI process.
+        self.runtime = UIRuntime(sock.fileno(), self.read_event, clock=self.clock)
+
+    def get_image(self, path):
+        if path not in self.image_cache:
+            try:
+                self.image_cache[path] = Image.open(path).convert("RGBA")
+            except Exception:
+                return None
+        return self.image_cache[path]
+
+    def get_text_size(self, text, font):
+        bbox = self.draw.textbbox((0, 0), text, font=font)
+        return (bbox[2] - bbox[0], bbox[3] - bbox[1])
+
+    def render_element(self, el):
+        render_element(self, el)
+
+    def read_event(self):
+        """Reads one host message. Returns the key code of a key message (acked), else None."""
+        msg = self.sock.recv(MESSAGE_MAX)
+        if not msg:
+            raise SystemExit(0)  # host went away
+        if msg[:1] == b"M":
+            self.modem.update(json.loads(msg[1:]))
+            return None
+        if msg[:1] == b"R":
+            self.fb.release(msg[1])
+            return None
+        if msg[:1] == b"P":
+            self.fb.paused = bool(msg[1])
+            if not self.fb.paused and self.fb.dropped:
+                self.fb.dropped = False
+                self.fb.update(self.canvas)
+            return None
+        if msg[:1] != b"K":
+            return None
+        self.sock.send(b"A")
+        return struct.unpack("H", msg[1:3])[0]
+
+    def _wait_message(self):
+        """Blocks for one host message outside the runtime loop; a key read meanwhile is queued for the app."""
+        key = self.read_event()
+        if key is not None:
+            self.runtime.keys.put_nowait(key)
+
+    def read_keypress(self, timeout=0.1):
+        return self.runtime.read_key(timeout)
+
+    def wait_for_key(self):
+        while True:
+            key = self.read_keypress(0.1)
+            if key is not None:
+                return key
+
+
+def main(argv):
+    app_path, exec_name, shm_name, sock_fd = argv[1:5]
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # The host owns (and unlinks) the segment.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    sock = socket.socket(fileno=int(sock_fd))
+
+    ui = SurfaceUI(shm, sock)
+    path = os.path.join(app_path, exec_name)
+    spec = importlib.util.spec_from_file_location("neodct_app", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if hasattr(module, "run"):
+        module.run(ui)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,162 @@
+"""App module loader.
+
+Keeps every app module resident after its first launch, keyed by path and
+source mtime, so reopening an app skips the import work (and the module's
+top-level side effects). Launch counts are kept in `/NeoDCT/User/.app_usage.json`
+and used to warm the most frequently opened apps in the background after boot.
+Only in-process apps whose module top level is declarative (imports,
+definitions, constant assignments; see `is_preloadable()`) are warmed, since
+preloading runs that code on a background thread while the UI is up. A
+manifest can opt out with `"preload": false`.
+
+Bytecode for `/NeoDCT/System` is precompiled at build time by
+`board/neodct/post-build.sh`; `precompile()` does the same on a live device.
+"""
+
+from __future__ import annotations
+
+import ast
+import compileall
+import importlib.util
+import json
+import os
+import re
+import sys
+import threading
+
+APP_DIR = "/NeoDCT/System/apps"
+USAGE_PATH = "/NeoDCT/User/.app_usage.json"
+PRELOAD_LIMIT = 2
+PRELOAD_MIN_LAUNCHES = 3
+
+
+def _module_name(path):
+    folder = os.path.basename(os.path.dirname(path))
+    return "neodct_app_" + re.sub(r"\W", "_", folder)
+
+
+def _is_declarative(node):
+    """True for top-level statements that only bind names (no calls, no I/O)."""
+    if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return not any(isinstance(d, ast.Call) for d in getattr(node, "decorator_list", ()))
+    if isinstance(node, ast.Expr):  # docstring
+        return isinstance(node.value, ast.Constant)
+    if isinstance(node, (ast.Assign, ast.AnnAssign)):
+        return node.value is None or not any(isinstance(n, (ast.Call, ast.Lambda)) for n in ast.walk(node.value))
+    if isinstance(node, ast.Try):  # optional imports: try: import x / except ImportError: x = None
+        return all(_is_declarative(n) for n in node.body + node.orelse + node.finalbody) and all(
+            _is_declarative(n) for handler in node.handlers for n in handler.body
+        )
+    if isinstance(node, ast.Pass):
+        return True
+    return False
+
+
+def is_preloadable(app):
+    """Whether importing the app off the UI thread is safe: in-process, not opted out, declarative top level."""
+    if app.get("isolated") or app.get("preload") is False:
+        return False
+    path = os.path.join(app["path"], app["exec"])
+    try:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        return False
+    return all(_is_declarative(node) for node in tree.body)
+
+
+def precompile(app_dir=APP_DIR):
+    """Writes __pycache__ bytecode for every app. Returns True on success."""
+    return bool(compileall.compile_dir(app_dir, quiet=1))
+
+
+class AppLoader:
+    def __init__(self, usage_path=USAGE_PATH):
+        self.usage_path = usage_path
+        self.modules = {}  # path -> (mtime_ns, module)
+        self.lock = threading.Lock()
+        self.usage = self._read_usage()
+
+    def _read_usage(self):
+        try:
+            with open(self.usage_path, "r", encoding="utf-8") as f:
+                return {str(k): int(v) for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"[APPS] Ignoring unreadable usage file: {e}")
+            return {}
+
+    def _record_launch(self, path):
+        self.usage[path] = self.usage.get(path, 0) + 1
+        try:
+            with open(self.usage_path, "w", encoding="utf-8") as f:
+                json.dump(self.usage, f)
+        except Exception as e:
+            print(f"[APPS] Could not save usage counts: {e}")
+
+    def load(self, app):
+        """Returns the app's module, importing it only if it is new or changed on disk."""
+        path = os.path.join(app["path"], app["exec"])
+        mtime = os.stat(path).st_mtime_ns
+
+        with self.lock:
+            cached = self.modules.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            spec = importlib.util.spec_from_file_location(_module_name(path), path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            self.modules[path] = (mtime, module)
+            return module
+
+    def launch(self, app, ui):
+        module = self.load(app)
+        self._record_launch(os.path.join(app["path"], app["exec"]))
+        if hasattr(module, "run"):
+            module.run(ui)
+
+    def resident_bytes(self):
+        """Rough size of the resident modules: their namespaces and the objects directly in them."""
+        with self.lock:
+            modules = [module for _, module in self.modules.values()]
+        total = 0
+        for module in modules:
+            namespace = vars(module)
+            total += sys.getsizeof(namespace) + sum(sys.getsizeof(value) for value in namespace.values())
+        return total
+
+    def evict(self, path=None):
+        """Drops one resident module (or all of them). Returns how many were dropped."""
+        with self.lock:
+            if path is None:
+                count = len(self.modules)
+                self.modules.clear()
+                return count
+            return 1 if self.modules.pop(path, None) else 0
+
+    def frequent_apps(self, apps, limit=PRELOAD_LIMIT):
+        def launches(app):
+            return self.usage.get(os.path.join(app["path"], app["exec"]), 0)
+
+        ranked = sorted((a for a in apps if launches(a) >= PRELOAD_MIN_LAUNCHES), key=launches, reverse=True)
+        return ranked[:limit]
+
+    def preload(self, apps, limit=PRELOAD_LIMIT):
+        """Imports the most used preloadable apps on a background thread. Returns the thread (or None)."""
+        targets = self.frequent_apps([app for app in apps if is_preloadable(app)], limit)
+        if not targets:
+            return None
+
+        def worker():
+            for app in targets:
+                try:
+                    self.load(app)
+                    print(f"[APPS] Preloaded {app['name']}")
+                except Exception as e:
+                    print(f"[APPS] Preload failed for {app['name']}: {e}")
+
+        thread = threading.Thread(target=worker, name="app-preload", daemon=True)
+        thread.start()
+        return thread
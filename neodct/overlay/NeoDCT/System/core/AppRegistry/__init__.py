@@ -0,0 +1,124 @@
+"""Installed app registry.
+
+Keeps a compiled index of every app's manifest in `/NeoDCT/User/.app_index.json`
+so boot does not have to open and parse each `manifest.json`. On load, every app
+directory is revalidated with a single `stat()` of its manifest; only manifests
+whose mtime changed (or new directories) are parsed again.
+
+Manifest problems are kept as diagnostics in `AppRegistry.errors` (and in the
+index) instead of being dropped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+APP_DIR = "/NeoDCT/System/apps"
+INDEX_PATH = "/NeoDCT/User/.app_index.json"
+INDEX_VERSION = 2
+
+
+class AppRegistry:
+    def __init__(self, app_dir=APP_DIR, index_path=INDEX_PATH):
+        self.app_dir = app_dir
+        self.index_path = index_path
+        self.apps = []
+        self.errors = []
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == INDEX_VERSION and index.get("app_dir") == self.app_dir:
+                return index
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[APPS] Ignoring unreadable app index: {e}")
+        return {"version": INDEX_VERSION, "app_dir": self.app_dir, "dir_mtime": None, "apps": {}}
+
+    def _write_index(self, index):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            print(f"[APPS] Could not save app index: {e}")
+
+    def _parse_manifest(self, folder, manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        app_path = f"{self.app_dir}/{folder}"
+        return {
+            "name": data.get("name", folder),
+            "icon": f"{app_path}/" + data.get("icon", "icon.png"),
+            "path": app_path,
+            "exec": data.get("exec", "main.py"),
+            "id": int(data.get("id", 999)),
+            "isolated": bool(data.get("isolated", False)),
+        }
+
+    def load(self):
+        """Returns the app list (sorted by manifest id), rescanning only what changed."""
+        self.apps = []
+        self.errors = []
+
+        if not os.path.exists(self.app_dir):
+            try: os.makedirs(self.app_dir)
+            except Exception: pass
+
+        try:
+            dir_mtime = os.stat(self.app_dir).st_mtime_ns
+        except OSError as e:
+            self.errors.append(f"{self.app_dir}: {e}")
+            print(f"[APPS] App scan error: {e}")
+            return self.apps
+
+        index = self._read_index()
+        cached = index["apps"]
+        dirty = False
+
+        # The directory mtime only changes when apps are added or removed.
+        if index["dir_mtime"] == dir_mtime:
+            folders = list(cached)
+        else:
+            folders = os.listdir(self.app_dir)
+            dirty = True
+
+        entries = {}
+        for folder in folders:
+            manifest_path = f"{self.app_dir}/{folder}/manifest.json"
+            try:
+                mtime = os.stat(manifest_path).st_mtime_ns
+            except OSError:
+                mtime = None
+
+            record = cached.get(folder)
+            if record is None or record.get("mtime") != mtime:
+                record = {"mtime": mtime, "app": None, "error": None}
+                if mtime is not None:
+                    try:
+                        record["app"] = self._parse_manifest(folder, manifest_path)
+                    except Exception as e:
+                        record["error"] = f"{manifest_path}: {e}"
+                dirty = True
+
+            entries[folder] = record
+            if record["app"]:
+                self.apps.append(record["app"])
+            if record["error"]:
+                self.errors.append(record["error"])
+
+        if dirty or len(entries) != len(cached):
+            index["dir_mtime"] = dir_mtime
+            index["apps"] = entries
+            self._write_index(index)
+
+        for error in self.errors:
+            print(f"[APPS] Manifest error: {error}")
+
+        self.apps.sort(key=lambda x: x["id"])
+        return self.apps
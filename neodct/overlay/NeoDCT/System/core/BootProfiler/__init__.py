@@ -0,0 +1,143 @@
+"""Boot-time profiler and lazy imports.
+
+`BOOT` is the process-wide profiler used by `launcher.py` and `System.core.main`:
+
+- `BOOT.step(name)` times an init step (font load, wallpaper, DB init, ...).
+- `BOOT.track_imports()` times every module imported for the first time inside it,
+  including submodules of packages that are already loaded.
+- `BOOT.mark(name)` records a milestone relative to process start (e.g. "home screen").
+- `BOOT.report()` prints the timings to the console and saves them to
+  `/NeoDCT/User/.boot_profile.json` so boots can be compared.
+
+`lazy_import(name)` returns a module object whose real import is deferred until
+the first attribute access, for modules only needed by specific screens.
+"""
+
+from __future__ import annotations
+
+import builtins
+import importlib.util
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+REPORT_PATH = "/NeoDCT/User/.boot_profile.json"
+REPORT_TOP_IMPORTS = 15
+
+
+class BootProfiler:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.steps = []    # (name, seconds)
+        self.imports = []  # (module, seconds, depth)
+        self.marks = []    # (name, seconds since start)
+        self.reported = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.steps.append((name, time.perf_counter() - t0))
+
+    def mark(self, name):
+        with self._lock:
+            self.marks.append((name, time.perf_counter() - self.start))
+
+    @contextmanager
+    def track_imports(self):
+        original_import = builtins.__import__
+        depth = threading.local()
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # Candidates: the module itself and any submodules named in fromlist
+            # ("from PIL import ImageEnhance", "from System.core import main").
+            base = _absolute_name(name, globals, level)
+            wanted = [base] + [f"{base}.{item}" for item in fromlist or () if item != "*"]
+            missing = [module for module in wanted if module not in sys.modules]
+            if not missing:
+                return original_import(name, globals, locals, fromlist, level)
+
+            current = getattr(depth, "value", 0)
+            depth.value = current + 1
+            t0 = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                depth.value = current
+                elapsed = time.perf_counter() - t0
+                # Attribute names in fromlist ("from x import func") never load; only record real modules.
+                loaded = [module for module in missing if module in sys.modules]
+                if loaded:
+                    with self._lock:
+                        self.imports.append((loaded[0], elapsed, current))
+
+        builtins.__import__ = timed_import
+        try:
+            yield
+        finally:
+            builtins.__import__ = original_import
+
+    def report(self, path=REPORT_PATH):
+        if self.reported:
+            return
+        self.reported = True
+
+        with self._lock:
+            steps = list(self.steps)
+            imports = sorted(self.imports, key=lambda r: r[1], reverse=True)
+            marks = list(self.marks)
+
+        print("[BOOT] --- Boot profile ---")
+        for name, seconds in marks:
+            print(f"[BOOT] {name}: {seconds * 1000:.1f} ms after start")
+        for name, seconds in steps:
+            print(f"[BOOT] step {name}: {seconds * 1000:.1f} ms")
+        for name, seconds, depth in imports[:REPORT_TOP_IMPORTS]:
+            print(f"[BOOT] import {'  ' * depth}{name}: {seconds * 1000:.1f} ms")
+
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "marks": marks,
+                    "steps": steps,
+                    "imports": imports,
+                }, f, indent=1)
+        except Exception as e:
+            print(f"[BOOT] Could not save boot profile: {e}")
+
+
+def _absolute_name(name, globals, level):
+    """The absolute module name of an import statement (resolves "from . import x")."""
+    if not level:
+        return name
+    package = (globals or {}).get("__package__") or ""
+    try:
+        return importlib.util.resolve_name("." * level + name, package)
+    except (ImportError, ValueError):
+        return name
+
+
+BOOT = BootProfiler()
+
+
+def lazy_import(name):
+    """Returns `name` as a module that is only executed on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
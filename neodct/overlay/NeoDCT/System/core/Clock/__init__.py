@@ -0,0 +1,67 @@
+"""Clock service for time-driven UI code.
+
+Widgets, games and apps ask `ui.clock` for the time instead of calling
+`time.time()` / `time.sleep()` directly, so the same code can run against
+a simulated clock that advances instantly.
+
+- `SystemClock` is the real wall clock (default on the device).
+- `SimulatedClock` only moves when something sleeps or calls `advance()`.
+- Waits for input go through `clock.wait(poll, timeout)` as well (the UI
+  runtime's key reads, isolated apps' socket reads), so a screen that polls
+  keys with a timeout - Snake's tick, the music progress bar - advances a
+  simulated clock instead of blocking for real time.
+- `get_clock(ui)` returns the UI's clock, or the shared system clock for
+  callers that were handed a UI object without one.
+"""
+
+from __future__ import annotations
+
+import time
+
+
+class SystemClock:
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def strftime(self, fmt):
+        return time.strftime(fmt, time.localtime(self.time()))
+
+    def wait(self, poll, timeout):
+        """Returns poll(timeout): a blocking wait for input that gives None when timeout (seconds) expires."""
+        return poll(timeout)
+
+
+class SimulatedClock(SystemClock):
+    """Virtual clock for tests and benchmarks. `sleep()` returns immediately."""
+
+    def __init__(self, start=0.0):
+        self.now = float(start)
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.now += seconds
+
+    def advance(self, seconds):
+        self.sleep(seconds)
+        return self.now
+
+    def wait(self, poll, timeout):
+        """Takes input that is already there; otherwise the whole timeout passes at once."""
+        result = poll(0)
+        if result is None and timeout:
+            self.sleep(timeout)
+        return result
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+def get_clock(ui):
+    return getattr(ui, "clock", None) or SYSTEM_CLOCK
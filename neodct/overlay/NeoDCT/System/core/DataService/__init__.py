@@ -0,0 +1,948 @@
+"""Shared SQLite data service.
+
+Owns one long-lived connection per user database instead of every helper
+opening, querying and closing its own. Each connection is opened lazily on
+first use with:
+
+- WAL journaling and `synchronous=NORMAL` (one fsync per checkpoint, not per
+  commit), a small page cache and in-memory temp storage,
+- Python's per-connection prepared statement cache (`cached_statements`), so
+  repeated queries skip parsing,
+- pending schema migrations applied (versioned with `PRAGMA user_version`).
+
+Apps reach it through `get_data(ui)`; rows come back as named tuples that
+still unpack like the plain tuples the apps used before. In-memory indexes
+built from a table can `subscribe()` to its writes.
+
+Connections are never shared across `fork()`: if the service is used from a
+different pid (the supervisor's UI child, an isolated app) it reopens them.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from System.core.PhoneNumbers import SUFFIX_DIGITS, normalize, suffix
+
+DB_DIR = "/NeoDCT/User/db"
+PHONEBOOK_DB = "phonebook"
+MESSAGES_DB = "sms"
+LEGACY_INBOX_DB = "sms_inbox"
+LEGACY_OUTBOX_DB = "sms_outbox"
+CALLS_DB = "calls"
+STATEMENT_CACHE_SIZE = 128
+PAGE_SIZE = 20
+IMPORT_BATCH = 500
+CALL_LOG_LIMIT = 300  # calls kept; older ones are dropped as new ones arrive
+SUMMARY_RECHECK = 5.0  # seconds between checks for writes made by other processes
+VERSION_RECHECK = 5.0  # seconds a data_version() answer is reused by per-keystroke callers
+
+PRAGMAS = (
+    "PRAGMA auto_vacuum=INCREMENTAL",  # new databases only; see System.core.DbMaintenance
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=2000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-512",  # KiB
+)
+
+# messages.direction
+INCOMING = "in"
+OUTGOING = "out"
+
+# messages.state
+RECEIVED = "received"
+DRAFT = "draft"
+QUEUED = "queued"
+SENT = "sent"
+FAILED = "failed"
+
+# calls.type
+CALL_DIALED = "dialed"
+CALL_RECEIVED = "received"
+CALL_MISSED = "missed"
+CALL_TYPES = (CALL_MISSED, CALL_RECEIVED, CALL_DIALED)
+
+
+def _import_legacy_messages(service, conn):
+    """Copies rows from the pre-unification sms_inbox.db / sms_outbox.db (left in place)."""
+    for name, table, sql in (
+        (LEGACY_INBOX_DB, "inbox",
+         f"SELECT '{INCOMING}', '{RECEIVED}', sender, message, timestamp, is_read FROM inbox"),
+        (LEGACY_OUTBOX_DB, "outbox",
+         f"SELECT '{OUTGOING}', '{DRAFT}', NULL, message, timestamp, 1 FROM outbox"),
+    ):
+        path = service.path(name)
+        if not os.path.exists(path):
+            continue
+        legacy = sqlite3.connect(path)
+        try:
+            rows = legacy.execute(sql).fetchall()
+        except sqlite3.Error as e:
+            print(f"[DATA] Skipping legacy {table}: {e}")
+            rows = []
+        finally:
+            legacy.close()
+        conn.executemany(
+            "INSERT INTO messages (direction, state, sender, body, timestamp, is_read) VALUES (?, ?, ?, ?, ?, ?)",
+            [(d, st, sender, body, ts or 0, 1 if is_read else 0) for d, st, sender, body, ts, is_read in rows],
+        )
+        print(f"[DATA] Imported {len(rows)} messages from {path}")
+
+
+def _create_contacts_search(service, conn):
+    """Name index for prefix lookups plus an FTS5 trigram index for substring search, if FTS5 is built in."""
+    conn.execute("CREATE INDEX IF NOT EXISTS contacts_name ON contacts (name COLLATE NOCASE)")
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE contacts_fts USING fts5"
+            "(name, content='contacts', content_rowid='id', tokenize='trigram')"
+        )
+    except sqlite3.OperationalError as e:
+        print(f"[DATA] No FTS5 trigram support ({e}); contact search falls back to LIKE")
+        return
+    conn.execute(
+        """CREATE TRIGGER contacts_fts_insert AFTER INSERT ON contacts BEGIN
+               INSERT INTO contacts_fts (rowid, name) VALUES (new.id, new.name);
+           END"""
+    )
+    conn.execute(
+        """CREATE TRIGGER contacts_fts_delete AFTER DELETE ON contacts BEGIN
+               INSERT INTO contacts_fts (contacts_fts, rowid, name) VALUES ('delete', old.id, old.name);
+           END"""
+    )
+    conn.execute(
+        """CREATE TRIGGER contacts_fts_update AFTER UPDATE OF name ON contacts BEGIN
+               INSERT INTO contacts_fts (contacts_fts, rowid, name) VALUES ('delete', old.id, old.name);
+               INSERT INTO contacts_fts (rowid, name) VALUES (new.id, new.name);
+           END"""
+    )
+    conn.execute("INSERT INTO contacts_fts (contacts_fts) VALUES ('rebuild')")
+
+
+def _add_number_keys(service, conn):
+    """Indexed normalized number and last-digits suffix for caller-ID lookups (see System.core.PhoneNumbers)."""
+    conn.execute("ALTER TABLE contacts ADD COLUMN number_norm TEXT")
+    conn.execute("ALTER TABLE contacts ADD COLUMN number_suffix TEXT")
+    conn.execute("CREATE INDEX contacts_number_norm ON contacts (number_norm)")
+    conn.execute("CREATE INDEX contacts_number_suffix ON contacts (number_suffix)")
+    _fill_number_keys(conn)
+
+
+def _fill_number_keys(conn):
+    """Computes number keys for rows written without them (older builds, raw sqlite3 tools)."""
+    rows = conn.execute(
+        "SELECT id, number FROM contacts WHERE number_norm IS NULL AND number IS NOT NULL"
+    ).fetchall()
+    conn.executemany(
+        "UPDATE contacts SET number_norm=?, number_suffix=? WHERE id=?",
+        [(normalize(number), suffix(number), contact_id) for contact_id, number in rows],
+    )
+    return len(rows)
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _thread_id(conn, sender):
+    """Id of the conversation with sender (keyed by normalized address), created if new."""
+    address = normalize(sender)
+    if not address:
+        return None
+    row = conn.execute("SELECT id FROM threads WHERE address = ?", (address,)).fetchone()
+    if row:
+        return row[0]
+    return conn.execute(
+        "INSERT INTO threads (address, display_address) VALUES (?, ?)", (address, sender)
+    ).lastrowid
+
+
+def _create_threads(service, conn):
+    """Conversation threads: one per normalized address, with last-message pointer and count."""
+    conn.execute(
+        """CREATE TABLE threads
+           (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            address TEXT NOT NULL UNIQUE,
+            display_address TEXT,
+            last_message_id INTEGER,
+            last_timestamp INTEGER NOT NULL DEFAULT 0,
+            message_count INTEGER NOT NULL DEFAULT 0)"""
+    )
+    conn.execute("CREATE INDEX threads_last_timestamp ON threads (last_timestamp)")
+    conn.execute("CREATE INDEX messages_thread_timestamp ON messages (thread_id, timestamp)")
+
+    senders = conn.execute("SELECT DISTINCT sender FROM messages WHERE sender IS NOT NULL").fetchall()
+    for (sender,) in senders:
+        conn.execute("UPDATE messages SET thread_id = ? WHERE sender = ?", (_thread_id(conn, sender), sender))
+    conn.execute(
+        """UPDATE threads SET
+             message_count = (SELECT count(*) FROM messages WHERE thread_id = threads.id),
+             (last_message_id, last_timestamp) = (SELECT id, timestamp FROM messages WHERE thread_id = threads.id
+                                                  ORDER BY timestamp DESC, id DESC LIMIT 1)"""
+    )
+    conn.execute("DELETE FROM threads WHERE message_count = 0")
+
+    for statement in _split_statements(
+        """CREATE TRIGGER messages_thread_insert AFTER INSERT ON messages
+             WHEN new.thread_id IS NOT NULL BEGIN
+               UPDATE threads SET
+                 message_count = message_count + 1,
+                 last_message_id = CASE WHEN new.timestamp >= last_timestamp THEN new.id ELSE last_message_id END,
+                 last_timestamp = max(last_timestamp, new.timestamp)
+               WHERE id = new.thread_id;
+           END;
+           CREATE TRIGGER messages_thread_delete AFTER DELETE ON messages
+             WHEN old.thread_id IS NOT NULL BEGIN
+               UPDATE threads SET message_count = message_count - 1 WHERE id = old.thread_id;
+               DELETE FROM threads WHERE id = old.thread_id AND message_count <= 0;
+               UPDATE threads SET (last_message_id, last_timestamp) =
+                   (SELECT id, timestamp FROM messages WHERE thread_id = old.thread_id
+                    ORDER BY timestamp DESC, id DESC LIMIT 1)
+                 WHERE id = old.thread_id AND last_message_id = old.id;
+           END;"""
+    ):
+        conn.execute(statement)
+
+
+def _create_messages_search(service, conn):
+    """FTS5 index over message bodies (word tokens, prefix-indexed), if FTS5 is built in."""
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE messages_fts USING fts5"
+            "(body, content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    except sqlite3.OperationalError as e:
+        print(f"[DATA] No FTS5 support ({e}); message search falls back to LIKE")
+        return
+    for statement in _split_statements(
+        """CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+               INSERT INTO messages_fts (rowid, body) VALUES (new.id, new.body);
+           END;
+           CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN
+               INSERT INTO messages_fts (messages_fts, rowid, body) VALUES ('delete', old.id, old.body);
+           END;
+           CREATE TRIGGER messages_fts_update AFTER UPDATE OF body ON messages BEGIN
+               INSERT INTO messages_fts (messages_fts, rowid, body) VALUES ('delete', old.id, old.body);
+               INSERT INTO messages_fts (rowid, body) VALUES (new.id, new.body);
+           END;"""
+    ):
+        conn.execute(statement)
+    conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+
+def search_terms(query):
+    """Words of a search query, lowercased ("Gate 4B?" -> ["gate", "4b"])."""
+    return re.findall(r"\w+", (query or "").lower())
+
+
+# SQL condition for an unread incoming message; row is "new", "old" or a table name.
+_UNREAD = f"{{row}}.direction = '{INCOMING}' AND {{row}}.is_read = 0"
+
+# Ordered schema migrations per database. Step N (1-based) upgrades a database
+# whose PRAGMA user_version is N-1; each step is an SQL string or a
+# callable(service, conn) and runs in its own transaction with the version bump.
+MIGRATIONS = {
+    PHONEBOOK_DB: (
+        """CREATE TABLE IF NOT EXISTS contacts
+           (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            number TEXT,
+            speed_dial INTEGER)""",
+        _create_contacts_search,
+        _add_number_keys,
+    ),
+    MESSAGES_DB: (
+        # sender: the other party (sender of incoming, recipient of outgoing; NULL for drafts).
+        # thread_id: conversation the message belongs to (NULL until threaded).
+        """CREATE TABLE IF NOT EXISTS messages
+           (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            direction TEXT NOT NULL,
+            state TEXT NOT NULL,
+            thread_id INTEGER,
+            sender TEXT,
+            body TEXT,
+            timestamp INTEGER NOT NULL,
+            is_read INTEGER NOT NULL DEFAULT 0);
+           CREATE INDEX IF NOT EXISTS messages_timestamp ON messages (timestamp);
+           CREATE INDEX IF NOT EXISTS messages_sender_timestamp ON messages (sender, timestamp);
+           CREATE INDEX IF NOT EXISTS messages_is_read ON messages (is_read);""",
+        _import_legacy_messages,
+        # Unread counters kept by triggers, so badges never count rows.
+        f"""CREATE TABLE counters
+            (name TEXT PRIMARY KEY,
+             value INTEGER NOT NULL DEFAULT 0);
+           CREATE TABLE thread_unread
+            (thread_id INTEGER PRIMARY KEY,
+             unread INTEGER NOT NULL DEFAULT 0);
+           INSERT INTO counters (name, value)
+             SELECT 'unread', count(*) FROM messages WHERE {_UNREAD.format(row="messages")};
+           INSERT INTO thread_unread (thread_id, unread)
+             SELECT thread_id, count(*) FROM messages
+             WHERE thread_id IS NOT NULL AND {_UNREAD.format(row="messages")} GROUP BY thread_id;
+           CREATE TRIGGER messages_unread_insert AFTER INSERT ON messages
+             WHEN {_UNREAD.format(row="new")} BEGIN
+               UPDATE counters SET value = value + 1 WHERE name = 'unread';
+               INSERT INTO thread_unread (thread_id, unread) SELECT new.thread_id, 1 WHERE new.thread_id IS NOT NULL
+                 ON CONFLICT (thread_id) DO UPDATE SET unread = unread + 1;
+           END;
+           CREATE TRIGGER messages_unread_delete AFTER DELETE ON messages
+             WHEN {_UNREAD.format(row="old")} BEGIN
+               UPDATE counters SET value = value - 1 WHERE name = 'unread';
+               UPDATE thread_unread SET unread = unread - 1 WHERE thread_id = old.thread_id;
+           END;
+           CREATE TRIGGER messages_unread_update AFTER UPDATE OF direction, is_read, thread_id ON messages BEGIN
+               UPDATE counters SET value = value - ({_UNREAD.format(row="old")}) + ({_UNREAD.format(row="new")})
+                 WHERE name = 'unread';
+               UPDATE thread_unread SET unread = unread - 1
+                 WHERE thread_id = old.thread_id AND {_UNREAD.format(row="old")};
+               INSERT INTO thread_unread (thread_id, unread) SELECT new.thread_id, 1
+                 WHERE new.thread_id IS NOT NULL AND {_UNREAD.format(row="new")}
+                 ON CONFLICT (thread_id) DO UPDATE SET unread = unread + 1;
+           END;""",
+        _create_threads,
+        _create_messages_search,
+        # Inbox/outbox listings: one direction's range, already in (timestamp, id) order.
+        "CREATE INDEX messages_direction_timestamp ON messages (direction, timestamp, id)",
+    ),
+    CALLS_DB: (
+        # number_norm: see System.core.PhoneNumbers; per-number history is one range of calls_number_timestamp.
+        # is_new: a missed call not yet looked at.
+        """CREATE TABLE IF NOT EXISTS calls
+           (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL,
+            number TEXT,
+            number_norm TEXT,
+            timestamp INTEGER NOT NULL,
+            duration INTEGER NOT NULL DEFAULT 0,
+            is_new INTEGER NOT NULL DEFAULT 0);
+           CREATE INDEX IF NOT EXISTS calls_type_timestamp ON calls (type, timestamp);
+           CREATE INDEX IF NOT EXISTS calls_number_timestamp ON calls (number_norm, timestamp);
+           CREATE INDEX IF NOT EXISTS calls_timestamp ON calls (timestamp);""",
+        # Capped retention as a ring: ids only grow, so keeping the newest CALL_LOG_LIMIT
+        # calls is a delete of the rowid range that fell off the end (normally one row),
+        # never a count or sort. Counters keep the missed-call badge and the lifetime
+        # call timers (which outlive the rows) without reading the log.
+        f"""CREATE TABLE counters
+            (name TEXT PRIMARY KEY,
+             value INTEGER NOT NULL DEFAULT 0);
+           INSERT INTO counters (name, value)
+             SELECT 'missed', count(*) FROM calls WHERE is_new = 1;
+           INSERT INTO counters (name, value)
+             SELECT '{CALL_DIALED}_seconds', total(duration) FROM calls WHERE type = '{CALL_DIALED}';
+           INSERT INTO counters (name, value)
+             SELECT '{CALL_RECEIVED}_seconds', total(duration) FROM calls WHERE type = '{CALL_RECEIVED}';
+           CREATE TRIGGER calls_ring AFTER INSERT ON calls BEGIN
+               DELETE FROM calls WHERE id <= new.id - {CALL_LOG_LIMIT};
+           END;
+           CREATE TRIGGER calls_counters_insert AFTER INSERT ON calls BEGIN
+               UPDATE counters SET value = value + new.is_new WHERE name = 'missed';
+               UPDATE counters SET value = value + new.duration WHERE name = new.type || '_seconds';
+           END;
+           CREATE TRIGGER calls_counters_delete AFTER DELETE ON calls WHEN old.is_new BEGIN
+               UPDATE counters SET value = value - 1 WHERE name = 'missed';
+           END;
+           CREATE TRIGGER calls_counters_update AFTER UPDATE OF is_new ON calls BEGIN
+               UPDATE counters SET value = value - old.is_new + new.is_new WHERE name = 'missed';
+           END;""",
+    ),
+}
+
+Contact = namedtuple("Contact", "id name number speed_dial")
+InboxMessage = namedtuple("InboxMessage", "id message sender timestamp is_read")
+OutboxMessage = namedtuple("OutboxMessage", "id message recipient timestamp")
+Thread = namedtuple("Thread", "id address display_address timestamp message_count last_body")
+ThreadMessage = namedtuple("ThreadMessage", "id direction body sender timestamp is_read")
+Call = namedtuple("Call", "id type number timestamp duration is_new")
+CallStats = namedtuple("CallStats", "count duration last_timestamp")
+
+
+def _split_statements(script):
+    """Splits an SQL script into statements (trigger bodies keep their inner ';')."""
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip(" \n;"):
+                yield statement
+            statement = ""
+
+
+def _row_factory(row_type):
+    return lambda cursor, row: row_type(*row)
+
+
+class DataService:
+    def __init__(self, db_dir=DB_DIR):
+        self.db_dir = db_dir
+        self.connections = {}
+        self.tables = {}
+        self.listeners = {}
+        self.lock = threading.RLock()
+        self.pid = os.getpid()
+        self.summary_cache = None
+        self.summary_version = None
+        self.summary_checked = 0.0
+        self.versions = {}  # name -> (data_version, time.monotonic() it was read)
+        self.subscribe(MESSAGES_DB, self._invalidate_summary)
+        self.subscribe(CALLS_DB, self._invalidate_summary)
+
+    # --- CONNECTIONS ---
+    def path(self, name):
+        return f"{self.db_dir}/{name}.db"
+
+    def connection(self, name):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Inherited across fork(): the parent's handles must not be used (or closed) here.
+                self.connections = {}
+                self.pid = os.getpid()
+
+            conn = self.connections.get(name)
+            if conn is None:
+                os.makedirs(self.db_dir, exist_ok=True)
+                conn = sqlite3.connect(
+                    self.path(name),
+                    cached_statements=STATEMENT_CACHE_SIZE,
+                    check_same_thread=False,
+                )
+                for pragma in PRAGMAS:
+                    conn.execute(pragma)
+                self.migrate(name, conn)
+                self.connections[name] = conn
+            return conn
+
+    def migrate(self, name, conn):
+        """Runs the migrations newer than the database's user_version, one transaction each."""
+        steps = MIGRATIONS.get(name, ())
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target in range(version + 1, len(steps) + 1):
+            step = steps[target - 1]
+            print(f"[DATA] Migrating {name}.db to version {target}")
+            conn.execute("BEGIN")
+            try:
+                if callable(step):
+                    step(self, conn)
+                else:
+                    for statement in _split_statements(step):
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version={target}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def query(self, name, sql, params=(), row_type=None):
+        with self.lock:
+            cursor = self.connection(name).cursor()
+            if row_type is not None:
+                cursor.row_factory = _row_factory(row_type)
+            return cursor.execute(sql, params).fetchall()
+
+    def execute(self, name, sql, params=()):
+        """Runs one write statement in its own transaction. Returns the cursor's lastrowid."""
+        with self.lock:
+            conn = self.connection(name)
+            with conn:
+                return conn.execute(sql, params).lastrowid
+
+    def page_cache_bytes(self):
+        """Upper bound of the page caches' memory: each connection's cache_size, capped at its database size."""
+        with self.lock:
+            if self.pid != os.getpid():
+                return 0
+            total = 0
+            for conn in self.connections.values():
+                cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+                page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+                page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+                limit = -cache_size * 1024 if cache_size < 0 else cache_size * page_size
+                total += min(limit, page_count * page_size)
+            return total
+
+    def shrink(self):
+        """Releases page cache memory (registered with the MemoryMonitor)."""
+        with self.lock:
+            if self.pid != os.getpid():
+                return
+            for conn in self.connections.values():
+                conn.execute("PRAGMA shrink_memory")
+
+    def data_version(self, name, max_age=0.0):
+        """
+        Changes whenever another connection (another process) commits to the database.
+        max_age: reuse a value read less than max_age seconds ago instead of querying,
+        for callers that check on every keystroke or list row.
+        """
+        now = time.monotonic()
+        cached = self.versions.get(name)
+        if cached and max_age and now - cached[1] < max_age:
+            return cached[0]
+        version = self.query(name, "PRAGMA data_version")[0][0]
+        self.versions[name] = (version, now)
+        return version
+
+    # --- CHANGE NOTIFICATIONS ---
+    def subscribe(self, name, callback):
+        """
+        callback(event, row_id) runs after each write made through this service:
+        event is "insert", "update" or "delete", or "reset" (bulk change, row_id None).
+        """
+        self.listeners.setdefault(name, []).append(callback)
+
+    def notify(self, name, event, row_id=None):
+        for callback in self.listeners.get(name, ()):
+            try:
+                callback(event, row_id)
+            except Exception as e:
+                print(f"[DATA] Change listener failed: {e}")
+
+    def has_table(self, name, table):
+        with self.lock:
+            key = (name, table)
+            if key not in self.tables:
+                self.tables[key] = bool(self.query(
+                    name, "SELECT 1 FROM sqlite_master WHERE name = ?", (table,)
+                ))
+            return self.tables[key]
+
+    def close(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                for conn in self.connections.values():
+                    conn.close()
+            self.connections = {}
+
+    # --- CONTACTS ---
+    def contacts(self, search=None):
+        """All contacts by name; search filters by name (see search_contacts)."""
+        if search:
+            return self.search_contacts(search)
+        return self.query(
+            PHONEBOOK_DB, "SELECT id, name, number, speed_dial FROM contacts ORDER BY name ASC", (), Contact
+        )
+
+    def search_contacts(self, query, limit=-1):
+        """
+        Contacts whose name matches query, case-insensitively, ordered by name.
+        3+ characters: substring match through the contacts_fts trigram index.
+        Shorter (too short for a trigram): names starting with query, via contacts_name.
+        Without FTS5, longer queries fall back to a LIKE scan.
+        """
+        columns = "c.id, c.name, c.number, c.speed_dial"
+        if len(query) >= 3 and self.has_table(PHONEBOOK_DB, "contacts_fts"):
+            return self.query(
+                PHONEBOOK_DB,
+                f"SELECT {columns} FROM contacts_fts JOIN contacts c ON c.id = contacts_fts.rowid "
+                "WHERE contacts_fts MATCH ? ORDER BY c.name COLLATE NOCASE LIMIT ?",
+                ('"' + query.replace('"', '""') + '"', limit),
+                Contact,
+            )
+        pattern = _like_escape(query) + "%"
+        if len(query) >= 3:
+            pattern = "%" + pattern
+        return self.query(
+            PHONEBOOK_DB,
+            f"SELECT {columns} FROM contacts c WHERE c.name LIKE ? ESCAPE '\\' "
+            "ORDER BY c.name COLLATE NOCASE LIMIT ?",
+            (pattern, limit),
+            Contact,
+        )
+
+    def contact_count(self):
+        return self.query(PHONEBOOK_DB, "SELECT count(*) FROM contacts")[0][0]
+
+    def contact(self, contact_id):
+        rows = self.query(
+            PHONEBOOK_DB, "SELECT id, name, number, speed_dial FROM contacts WHERE id=?", (contact_id,), Contact
+        )
+        return rows[0] if rows else None
+
+    def contact_by_number(self, number_norm, number_suffix):
+        """
+        Contact whose normalized number equals number_norm, else the one contact sharing its
+        (full-length) suffix, if only one does. Two complete international numbers never meet on
+        a suffix: the fallback only pairs a local/short number with a full one.
+        """
+        if not number_norm:
+            return None
+        columns = "id, name, number, speed_dial"
+        rows = self.query(
+            PHONEBOOK_DB, f"SELECT {columns} FROM contacts WHERE number_norm = ? LIMIT 1", (number_norm,), Contact
+        )
+        if rows:
+            return rows[0]
+        if len(number_suffix or "") < SUFFIX_DIGITS:
+            return None
+        sql = f"SELECT {columns} FROM contacts WHERE number_suffix = ?"
+        if number_norm.startswith("+"):
+            sql += " AND number_norm NOT LIKE '+%'"
+        rows = self.query(PHONEBOOK_DB, sql + " ORDER BY id LIMIT 2", (number_suffix,), Contact)
+        return rows[0] if len(rows) == 1 else None
+
+    def backfill_number_keys(self):
+        with self.lock:
+            conn = self.connection(PHONEBOOK_DB)
+            with conn:
+                filled = _fill_number_keys(conn)
+        if filled:
+            print(f"[DATA] Computed number keys for {filled} contacts")
+        return filled
+
+    def add_contact(self, name, number, speed_dial=0):
+        contact_id = self.execute(
+            PHONEBOOK_DB,
+            "INSERT INTO contacts (name, number, speed_dial, number_norm, number_suffix) VALUES (?, ?, ?, ?, ?)",
+            (name, number, speed_dial, normalize(number), suffix(number)),
+        )
+        self.notify(PHONEBOOK_DB, "insert", contact_id)
+        return contact_id
+
+    def update_contact(self, contact_id, name, number):
+        self.execute(
+            PHONEBOOK_DB,
+            "UPDATE contacts SET name=?, number=?, number_norm=?, number_suffix=? WHERE id=?",
+            (name, number, normalize(number), suffix(number), contact_id),
+        )
+        self.notify(PHONEBOOK_DB, "update", contact_id)
+
+    def delete_contact(self, contact_id):
+        self.execute(PHONEBOOK_DB, "DELETE FROM contacts WHERE id=?", (contact_id,))
+        self.notify(PHONEBOOK_DB, "delete", contact_id)
+
+    def iter_contacts(self, batch_size=IMPORT_BATCH):
+        """All contacts by id, fetched batch_size rows at a time (for export)."""
+        last_id = 0
+        while True:
+            rows = self.query(
+                PHONEBOOK_DB,
+                "SELECT id, name, number, speed_dial FROM contacts WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+                Contact,
+            )
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1].id
+
+    def import_contacts(self, records, batch_size=IMPORT_BATCH, progress=None):
+        """
+        Adds (name, number) records, skipping any whose normalized number is
+        already in the phonebook (or earlier in records). Records without a
+        usable number are kept as name-only contacts, skipped only if a
+        name-only contact of that name exists. Rows are written batch_size at
+        a time, one transaction and executemany per batch; progress(added,
+        skipped) runs after each. Returns (added, skipped).
+        """
+        with self.lock:
+            conn = self.connection(PHONEBOOK_DB)
+            seen = {row[0] for row in conn.execute("SELECT number_norm FROM contacts WHERE number_norm != ''")}
+            seen_names = {
+                row[0].casefold() for row in conn.execute(
+                    "SELECT name FROM contacts WHERE COALESCE(number_norm, '') = '' AND name IS NOT NULL"
+                )
+            }
+        added = skipped = 0
+        batch = []
+
+        def flush():
+            with self.lock:
+                conn = self.connection(PHONEBOOK_DB)
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO contacts (name, number, speed_dial, number_norm, number_suffix) "
+                        "VALUES (?, ?, 0, ?, ?)",
+                        batch,
+                    )
+            batch.clear()
+
+        for name, number in records:
+            number_norm = normalize(number)
+            if number_norm:
+                if number_norm in seen:
+                    skipped += 1
+                    continue
+                seen.add(number_norm)
+            else:
+                if not name or name.casefold() in seen_names:
+                    skipped += 1
+                    continue
+                seen_names.add(name.casefold())
+            batch.append((name or number, number or "", number_norm, suffix(number) if number_norm else ""))
+            added += 1
+            if len(batch) >= batch_size:
+                flush()
+                if progress:
+                    progress(added, skipped)
+        if batch:
+            flush()
+        if progress:
+            progress(added, skipped)
+        if added:
+            self.notify(PHONEBOOK_DB, "reset")
+        return added, skipped
+
+    # --- MESSAGES ---
+    # Listings are keyset-paginated on (timestamp, id), newest first: each page
+    # continues below the last row of the previous one by walking one direction's
+    # range of messages_direction_timestamp backwards, so no sort step, no rows of
+    # the other direction skipped and no OFFSET scan however deep the user scrolls.
+    def _message_page(self, columns, direction, row_type, after, limit):
+        if after is None:
+            return self.query(
+                MESSAGES_DB,
+                f"SELECT {columns} FROM messages WHERE direction = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (direction, limit),
+                row_type,
+            )
+        return self.query(
+            MESSAGES_DB,
+            f"SELECT {columns} FROM messages WHERE direction = ? AND (timestamp, id) < (?, ?) "
+            "ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (direction, after.timestamp, after.id, limit),
+            row_type,
+        )
+
+    def inbox_page(self, after=None, limit=PAGE_SIZE):
+        """Up to `limit` inbox messages older than the row `after` (None: newest first)."""
+        return self._message_page("id, body, sender, timestamp, is_read", INCOMING, InboxMessage, after, limit)
+
+    def outbox_page(self, after=None, limit=PAGE_SIZE):
+        return self._message_page("id, body, sender, timestamp", OUTGOING, OutboxMessage, after, limit)
+
+    def delete_message(self, message_id):
+        self.execute(MESSAGES_DB, "DELETE FROM messages WHERE id = ?", (message_id,))
+        self.notify(MESSAGES_DB, "delete", message_id)
+
+    def mark_message_read(self, message_id):
+        self.execute(MESSAGES_DB, "UPDATE messages SET is_read = 1 WHERE id = ? AND is_read = 0", (message_id,))
+        self.notify(MESSAGES_DB, "update", message_id)
+
+    # Inbox and outbox rows share one table now.
+    delete_inbox_message = delete_message
+    delete_outbox_message = delete_message
+
+    def add_message(self, direction, state, body, sender=None, timestamp=None, is_read=False):
+        return self.add_messages([(direction, state, body, sender, timestamp, is_read)])[0]
+
+    def add_messages(self, rows, durable=False):
+        """
+        Inserts (direction, state, body, sender, timestamp, is_read) rows in one transaction,
+        filing each into its sender's thread. Returns the new ids. Callers notify().
+        durable: commit with synchronous=FULL, so the rows are on flash when this returns
+        (by default WAL commits are only fsynced at the next checkpoint).
+        """
+        now = int(time.time())
+        ids = []
+        with self.lock:
+            conn = self.connection(MESSAGES_DB)
+            if durable:
+                conn.execute("PRAGMA synchronous=FULL")
+            try:
+                with conn:
+                    threads = {}
+                    for direction, state, body, sender, timestamp, is_read in rows:
+                        if sender not in threads:
+                            threads[sender] = _thread_id(conn, sender) if sender else None
+                        ids.append(conn.execute(
+                            "INSERT INTO messages (direction, state, thread_id, sender, body, timestamp, is_read) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (direction, state, threads[sender], sender, body,
+                             now if timestamp is None else timestamp, 1 if is_read else 0),
+                        ).lastrowid)
+            finally:
+                if durable:
+                    conn.execute("PRAGMA synchronous=NORMAL")
+        return ids
+
+    def save_incoming_message(self, sender, body, timestamp=None):
+        message_id = self.add_message(INCOMING, RECEIVED, body, sender=sender, timestamp=timestamp)
+        self.notify(MESSAGES_DB, "insert", message_id)
+        return message_id
+
+    def save_outbox_message(self, text, timestamp=None, recipient=None):
+        """Saves an unsent message; with a recipient it joins that number's thread."""
+        message_id = self.add_message(OUTGOING, DRAFT, text, sender=recipient or None, timestamp=timestamp,
+                                      is_read=True)
+        self.notify(MESSAGES_DB, "insert", message_id)
+        return message_id
+
+    # --- THREADS ---
+    # Threads page on (last_timestamp, id) via threads_last_timestamp; a thread's
+    # messages page on (timestamp, id) within one thread_id range of
+    # messages_thread_timestamp, so opening a conversation is one index range scan.
+    def threads_page(self, after=None, limit=PAGE_SIZE):
+        sql = (
+            "SELECT t.id, t.address, t.display_address, t.last_timestamp, t.message_count, m.body "
+            "FROM threads t LEFT JOIN messages m ON m.id = t.last_message_id "
+        )
+        if after is None:
+            return self.query(
+                MESSAGES_DB, sql + "ORDER BY t.last_timestamp DESC, t.id DESC LIMIT ?", (limit,), Thread
+            )
+        return self.query(
+            MESSAGES_DB,
+            sql + "WHERE (t.last_timestamp, t.id) < (?, ?) ORDER BY t.last_timestamp DESC, t.id DESC LIMIT ?",
+            (after.timestamp, after.id, limit),
+            Thread,
+        )
+
+    def thread_page(self, thread_id, after=None, limit=PAGE_SIZE):
+        """Messages of one thread, newest first."""
+        columns = "id, direction, body, sender, timestamp, is_read"
+        if after is None:
+            return self.query(
+                MESSAGES_DB,
+                f"SELECT {columns} FROM messages WHERE thread_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (thread_id, limit),
+                ThreadMessage,
+            )
+        return self.query(
+            MESSAGES_DB,
+            f"SELECT {columns} FROM messages WHERE thread_id = ? AND (timestamp, id) < (?, ?) "
+            "ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (thread_id, after.timestamp, after.id, limit),
+            ThreadMessage,
+        )
+
+    # --- SEARCH ---
+    def search_messages(self, query, limit=PAGE_SIZE):
+        """
+        Messages containing every word of query as a word prefix ("gat 4" finds
+        "Gate 4B"), most recently stored first. Served by messages_fts, walked in
+        descending rowid order so a common word stops after `limit` hits instead
+        of sorting every match; a LIKE scan without FTS5.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        columns = "m.id, m.direction, m.body, m.sender, m.timestamp, m.is_read"
+        if self.has_table(MESSAGES_DB, "messages_fts"):
+            return self.query(
+                MESSAGES_DB,
+                f"SELECT {columns} FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid "
+                "WHERE messages_fts MATCH ? ORDER BY messages_fts.rowid DESC LIMIT ?",
+                (" ".join(f'"{term}"*' for term in terms), limit),
+                ThreadMessage,
+            )
+        where = " AND ".join("m.body LIKE ? ESCAPE '\\'" for _ in terms)
+        return self.query(
+            MESSAGES_DB,
+            f"SELECT {columns} FROM messages m WHERE {where} ORDER BY m.id DESC LIMIT ?",
+            tuple("%" + _like_escape(term) + "%" for term in terms) + (limit,),
+            ThreadMessage,
+        )
+
+    def mark_thread_read(self, thread_id):
+        self.execute(
+            MESSAGES_DB, "UPDATE messages SET is_read = 1 WHERE thread_id = ? AND is_read = 0", (thread_id,)
+        )
+        self.notify(MESSAGES_DB, "reset")
+
+    # --- CALL LOG ---
+    # Same keyset paging as messages: (timestamp, id) within one type of
+    # calls_type_timestamp, one number_norm of calls_number_timestamp, or
+    # calls_timestamp for all calls.
+    def add_call(self, call_type, number, timestamp=None, duration=0):
+        """Logs a finished call (CALL_DIALED / CALL_RECEIVED / CALL_MISSED); missed calls start out new."""
+        call_id = self.execute(
+            CALLS_DB,
+            "INSERT INTO calls (type, number, number_norm, timestamp, duration, is_new) VALUES (?, ?, ?, ?, ?, ?)",
+            (call_type, number, normalize(number), int(time.time()) if timestamp is None else timestamp,
+             int(duration), 1 if call_type == CALL_MISSED else 0),
+        )
+        self.notify(CALLS_DB, "insert", call_id)
+        return call_id
+
+    def _call_page(self, where, params, after, limit):
+        sql = f"SELECT id, type, number, timestamp, duration, is_new FROM calls WHERE {where}"
+        if after is not None:
+            sql += " AND (timestamp, id) < (?, ?)"
+            params += (after.timestamp, after.id)
+        return self.query(CALLS_DB, sql + " ORDER BY timestamp DESC, id DESC LIMIT ?", params + (limit,), Call)
+
+    def calls_page(self, call_type=None, after=None, limit=PAGE_SIZE):
+        """Calls of one type (None: all), newest first."""
+        if call_type is None:
+            return self._call_page("1", (), after, limit)
+        return self._call_page("type = ?", (call_type,), after, limit)
+
+    def number_calls_page(self, number, after=None, limit=PAGE_SIZE):
+        """Every logged call with number (any format of it), newest first."""
+        return self._call_page("number_norm = ?", (normalize(number),), after, limit)
+
+    def number_call_stats(self, number):
+        """{call type: CallStats(count, duration, last_timestamp)} for one number's logged calls."""
+        rows = self.query(
+            CALLS_DB,
+            "SELECT type, count(*), total(duration), max(timestamp) FROM calls WHERE number_norm = ? GROUP BY type",
+            (normalize(number),),
+        )
+        return {call_type: CallStats(count, int(duration), last) for call_type, count, duration, last in rows}
+
+    def call_timers(self):
+        """Lifetime seconds spent in dialed and received calls: {CALL_DIALED: s, CALL_RECEIVED: s}."""
+        counters = dict(self.query(CALLS_DB, "SELECT name, value FROM counters"))
+        return {call_type: int(counters.get(f"{call_type}_seconds", 0)) for call_type in (CALL_DIALED, CALL_RECEIVED)}
+
+    def reset_call_timers(self):
+        self.execute(CALLS_DB, "UPDATE counters SET value = 0 WHERE name != 'missed'")
+        self.notify(CALLS_DB, "reset")
+
+    def mark_missed_calls_seen(self):
+        self.execute(CALLS_DB, f"UPDATE calls SET is_new = 0 WHERE type = '{CALL_MISSED}' AND is_new = 1")
+        self.notify(CALLS_DB, "reset")
+
+    def delete_call(self, call_id):
+        self.execute(CALLS_DB, "DELETE FROM calls WHERE id = ?", (call_id,))
+        self.notify(CALLS_DB, "delete", call_id)
+
+    def clear_calls(self, call_type=None):
+        """Erases the calls of one type (None: the whole log). Timers are kept."""
+        if call_type is None:
+            self.execute(CALLS_DB, "DELETE FROM calls")
+        else:
+            self.execute(CALLS_DB, "DELETE FROM calls WHERE type = ?", (call_type,))
+        self.notify(CALLS_DB, "reset")
+
+    # --- SUMMARY ---
+    def _invalidate_summary(self, event, row_id):
+        self.summary_cache = None
+
+    def summary(self):
+        """
+        Counter snapshot for badges: {"unread", "missed_calls", "thread_unread": {thread_id: n}}.
+        Served from memory; re-read after writes made through this service, and at most every
+        SUMMARY_RECHECK seconds checks (PRAGMA data_version) whether another process wrote.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.summary_cache is not None and now - self.summary_checked < SUMMARY_RECHECK:
+                return self.summary_cache
+            self.summary_checked = now
+            version = (self.data_version(MESSAGES_DB), self.data_version(CALLS_DB))
+            if self.summary_cache is None or version != self.summary_version:
+                counters = dict(self.query(MESSAGES_DB, "SELECT name, value FROM counters"))
+                call_counters = dict(self.query(CALLS_DB, "SELECT name, value FROM counters"))
+                self.summary_cache = {
+                    "unread": counters.get("unread", 0),
+                    "missed_calls": call_counters.get("missed", 0),
+                    "thread_unread": dict(
+                        self.query(MESSAGES_DB, "SELECT thread_id, unread FROM thread_unread WHERE unread > 0")
+                    ),
+                }
+                self.summary_version = version
+            return self.summary_cache
+
+
+DATA = DataService()
+
+
+def get_data(ui):
+    """The UI's data service, or the process-wide one (isolated apps, tools)."""
+    return getattr(ui, "data", None) or DATA
@@ -0,0 +1,314 @@
+"""Idle-time database maintenance.
+
+Runs housekeeping on the user databases while nobody is using the phone:
+the display is blanked (see System.core.PowerManager) and the device is on
+external power. Per database, in order:
+
+- FTS index merge: merges full-text index segments (and drops the entries of
+  deleted rows) `FTS_MERGE_PAGES` pages at a time.
+- Incremental vacuum: marks the free pages left by deleted messages and
+  contacts for release, `VACUUM_CHUNK` pages at a time. Databases created
+  before auto_vacuum=INCREMENTAL was enabled are converted once, with a full
+  VACUUM. A conversion that runs out of budget is recorded and retried after
+  `vacuum_retry` seconds, doubling with every further failure.
+- `ANALYZE` (bounded by analysis_limit) if the database has no statistics yet,
+  else `PRAGMA optimize`. At most every `optimize_every` seconds.
+- `PRAGMA quick_check`, at most every `check_every` seconds. Problems are
+  logged and recorded in the state file.
+- `PRAGMA wal_checkpoint(TRUNCATE)`: folds the WAL back into the database
+  (which is when the vacuumed file actually shrinks) and empties the -wal file.
+
+Maintenance opens its own connections rather than sharing the DataService's,
+so the UI keeps reading (WAL) and never waits on DataService.lock behind it.
+Every statement runs under a time budget and is aborted through SQLite's
+progress handler once the budget is spent or `cancel()` is called, i.e. as
+soon as a key wakes the display. An aborted step rolls back and is retried on
+the next idle period, so maintenance never stalls the UI. A pass with a failed
+VACUUM is recorded as failed, not complete, and waits `run_every` all the same.
+
+Settings come from `/NeoDCT/User/maintenance.json` (seconds); last-run times
+are kept in `/NeoDCT/User/.db_maintenance.json`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from System.core.DataService import MIGRATIONS, PRAGMAS
+from System.core.PowerManager import SYSFS_ROOT
+
+CONFIG_PATH = "/NeoDCT/User/maintenance.json"
+STATE_PATH = "/NeoDCT/User/.db_maintenance.json"
+DEFAULT_CONFIG = {
+    "run_every": 3600,        # between complete runs
+    "step_budget": 2.0,       # per statement
+    "vacuum_budget": 30.0,    # one-time conversion to incremental auto_vacuum
+    "vacuum_retry": 86400,    # after a conversion ran out of budget; doubles per failure
+    "optimize_every": 86400,
+    "check_every": 7 * 86400,
+}
+MAX_VACUUM_BACKOFF = 4      # vacuum_retry doubles at most this many times
+VACUUM_CHUNK = 64           # pages per incremental_vacuum step
+FTS_MERGE_PAGES = 200       # pages per FTS5 'merge' step
+ANALYSIS_LIMIT = 400        # rows sampled per index by ANALYZE
+PROGRESS_OPS = 1000         # SQLite VM steps between budget/cancel checks
+FTS_TABLES = ("contacts_fts", "messages_fts")
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class Cancelled(Exception):
+    pass
+
+
+def load_config(path=CONFIG_PATH):
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[DBMAINT] Ignoring unreadable maintenance config: {e}")
+    return config
+
+
+def _read(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def on_external_power(sysfs_root=SYSFS_ROOT):
+    """True if a charger/mains supply is online or a battery reports Charging/Full.
+    Devices without any battery (dev boards, QEMU) count as mains powered."""
+    base = f"{sysfs_root}/class/power_supply"
+    try:
+        supplies = sorted(os.listdir(base))
+    except OSError:
+        return True
+    has_battery = False
+    for supply in supplies:
+        if _read(f"{base}/{supply}/type") == "Battery":
+            has_battery = True
+            if _read(f"{base}/{supply}/status") in ("Charging", "Full"):
+                return True
+        elif _read(f"{base}/{supply}/online") == "1":
+            return True
+    return not has_battery
+
+
+class DbMaintenance:
+    def __init__(self, data, sysfs_root=SYSFS_ROOT, config=None, state_path=STATE_PATH):
+        self.data = data
+        self.sysfs_root = sysfs_root
+        self.config = config if config is not None else load_config()
+        self.state_path = state_path
+        self.state = self._load_state()
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.deadline = 0.0
+        self.connections = {}  # name -> maintenance thread's own connection
+        self.failed = False    # a step of the current pass failed
+
+    # --- STATE ---
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_state(self):
+        try:
+            with open(self.state_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f)
+        except Exception as e:
+            print(f"[DBMAINT] Could not save maintenance state: {e}")
+
+    def _due(self, name, task, every):
+        return time.time() - self.state.get(name, {}).get(task, 0) >= every
+
+    def _done(self, name, task):
+        self.state.setdefault(name, {})[task] = int(time.time())
+
+    # --- SCHEDULING (UI thread) ---
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def service(self):
+        """Call periodically while the display is blanked; starts a run when one is due."""
+        if self.running:
+            return
+        every = self.config["run_every"]
+        if not (self._due("_run", "complete", every) and self._due("_run", "failed", every)):
+            return
+        if not on_external_power(self.sysfs_root):
+            return
+        self.cancel_event.clear()
+        self.thread = threading.Thread(target=self.run, name="db-maintenance", daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Stops a running pass within a few SQLite steps; blocks until its statement has unwound."""
+        if not self.running:
+            return
+        self.cancel_event.set()
+        self.thread.join()
+        print("[DBMAINT] Cancelled by user input")
+
+    # --- BUDGETED EXECUTION ---
+    def _progress(self):
+        # A non-zero return makes SQLite abort the statement ("interrupted").
+        return 1 if self.cancel_event.is_set() or time.monotonic() > self.deadline else 0
+
+    def _connection(self, name):
+        conn = self.connections.get(name)
+        if conn is None:
+            if name not in self.data.connections:
+                self.data.connection(name) # creates and migrates the database first
+            conn = sqlite3.connect(self.data.path(name))
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self.connections[name] = conn
+        return conn
+
+    def _close(self):
+        for conn in self.connections.values():
+            conn.close()
+        self.connections = {}
+
+    def _execute(self, name, sql, budget=None, script=False):
+        """
+        Runs one statement on the maintenance connection under a budget. Returns its rows.
+        script: run through executescript(), which steps the statement to completion
+        (needed for incremental_vacuum, which frees one page per step).
+        """
+        if self.cancel_event.is_set():
+            raise Cancelled()
+        conn = self._connection(name)
+        self.deadline = time.monotonic() + (budget or self.config["step_budget"])
+        conn.set_progress_handler(self._progress, PROGRESS_OPS)
+        try:
+            rows = (conn.executescript(sql) if script else conn.execute(sql)).fetchall()
+            if conn.in_transaction:
+                conn.commit()
+            return rows
+        except sqlite3.OperationalError as e:
+            if "interrupted" not in str(e) and "locked" not in str(e):
+                raise
+            if conn.in_transaction:
+                conn.rollback()
+            if self.cancel_event.is_set():
+                raise Cancelled()
+            print(f"[DBMAINT] {name}: '{sql}' ran out of budget ({e})")
+            return None
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    # --- TASKS ---
+    def checkpoint(self, name):
+        wal_path = self.data.path(name) + "-wal"
+        wal_bytes = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+        rows = self._execute(name, "PRAGMA wal_checkpoint(TRUNCATE)")
+        if rows and rows[0][0]:
+            print(f"[DBMAINT] {name}: checkpoint blocked by a reader")
+        elif rows and wal_bytes:
+            print(f"[DBMAINT] {name}: checkpointed and truncated {wal_bytes // 1024} KiB of WAL")
+
+    def vacuum(self, name):
+        auto_vacuum = self._execute(name, "PRAGMA auto_vacuum")[0][0]
+        if auto_vacuum != AUTO_VACUUM_INCREMENTAL:
+            # Only takes effect through a full VACUUM; done once, with a bigger budget.
+            failures = self.state.get(name, {}).get("vacuum_failures", 0)
+            retry = self.config["vacuum_retry"] * 2 ** min(failures - 1, MAX_VACUUM_BACKOFF)
+            if failures and not self._due(name, "vacuum_failed", retry):
+                return
+            self._execute(name, "PRAGMA auto_vacuum=INCREMENTAL")
+            if self._execute(name, "VACUUM", budget=self.config["vacuum_budget"]) is None:
+                self._done(name, "vacuum_failed")
+                self.state[name]["vacuum_failures"] = failures + 1
+                self.failed = True
+                return
+            self.state.get(name, {}).pop("vacuum_failures", None)
+            print(f"[DBMAINT] {name}: converted to incremental auto_vacuum")
+            return
+        freed = 0
+        while True:
+            free_pages = self._execute(name, "PRAGMA freelist_count")[0][0]
+            if not free_pages:
+                break
+            if self._execute(name, f"PRAGMA incremental_vacuum({VACUUM_CHUNK})", script=True) is None:
+                break
+            freed += min(free_pages, VACUUM_CHUNK)
+        if freed:
+            print(f"[DBMAINT] {name}: released {freed} free pages")
+
+    def merge_fts(self, name):
+        for table in FTS_TABLES:
+            if not self._execute(name, f"SELECT 1 FROM sqlite_master WHERE name = '{table}'"):
+                continue
+            steps = 0
+            while True:
+                before = self._execute(name, "SELECT total_changes()")[0][0]
+                # Negative: keep merging down to a single segment, not just full levels.
+                merge = f"INSERT INTO {table} ({table}, rank) VALUES ('merge', -{FTS_MERGE_PAGES})"
+                if self._execute(name, merge) is None:
+                    break
+                # 'merge' writes nothing once the index is fully merged.
+                if self._execute(name, "SELECT total_changes()")[0][0] - before <= 1:
+                    break
+                steps += 1
+            if steps:
+                print(f"[DBMAINT] {name}: merged {table} in {steps} steps")
+
+    def optimize(self, name):
+        if not self._due(name, "optimize", self.config["optimize_every"]):
+            return
+        if self._execute(name, "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"):
+            done = self._execute(name, "PRAGMA optimize") is not None
+        else:
+            self._execute(name, f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+            done = self._execute(name, "ANALYZE") is not None
+        if done:
+            self._done(name, "optimize")
+            print(f"[DBMAINT] {name}: statistics updated")
+
+    def quick_check(self, name):
+        if not self._due(name, "quick_check", self.config["check_every"]):
+            return
+        rows = self._execute(name, "PRAGMA quick_check")
+        if rows is None:
+            return
+        problems = [row[0] for row in rows if row[0] != "ok"]
+        self._done(name, "quick_check")
+        self.state[name]["problems"] = problems[:10]
+        if problems:
+            print(f"[DBMAINT] {name}: quick_check found {len(problems)} problems, first: {problems[0]}")
+        else:
+            print(f"[DBMAINT] {name}: quick_check ok")
+
+    def run(self):
+        """One full pass over every database (runs on the maintenance thread)."""
+        started = time.monotonic()
+        self.failed = False
+        try:
+            for name in MIGRATIONS:
+                for task in (self.merge_fts, self.vacuum, self.optimize, self.quick_check, self.checkpoint):
+                    task(name)
+            self._done("_run", "failed" if self.failed else "complete")
+            print(f"[DBMAINT] Pass {'failed' if self.failed else 'finished'} in {time.monotonic() - started:.1f}s")
+        except Cancelled:
+            pass
+        except Exception as e:
+            self._done("_run", "failed")
+            print(f"[DBMAINT] Pass failed: {e!r}")
+        finally:
+            self._close()
+            self._save_state()
@@ -0,0 +1,47 @@
+"""Linux framebuffer driver (/dev/fb0, memory-mapped).
+
+Kept apart from `System.core.main` so the launcher can open the display and
+draw the boot splash before the UI, its services, sqlite3 and the app
+framework are imported.
+"""
+
+import fcntl
+import mmap
+import os
+import struct
+
+from PIL import Image
+
+FB_PATH = "/dev/fb0"
+
+class Framebuffer:
+    def __init__(self):
+        self.fd = os.open(FB_PATH, os.O_RDWR)
+        
+        # Get Screen Info
+        vinfo = fcntl.ioctl(self.fd, 0x4600, b'\0'*160)
+        self.xres, self.yres = struct.unpack_from("II", vinfo, 0)
+        self.bpp = struct.unpack_from("I", vinfo, 24)[0]
+        
+        # Get Line Length (Stride)
+        finfo = fcntl.ioctl(self.fd, 0x4602, b'\0'*64)
+        self.line_length = struct.unpack_from("I", finfo, 48)[0]
+        if self.line_length == 0: self.line_length = self.xres * (self.bpp // 8)
+
+        self.size = self.line_length * self.yres
+        self.mm = mmap.mmap(self.fd, self.size, mmap.MAP_SHARED, mmap.PROT_WRITE | mmap.PROT_READ)
+
+    def update(self, pil_image):
+        stride_pixels = self.line_length // (self.bpp // 8)
+        
+        if self.bpp == 32:
+            native_img = Image.new("RGB", (stride_pixels, self.yres), "black")
+            native_img.paste(pil_image, (0, 0))
+            data = native_img.convert("RGBA").tobytes("raw", "BGRA")
+        elif self.bpp == 16:
+            native_img = Image.new("RGB", (stride_pixels, self.yres), "black")
+            native_img.paste(pil_image, (0, 0))
+            data = native_img.convert("RGB").tobytes("raw", "BGR;16")
+            
+        self.mm.seek(0)
+        self.mm.write(data[:self.size])
@@ -0,0 +1,216 @@
+"""Memory budget monitor.
+
+The UI, mpv and the WebKit browser share 1 GB of RAM. This service:
+
+- samples RSS/PSS of the UI process and all of its child processes,
+- watches kernel memory pressure (PSI trigger on /proc/pressure/memory, or
+  MemAvailable polling on kernels without PSI or when the trigger fails) on a
+  background thread,
+- asks registered caches to shrink, one priority tier per pressure event:
+  the cheapest-to-rebuild tier first, the next tier only if pressure comes
+  back within ESCALATE_WITHIN seconds, so a single spike does not throw away
+  the app modules and page cache.
+
+Shedding is requested from the watcher thread but performed by `service()`,
+which the main loop calls, so caches are only touched from the UI thread.
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import threading
+import time
+
+PROC_ROOT = "/proc"
+PSI_TRIGGER = "some 150000 1000000"   # 150 ms of stall within 1 s
+LOW_MEMORY_BYTES = 96 * 1024 * 1024   # fallback threshold when PSI is unavailable
+POLL_INTERVAL = 5.0
+ESCALATE_WITHIN = 30.0                # seconds; pressure again within this sheds the next tier
+
+
+class MemoryMonitor:
+    def __init__(self, proc_root=PROC_ROOT, low_memory_bytes=LOW_MEMORY_BYTES):
+        self.proc_root = proc_root
+        self.low_memory_bytes = low_memory_bytes
+        self.caches = []  # (priority, name, size_fn, shrink_fn)
+        self.pressure = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.shed_count = 0
+        self.tier = 0          # index into the sorted priorities shed by the last event
+        self.last_shed = None  # time.monotonic() of the last pressure event
+
+    # --- CACHE REGISTRY ---
+    def register(self, name, size_fn, shrink_fn, priority=50):
+        """
+        size_fn() returns the cache's size in bytes (or None if unknown).
+        shrink_fn() empties or trims the cache.
+        Lower priority numbers are shed first.
+        """
+        self.caches.append((priority, name, size_fn, shrink_fn))
+        self.caches.sort(key=lambda c: c[0])
+
+    def cache_sizes(self):
+        sizes = {}
+        for _, name, size_fn, _ in self.caches:
+            try:
+                sizes[name] = size_fn()
+            except Exception:
+                sizes[name] = None
+        return sizes
+
+    def shed(self, target_bytes=None, priority=None):
+        """
+        Shrinks caches in priority order until target_bytes were freed (all if None).
+        priority: only shrink the caches registered with that priority.
+        """
+        freed = 0
+        for cache_priority, name, size_fn, shrink_fn in self.caches:
+            if priority is not None and cache_priority != priority:
+                continue
+            if target_bytes is not None and freed >= target_bytes:
+                break
+            try:
+                before = size_fn() or 0
+                shrink_fn()
+                after = size_fn() or 0
+            except Exception as e:
+                print(f"[MEM] Could not shrink {name}: {e}")
+                continue
+            freed += max(0, before - after)
+            print(f"[MEM] Shrunk {name}: {before // 1024} KiB -> {after // 1024} KiB")
+        self.shed_count += 1
+        return freed
+
+    # --- SAMPLING ---
+    def _read_kib(self, path, key):
+        try:
+            with open(path, "r") as f:
+                for line in f:
+                    if line.startswith(key):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return None
+
+    def _children(self, pid):
+        """Returns all descendant pids of pid by scanning /proc/*/stat."""
+        parents = {}
+        try:
+            entries = os.listdir(self.proc_root)
+        except OSError:
+            return []
+        for entry in entries:
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"{self.proc_root}/{entry}/stat", "r") as f:
+                    stat = f.read()
+                # comm may contain spaces; ppid is the 2nd field after ')'
+                ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            except (OSError, ValueError, IndexError):
+                continue
+            parents.setdefault(ppid, []).append(int(entry))
+
+        out = []
+        stack = [pid]
+        while stack:
+            for child in parents.get(stack.pop(), []):
+                out.append(child)
+                stack.append(child)
+        return out
+
+    def sample_process(self, pid):
+        base = f"{self.proc_root}/{pid}"
+        try:
+            with open(f"{base}/comm", "r") as f:
+                name = f.read().strip()
+        except OSError:
+            name = "?"
+        return {
+            "pid": pid,
+            "name": name,
+            "rss": self._read_kib(f"{base}/status", "VmRSS:"),
+            "pss": self._read_kib(f"{base}/smaps_rollup", "Pss:"),
+        }
+
+    def sample(self):
+        """Returns memory figures for the UI, its children and the caches (bytes)."""
+        pid = os.getpid()
+        return {
+            "ui": self.sample_process(pid),
+            "children": [self.sample_process(child) for child in self._children(pid)],
+            "mem_available": self._read_kib(f"{self.proc_root}/meminfo", "MemAvailable:"),
+            "caches": self.cache_sizes(),
+        }
+
+    def report(self):
+        snapshot = self.sample()
+        for proc in [snapshot["ui"]] + snapshot["children"]:
+            rss = (proc["rss"] or 0) // 1024
+            pss = (proc["pss"] or 0) // 1024
+            print(f"[MEM] {proc['name']} ({proc['pid']}): RSS {rss} KiB, PSS {pss} KiB")
+        for name, size in snapshot["caches"].items():
+            print(f"[MEM] cache {name}: {'n/a' if size is None else f'{size // 1024} KiB'}")
+        return snapshot
+
+    # --- PRESSURE WATCHER ---
+    def _watch_psi(self):
+        """Waits on the PSI trigger until stopped. Returns False if PSI is unavailable or the trigger fails."""
+        try:
+            fd = os.open(f"{self.proc_root}/pressure/memory", os.O_RDWR | os.O_NONBLOCK)
+            os.write(fd, PSI_TRIGGER.encode() + b"\0")
+        except OSError:
+            print("[MEM] PSI unavailable, polling MemAvailable.")
+            return False
+
+        poller = select.poll()
+        poller.register(fd, select.POLLPRI)
+        try:
+            while not self.stop_event.is_set():
+                for _, event in poller.poll(1000):
+                    if event & select.POLLERR:
+                        # The trigger is gone (e.g. the cgroup or PSI was torn down); don't go blind.
+                        print("[MEM] PSI trigger failed, polling MemAvailable.")
+                        return False
+                    if event & select.POLLPRI:
+                        self.pressure.set()
+        finally:
+            os.close(fd)
+        return True
+
+    def _watch_meminfo(self):
+        while not self.stop_event.wait(POLL_INTERVAL):
+            available = self._read_kib(f"{self.proc_root}/meminfo", "MemAvailable:")
+            if available is not None and available < self.low_memory_bytes:
+                self.pressure.set()
+
+    def _watch(self):
+        if not self._watch_psi():
+            self._watch_meminfo()
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._watch, name="memory-monitor", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def service(self):
+        """Call from the UI loop: sheds one cache tier if pressure was signalled. Returns bytes freed."""
+        if not self.pressure.is_set():
+            return 0
+        self.pressure.clear()
+        tiers = sorted({cache[0] for cache in self.caches})
+        if not tiers:
+            return 0
+        now = time.monotonic()
+        if self.last_shed is None or now - self.last_shed > ESCALATE_WITHIN:
+            self.tier = 0
+        else:
+            self.tier = min(self.tier + 1, len(tiers) - 1)
+        self.last_shed = now
+        print(f"[MEM] Memory pressure, shedding priority {tiers[self.tier]} caches...")
+        return self.shed(priority=tiers[self.tier])
@@ -0,0 +1,152 @@
+"""Group-commit ingest queue for incoming messages.
+
+A modem burst (reconnect backlog, a flood of concatenated parts) would
+otherwise cost one transaction, and one WAL append plus lock round trip, per
+message. Producers call `submit()`, which only appends to a queue; a writer
+thread takes the first queued message, keeps collecting for up to `window_ms`
+or until `max_batch` messages are waiting, and stores the batch with a single
+`DataService.add_messages()` transaction.
+
+Change notifications (and each message's `on_stored` callback) are sent only
+after the commit, through `dispatch`. The UI passes its runtime's
+`call_soon_threadsafe`, so listeners run on the UI thread and nothing is drawn
+from the writer thread.
+
+Settings come from `/NeoDCT/User/ingest.json`:
+
+    {"window_ms": 50, "max_batch": 32, "durability": "normal"}
+
+- "normal": WAL with synchronous=NORMAL like every other write. A committed
+  batch survives the UI crashing; a power cut can lose batches committed since
+  the last checkpoint.
+- "full": each batch commit is fsynced (synchronous=FULL), so a message is on
+  flash before `on_stored` fires. That is one fsync per batch, not per message.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+
+from System.core.DataService import INCOMING, MESSAGES_DB, RECEIVED
+
+CONFIG_PATH = "/NeoDCT/User/ingest.json"
+DEFAULT_CONFIG = {"window_ms": 50, "max_batch": 32, "durability": "normal"}
+DURABILITY_MODES = ("normal", "full")
+COMMIT_RETRIES = 3
+RETRY_DELAY = 0.2  # seconds; doubled per attempt
+
+
+def load_config(path=CONFIG_PATH):
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[INGEST] Ignoring unreadable ingest config: {e}")
+    if config["durability"] not in DURABILITY_MODES:
+        print(f"[INGEST] Unknown durability {config['durability']!r}, using 'normal'")
+        config["durability"] = "normal"
+    return config
+
+
+def _call(callback, *args):
+    try:
+        callback(*args)
+    except Exception as e:
+        print(f"[INGEST] Callback failed: {e!r}")
+
+
+class MessageIngest:
+    def __init__(self, data, dispatch=None, config=None):
+        """dispatch(callback, *args) delivers post-commit callbacks; default calls them on the writer thread."""
+        self.data = data
+        self.dispatch = dispatch or _call
+        self.config = config if config is not None else load_config()
+        self.window = self.config["window_ms"] / 1000.0
+        self.max_batch = max(1, int(self.config["max_batch"]))
+        self.durable = self.config["durability"] == "full"
+        self.queue = queue.Queue()
+        self.thread = None
+        self.pid = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.stored = 0
+
+    # --- PRODUCER SIDE ---
+    def submit(self, sender, body, timestamp=None, on_stored=None):
+        """
+        Queues an incoming message; returns immediately.
+        on_stored(message_id) is dispatched once the message is committed
+        (message_id None if it could not be stored).
+        """
+        self._ensure_writer()
+        self.queue.put((sender, body, int(time.time()) if timestamp is None else timestamp, on_stored))
+
+    def flush(self):
+        """Blocks until every message submitted so far has been committed (or dropped)."""
+        if self.thread is not None and self.pid == os.getpid():
+            self.queue.join()
+
+    # --- WRITER ---
+    def _ensure_writer(self):
+        with self.lock:
+            if self.thread is not None and self.pid == os.getpid() and self.thread.is_alive():
+                return
+            # Started lazily, and again in a forked child (threads don't survive fork()).
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self._run, name="message-ingest", daemon=True)
+            self.thread.start()
+
+    def _collect(self):
+        """Blocks for the first message, then gathers more until the window closes or the batch is full."""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, batch):
+        rows = [(INCOMING, RECEIVED, body, sender, timestamp, False) for sender, body, timestamp, _ in batch]
+        delay = RETRY_DELAY
+        for attempt in range(1, COMMIT_RETRIES + 1):
+            try:
+                return self.data.add_messages(rows, durable=self.durable)
+            except Exception as e:
+                print(f"[INGEST] Commit of {len(rows)} messages failed (attempt {attempt}): {e!r}")
+                if attempt < COMMIT_RETRIES:
+                    time.sleep(delay)
+                    delay *= 2
+        return None
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                ids = self._commit(batch)
+                if ids is None:
+                    print(f"[INGEST] Dropped {len(batch)} messages")
+                    ids = [None] * len(batch)
+                else:
+                    self.batches += 1
+                    self.stored += len(ids)
+                    print(f"[INGEST] Stored {len(ids)} messages in one commit")
+                for message_id, (_, _, _, on_stored) in zip(ids, batch):
+                    if message_id is not None:
+                        self.dispatch(self.data.notify, MESSAGES_DB, "insert", message_id)
+                    if on_stored is not None:
+                        self.dispatch(on_stored, message_id)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
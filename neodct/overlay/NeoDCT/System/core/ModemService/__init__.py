@@ -1,16 +1,590 @@
+"""AT-command modem engine (SIMCom SIM7600).
+
+Talks to the modem's AT port from the UI runtime's event loop: the serial fd
+is registered with `loop.add_reader()`, writes are non-blocking, and nothing
+ever waits on the modem from the UI thread.
+
+- `command()` queues an AT command and returns a future for its information
+  lines; it fails with `ModemError` on an error result and `ModemTimeout` when
+  no final result arrives within the command's timeout. One command line is on
+  the wire at a time.
+- Independent read-only queries (`query()`) that are queued together share one
+  command line ("AT+CSQ;+CREG?") and one round trip; their responses are picked
+  apart by prefix. If the combined line fails, each query is retried alone.
+- Echo stays on (ATE1) and a response only counts once its command's echo has
+  been seen, so a late answer to a command that already timed out is dropped
+  instead of being taken for the next command's.
+- Unsolicited result codes are dispatched as they arrive: RING / +CLIP and the
+  SIM7600's "VOICE CALL:" / "MISSED_CALL:" drive the call state (and the call
+  log, see `_log_call`); +CMTI fetches the new SMS and hands it to the "sms"
+  listeners, deleting it from the SIM once a listener has stored it; +CREG and
+  +CSQ (AT+AUTOCSQ) update `registration` and `signal`. Listeners are added
+  with `subscribe()` and run on the event loop.
+- SMS are read in PDU mode (see `pdu.py`): the line after a +CMGR / +CMGL
+  header is always the message's hex PDU, so a body reading "OK" or "RING"
+  is never taken for a result code or URC, and the data coding scheme says
+  how to decode it. Messages are read without changing their status, so one
+  that could not be stored stays unread and is listed again at the next boot.
+
+The port comes from `/NeoDCT/User/modem.json`:
+
+    {"port": "/dev/ttyUSB2", "baud": 115200, "timeout": 5, "dial_timeout": 30, "signal_poll": 60}
+
+or `NEODCT_MODEM_PORT`. Without a modem (QEMU, dev boards) the service runs in
+simulation mode: calls connect immediately and no commands are sent. To test
+against a fake modem on a pty, see System/tools/debug_fake_modem.py.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import os
+import re
+import termios
+import time
+import tty
+from collections import deque
+
+from System.core.DataService import CALL_DIALED, CALL_MISSED, CALL_RECEIVED
+from System.core.ModemService.pdu import decode_deliver
+
+MODEM_PORT = os.environ.get("NEODCT_MODEM_PORT", "/dev/ttyUSB2")  # SIM7600 AT command port
+CONFIG_PATH = "/NeoDCT/User/modem.json"
+DEFAULT_CONFIG = {"port": MODEM_PORT, "baud": 115200, "timeout": 5.0, "dial_timeout": 30.0, "signal_poll": 60}
+MAX_PIPELINE = 4  # queries per command line
+READ_SIZE = 1024
+
+INIT_COMMANDS = (
+    "AT+CMEE=1",          # numeric +CME ERROR codes
+    "AT+CLIP=1",          # caller id after RING
+    "AT+CMGF=0",          # SMS PDU mode
+    "AT+CNMI=2,1,0,0,0",  # +CMTI when an SMS is stored
+    "AT+CREG=1",          # +CREG on registration changes
+    "AT+AUTOCSQ=1,1",     # +CSQ on signal changes (SIM7600)
+)
+ERROR_RESULTS = ("ERROR", "+CME ERROR:", "+CMS ERROR:")
+CALL_RESULTS = ("NO CARRIER", "BUSY", "NO ANSWER", "NO DIALTONE")  # final results of ATD / ATA
+URC_PREFIXES = ("RING", "+CLIP:", "+CMTI:", "+CREG:", "+CSQ:", "NO CARRIER", "VOICE CALL:", "MISSED_CALL:")
+PDU_PREFIXES = ("+CMGR", "+CMGL")  # each of their information lines is followed by a PDU line
+
+
+class ModemError(Exception):
+    """A command ended with an error result (the exception's message)."""
+
+
+class ModemTimeout(ModemError):
+    pass
+
+
+def load_config(path=CONFIG_PATH):
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[MODEM] Ignoring unreadable modem config: {e}")
+    return config
+
+
+def open_serial(path, baud):
+    """Opens a tty raw and non-blocking at baud."""
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    try:
+        tty.setraw(fd)
+        attrs = termios.tcgetattr(fd)
+        speed = getattr(termios, f"B{baud}")
+        attrs[4] = attrs[5] = speed  # ispeed, ospeed
+        attrs[2] |= termios.CLOCAL | termios.CREAD
+        termios.tcsetattr(fd, termios.TCSANOW, attrs)
+        termios.tcflush(fd, termios.TCIOFLUSH)
+    except Exception:
+        os.close(fd)
+        raise
+    return fd
+
+
+def _fields(line):
+    """Parameters of an information line: '+CREG: 1,"00C3","0102"' -> ["1", "00C3", "0102"]."""
+    return next(csv.reader([line.partition(":")[2].strip()]), [])
+
+
+class Command:
+    __slots__ = ("text", "prefix", "query", "call", "timeout", "future", "lines")
+
+    def __init__(self, text, prefix, query, call, timeout, future):
+        self.text = text
+        self.prefix = prefix    # information lines starting with this belong to the command
+        self.query = query      # independent query: may share a command line
+        self.call = call        # ATD / ATA: "NO CARRIER", "BUSY"... are its final result
+        self.timeout = timeout
+        self.future = future
+        self.lines = []
+
+
+class InFlight:
+    """The command line on the wire and the commands it carries."""
+
+    def __init__(self, line, commands, echoed, timer):
+        self.line = line
+        self.commands = commands
+        self.echoed = echoed
+        self.timer = timer
+        self.current = commands[0]  # gets unprefixed lines
+        self.pdu_for = None  # command whose +CMGR / +CMGL header was just read: the next line is its PDU
+
+    def claim(self, line):
+        for command in self.commands:
+            if command.prefix and line.startswith(command.prefix + ":"):
+                self.current = command
+                if command.prefix in PDU_PREFIXES:
+                    self.pdu_for = command
+                return command
+        return None
+
+
 class ModemService:
-    def __init__(self):
+    def __init__(self, data=None, config=None):
         print("[MODEM] Initializing ModemService...")
-        # Stub for QEMU / Dev Environment
-        print("[MODEM] HARDWARE NOT FOUND: Running in Simulation Mode.")
-        print("[MODEM] This message is a stub for our current QEMU Dev Enviroment.")
+        self.config = config if config is not None else load_config()
         self.state = "IDLE" # IDLE, CALLING, RINGING, CONNECTED
+        self.data = data  # DataService the call log is written to (None: calls aren't logged)
+        self.call = None  # current call: {"type", "number", "started", "connected"}
+        self.signal = None  # +CSQ rssi 0-31, None unknown
+        self.registration = None  # +CREG stat (1 home, 5 roaming)
+        self.listeners = {}
+        self.loop = None
+        self.fd = None
+        self.pending = deque()
+        self.inflight = None
+        self.echo = False  # until ATE1 has been answered
+        self.rx = b""
+        self.tx = b""
+        self.writing = False
+        self.pump_scheduled = False
+        self.tasks = set()
+        self.simulated = not os.path.exists(self.config["port"])
+        if self.simulated:
+            print(f"[MODEM] HARDWARE NOT FOUND ({self.config['port']}): Running in Simulation Mode.")
+
+    # --- LIFECYCLE ---
+    def start(self, loop):
+        """Opens the port on loop (the UI runtime's) and starts the init sequence. No-op in simulation."""
+        if self.simulated or self.fd is not None:
+            return
+        try:
+            self.fd = open_serial(self.config["port"], self.config["baud"])
+        except (OSError, AttributeError, termios.error) as e:
+            print(f"[MODEM] Cannot open {self.config['port']} ({e!r}): Running in Simulation Mode.")
+            self.simulated = True
+            return
+        self.loop = loop
+        loop.add_reader(self.fd, self._on_readable)
+        print(f"[MODEM] Opened {self.config['port']} at {self.config['baud']} baud")
+        self._spawn(self._initialize())
+
+    def close(self):
+        if self.fd is None:
+            return
+        self.loop.remove_reader(self.fd)
+        if self.writing:
+            self.loop.remove_writer(self.fd)
+            self.writing = False
+        os.close(self.fd)
+        self.fd = None
+        for command in self.pending:
+            self._fail(command, ModemError("modem closed"))
+        self.pending.clear()
+        if self.inflight is not None:
+            self.inflight.timer.cancel()
+            for command in self.inflight.commands:
+                self._fail(command, ModemError("modem closed"))
+            self.inflight = None
+        for task in list(self.tasks):
+            task.cancel()
+
+    def _spawn(self, coro):
+        task = self.loop.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"[MODEM] Background task failed: {task.exception()!r}")
+
+    async def _initialize(self):
+        try:
+            await self.command("ATE1")
+        except ModemError as e:
+            print(f"[MODEM] No answer to ATE1 ({e!r})")
+        self.echo = True
+        for text in INIT_COMMANDS:
+            try:
+                await self.command(text)
+            except ModemError as e:
+                print(f"[MODEM] {text} failed: {e}")
+        await self.refresh_status()
+        await self._fetch_unread_messages()
+        while self.config["signal_poll"]:
+            await asyncio.sleep(self.config["signal_poll"])
+            await self.refresh_status()
 
+    # --- LISTENERS ---
+    def subscribe(self, event, callback):
+        """
+        callback runs on the event loop for: "ring" (number or None), "call_ended" (),
+        "signal" (rssi or None), "registration" (stat), and
+        "sms" (sender, body, timestamp, on_stored): call on_stored(message_id) once the
+        message is safely stored; a non-None id deletes it from the SIM.
+        """
+        self.listeners.setdefault(event, []).append(callback)
+
+    def notify(self, event, *args):
+        for callback in self.listeners.get(event, ()):
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"[MODEM] Listener for {event} failed: {e!r}")
+
+    # --- COMMANDS ---
+    def command(self, text, timeout=None, prefix=None, query=False, call=False):
+        """
+        Queues an AT command ("AT+CSQ"); returns a future for its information lines.
+        prefix: information lines starting with it are the command's (default: its name, "+CSQ").
+        """
+        if self.fd is None:
+            raise ModemError("modem not open")
+        if prefix is None:
+            m = re.match(r"AT([+^$][A-Z0-9]+)", text.upper())
+            prefix = m.group(1) if m else None
+        future = self.loop.create_future()
+        self.pending.append(
+            Command(text, prefix, query, call, timeout or self.config["timeout"], future)
+        )
+        if not query:
+            self._pump()
+        elif not self.pump_scheduled:
+            # Give queries issued together (asyncio.gather) a chance to share the line.
+            self.pump_scheduled = True
+            self.loop.call_soon(self._pump)
+        return future
+
+    def query(self, text, timeout=None):
+        """An independent read-only command; may be pipelined with other queued queries."""
+        return self.command(text, timeout, query=True)
+
+    def _send(self, text, on_ok=None, on_error=None, **kwargs):
+        """Fire-and-forget command: results go to the callbacks, failures are logged."""
+        def done(future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                if on_ok:
+                    on_ok(future.result())
+                return
+            print(f"[MODEM] {text} failed: {error!r}")
+            if on_error:
+                on_error(error)
+        self.command(text, **kwargs).add_done_callback(done)
+
+    def _pump(self):
+        """Writes the next command line if the modem is free."""
+        self.pump_scheduled = False
+        if self.inflight is not None or not self.pending or self.fd is None:
+            return
+        commands = [self.pending.popleft()]
+        if commands[0].query:
+            prefixes = {commands[0].prefix}
+            while (len(commands) < MAX_PIPELINE and self.pending and self.pending[0].query
+                   and self.pending[0].prefix not in prefixes):
+                prefixes.add(self.pending[0].prefix)
+                commands.append(self.pending.popleft())
+        line = commands[0].text + "".join(";" + command.text[2:] for command in commands[1:])
+        timer = self.loop.call_later(max(command.timeout for command in commands), self._on_timeout)
+        self.inflight = InFlight(line, commands, not self.echo, timer)
+        self._write(line.encode("ascii", "replace") + b"\r")
+
+    def _write(self, data):
+        self.tx += data
+        self._flush_tx()
+
+    def _flush_tx(self):
+        try:
+            written = os.write(self.fd, self.tx)
+        except BlockingIOError:
+            written = 0
+        except OSError as e:
+            print(f"[MODEM] Write failed: {e!r}")
+            written = len(self.tx)
+        self.tx = self.tx[written:]
+        if self.tx and not self.writing:
+            self.loop.add_writer(self.fd, self._flush_tx)
+            self.writing = True
+        elif not self.tx and self.writing:
+            self.loop.remove_writer(self.fd)
+            self.writing = False
+
+    @staticmethod
+    def _resolve(command, lines):
+        if not command.future.done():
+            command.future.set_result(lines)
+
+    @staticmethod
+    def _fail(command, error):
+        if not command.future.done():
+            command.future.set_exception(error)
+
+    def _complete(self, result):
+        inflight, self.inflight = self.inflight, None
+        inflight.timer.cancel()
+        if result == "OK":
+            for command in inflight.commands:
+                self._resolve(command, command.lines)
+        elif len(inflight.commands) > 1:
+            # Can't tell which query failed: retry each on its own line.
+            for command in reversed(inflight.commands):
+                command.query = False
+                command.lines = []
+                self.pending.appendleft(command)
+        else:
+            self._fail(inflight.commands[0], ModemError(result))
+        self._pump()
+
+    def _on_timeout(self):
+        inflight, self.inflight = self.inflight, None
+        print(f"[MODEM] {inflight.line} timed out")
+        for command in inflight.commands:
+            self._fail(command, ModemTimeout(inflight.line))
+        self._pump()
+
+    # --- RECEIVING ---
+    def _on_readable(self):
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"[MODEM] Read failed ({e!r}), closing the port")
+            self.close()
+            return
+        *lines, self.rx = re.split(rb"[\r\n]+", self.rx + data)
+        for line in lines:
+            line = line.decode("utf-8", "replace").strip()
+            if line:
+                self._on_line(line)
+
+    def _on_line(self, line):
+        inflight = self.inflight
+        if inflight is not None and inflight.pdu_for is not None:
+            # Message data, whatever it looks like: never a result code, echo or URC.
+            inflight.pdu_for.lines.append(line)
+            inflight.pdu_for = None
+            return
+        if inflight is not None and line.upper() == inflight.line.upper():
+            inflight.echoed = True
+            return
+        if inflight is not None and inflight.echoed:
+            if line == "OK" or line.startswith(ERROR_RESULTS):
+                self._complete(line)
+                return
+            if line in CALL_RESULTS and any(command.call for command in inflight.commands):
+                self._complete(line)
+                return
+            command = inflight.claim(line)
+            if command is None and not line.startswith(URC_PREFIXES):
+                command = inflight.current
+            if command is not None:
+                command.lines.append(line)
+                return
+        if line.startswith(URC_PREFIXES):
+            self._on_urc(line)
+        else:
+            print(f"[MODEM] Dropping unexpected line: {line!r}")
+
+    def _on_urc(self, line):
+        if line == "RING":
+            if self.state == "IDLE":
+                self.incoming(None)
+            self.notify("ring", self.call["number"] if self.call else None)
+        elif line.startswith("+CLIP:"):
+            number = (_fields(line) or [""])[0]
+            if self.call and self.call["type"] == CALL_RECEIVED and not self.call["number"] and number:
+                self.call["number"] = number
+                self.notify("ring", number)
+        elif line.startswith("VOICE CALL: BEGIN"):
+            self._connected()
+        elif line.startswith(("VOICE CALL: END", "NO CARRIER", "MISSED_CALL:")):
+            if line.startswith("MISSED_CALL:") and self.call and not self.call["number"]:
+                self.call["number"] = line.split()[-1]  # "MISSED_CALL: 10:11AM 5551234"
+            self._call_ended()
+        elif line.startswith("+CMTI:"):
+            fields = _fields(line)
+            if len(fields) >= 2 and fields[1].isdigit():
+                self._spawn(self._fetch_message(int(fields[1])))
+        elif line.startswith("+CREG:"):
+            self._set_registration(_fields(line)[0])
+        elif line.startswith("+CSQ:"):
+            self._set_signal(line)
+
+    # --- STATUS ---
+    def _set_signal(self, line):
+        try:
+            rssi = int(_fields(line)[0])
+        except (IndexError, ValueError):
+            return
+        signal = None if rssi == 99 else rssi
+        if signal != self.signal:
+            self.signal = signal
+            self.notify("signal", signal)
+
+    def _set_registration(self, stat):
+        try:
+            stat = int(stat)
+        except ValueError:
+            return
+        if stat != self.registration:
+            self.registration = stat
+            print(f"[MODEM] Registration status {stat}")
+            self.notify("registration", stat)
+
+    async def refresh_status(self):
+        """Signal quality and network registration, fetched as one pipelined command line."""
+        csq, creg = await asyncio.gather(self.query("AT+CSQ"), self.query("AT+CREG?"), return_exceptions=True)
+        if isinstance(csq, list) and csq:
+            self._set_signal(csq[0])
+        if isinstance(creg, list) and creg:
+            fields = _fields(creg[0])  # solicited form: "+CREG: <n>,<stat>"
+            if len(fields) >= 2:
+                self._set_registration(fields[1])
+
+    @property
+    def registered(self):
+        return self.registration in (1, 5)
+
+    def signal_bars(self):
+        """0-4 bars for the home screen, or None in simulation mode."""
+        if self.simulated:
+            return None
+        if self.signal is None:
+            return 0
+        return sum(self.signal >= threshold for threshold in (2, 10, 15, 20))
+
+    # --- SMS ---
+    # ",1": read without marking REC READ, so a message that fails to store is listed again.
+    async def _fetch_message(self, index):
+        try:
+            lines = await self.command(f"AT+CMGR={index},1")
+        except ModemError as e:
+            print(f"[MODEM] Could not read SMS {index}: {e!r}")
+            return
+        if len(lines) >= 2:  # "+CMGR: <stat>,[<alpha>],<length>", PDU
+            self._deliver_pdu(index, lines[1])
+
+    async def _fetch_unread_messages(self):
+        """Messages that arrived while nobody was listening (before boot, or not stored last time)."""
+        try:
+            lines = await self.command("AT+CMGL=0,1")  # 0: REC UNREAD
+        except ModemError as e:
+            print(f"[MODEM] Could not list stored SMS: {e!r}")
+            return
+        for header, pdu in zip(lines[0::2], lines[1::2]):
+            fields = _fields(header)  # <index>,<stat>,[<alpha>],<length>
+            if fields and fields[0].isdigit():
+                self._deliver_pdu(int(fields[0]), pdu)
+
+    def _deliver_pdu(self, index, pdu):
+        try:
+            sender, body, timestamp = decode_deliver(pdu)
+        except ValueError as e:
+            print(f"[MODEM] Cannot decode SMS {index} ({e}), leaving it on the SIM")
+            return
+        self._deliver(index, sender, body, timestamp)
+
+    def _deliver(self, index, sender, body, timestamp):
+        if not self.listeners.get("sms"):
+            print(f"[MODEM] No SMS listener, leaving message {index} on the SIM")
+            return
+        print(f"[MODEM] SMS {index} from {sender}")
+
+        def on_stored(message_id):
+            if message_id is not None and self.fd is not None:
+                self._send(f"AT+CMGD={index}")
+
+        self.notify("sms", sender, body, timestamp, on_stored)
+
+    # --- CALLS ---
     def dial(self, number):
         print(f"[MODEM] Requesting Dial: {number}")
-        # In the future, this talks to mmcli
+        dial_string = re.sub(r"[^0-9+*#]", "", number or "")
+        if not dial_string:
+            return False
+        now = time.time()
+        self.call = {"type": CALL_DIALED, "number": number, "started": now, "connected": None}
+        if self.simulated:
+            # Simulation: the far end picks up straight away.
+            self._connected()
+            return True
+        if self.fd is None:
+            print("[MODEM] Modem port is closed, cannot dial")
+            self.call = None
+            return False
+        self.state = "CALLING"
+        self._send(f"ATD{dial_string};", on_error=lambda error: self._call_ended(),
+                   timeout=self.config["dial_timeout"], call=True)
+        return True
+
+    def incoming(self, number):
+        """An incoming call is ringing (reported by the modem)."""
+        print(f"[MODEM] Incoming call: {number}")
+        self.call = {"type": CALL_RECEIVED, "number": number, "started": time.time(), "connected": None}
+        self.state = "RINGING"
+
+    def answer(self):
+        print("[MODEM] Requesting Answer")
+        if self.call and self.state == "RINGING":
+            if self.simulated:
+                self._connected()
+            elif self.fd is not None:
+                self._send("ATA", on_ok=lambda lines: self._connected(), on_error=lambda error: self._call_ended(),
+                           timeout=self.config["dial_timeout"], call=True)
         return True
 
     def hangup(self):
         print("[MODEM] Requesting Hangup")
-        return True
\ No newline at end of file
+        if not self.simulated and self.fd is not None and self.state != "IDLE":
+            self._send("AT+CHUP")
+        self._log_call()
+        self.state = "IDLE"
+        return True
+
+    def _connected(self):
+        if self.call and self.call["connected"] is None:
+            self.call["connected"] = time.time()
+            self.state = "CONNECTED"
+
+    def _call_ended(self):
+        """The network ended the call (remote hangup, no answer, busy...)."""
+        if self.call is None:
+            return
+        self._log_call()
+        self.state = "IDLE"
+        self.notify("call_ended")
+
+    def _log_call(self):
+        """Writes the call that just ended to the call log: an unanswered incoming call is a missed one."""
+        call, self.call = self.call, None
+        if call is None or self.data is None:
+            return
+        call_type = call["type"]
+        if call_type == CALL_RECEIVED and call["connected"] is None:
+            call_type = CALL_MISSED
+        duration = time.time() - call["connected"] if call["connected"] is not None else 0
+        try:
+            self.data.add_call(call_type, call["number"], int(call["started"]), round(duration))
+        except Exception as e:
+            print(f"[MODEM] Could not log call: {e}")
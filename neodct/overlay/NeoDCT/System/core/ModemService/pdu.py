@@ -0,0 +1,180 @@
+"""SMS-DELIVER PDUs (3GPP TS 23.040) as the modem lists them in PDU mode (AT+CMGF=0).
+
+In PDU mode every stored message is one line of hex after its +CMGR / +CMGL
+header, so message text can never be mistaken for a result code or URC, and
+the data coding scheme (DCS) says how to read it:
+
+- `decode_deliver(pdu)` -> (sender, text, timestamp). GSM 7-bit (with the
+  extension table), 8-bit data and UCS2 bodies are decoded; a user data header
+  (e.g. a concatenated message part's) is skipped. Raises ValueError for
+  anything that isn't a well-formed SMS-DELIVER.
+- `encode_deliver(sender, text, timestamp)` builds one (fake modem, tests).
+"""
+
+from __future__ import annotations
+
+import calendar
+import time
+
+GSM_7BIT = "gsm7"
+DATA_8BIT = "8bit"
+UCS2 = "ucs2"
+
+# GSM 03.38 default alphabet; 0x1B escapes to GSM_EXTENSION.
+GSM_ALPHABET = (
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞ\x1bÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+GSM_EXTENSION = {0x0A: "\f", 0x14: "^", 0x28: "{", 0x29: "}", 0x2F: "\\",
+                 0x3C: "[", 0x3D: "~", 0x3E: "]", 0x40: "|", 0x65: "€"}
+GSM_ESCAPE = 0x1B
+_GSM_CODES = {char: code for code, char in enumerate(GSM_ALPHABET) if code != GSM_ESCAPE}
+_GSM_EXTENSION_CODES = {char: code for code, char in GSM_EXTENSION.items()}
+
+TOA_INTERNATIONAL = 0x91
+TOA_UNKNOWN = 0x81
+TOA_ALPHANUMERIC = 0xD0
+
+
+def dcs_alphabet(dcs):
+    """Alphabet of a TP-DCS value: GSM_7BIT, DATA_8BIT or UCS2."""
+    group = dcs & 0xF0
+    if group < 0x80:  # general data coding (0x40-0x7F: same, marked for automatic deletion)
+        return (GSM_7BIT, DATA_8BIT, UCS2, GSM_7BIT)[(dcs >> 2) & 0x03]
+    if group == 0xE0:  # message waiting indication, UCS2
+        return UCS2
+    if group == 0xF0:  # data coding / message class
+        return DATA_8BIT if dcs & 0x04 else GSM_7BIT
+    return GSM_7BIT
+
+
+# --- 7-BIT ---
+def _unpack_septets(data, count):
+    bits = int.from_bytes(data, "little")
+    return [(bits >> (7 * i)) & 0x7F for i in range(count)]
+
+
+def _pack_septets(septets):
+    bits = 0
+    for i, septet in enumerate(septets):
+        bits |= septet << (7 * i)
+    return bits.to_bytes((7 * len(septets) + 7) // 8, "little")
+
+
+def _septets_to_text(septets):
+    out = []
+    escaped = False
+    for septet in septets:
+        if escaped:
+            out.append(GSM_EXTENSION.get(septet, GSM_ALPHABET[septet]))
+            escaped = False
+        elif septet == GSM_ESCAPE:
+            escaped = True
+        else:
+            out.append(GSM_ALPHABET[septet])
+    return "".join(out)
+
+
+def _text_to_septets(text):
+    """Septets for text, or None if it needs characters outside the GSM alphabet."""
+    septets = []
+    for char in text:
+        if char in _GSM_CODES:
+            septets.append(_GSM_CODES[char])
+        elif char in _GSM_EXTENSION_CODES:
+            septets.extend((GSM_ESCAPE, _GSM_EXTENSION_CODES[char]))
+        else:
+            return None
+    return septets
+
+
+# --- FIELDS ---
+def _semi_octets(data):
+    """Swapped-nibble BCD ("214365" for 12 34 56) with '*' / '#' for the 0xA / 0xB digits."""
+    return "".join(f"{b & 0x0F:x}{b >> 4:x}" for b in data).translate(str.maketrans("ab", "*#"))
+
+
+def _decode_address(data, pos):
+    """(address, position after it) for the address field at data[pos]."""
+    length, toa = data[pos], data[pos + 1]  # length in semi-octets
+    raw = data[pos + 2:pos + 2 + (length + 1) // 2]
+    if toa & 0x70 == 0x50:  # alphanumeric sender ("Bank"), 7-bit packed
+        address = _septets_to_text(_unpack_septets(raw, length * 4 // 7))
+    else:
+        address = _semi_octets(raw)[:length]
+        if toa & 0x70 == 0x10:
+            address = "+" + address
+    return address, pos + 2 + len(raw)
+
+
+def _decode_scts(data):
+    """Service centre timestamp (7 semi-octet fields, time zone in quarter hours) -> epoch seconds."""
+    year, month, day, hour, minute, second = ((b & 0x0F) * 10 + (b >> 4) for b in data[:6])
+    zone = (data[6] & 0x07) * 10 + (data[6] >> 4)
+    if data[6] & 0x08:
+        zone = -zone
+    return calendar.timegm((2000 + year, month, day, hour, minute, second)) - zone * 15 * 60
+
+
+def _encode_semi_octets(digits):
+    digits += "F" * (len(digits) % 2)
+    return bytes(int(digits[i + 1] + digits[i], 16) for i in range(0, len(digits), 2))
+
+
+def _encode_scts(timestamp, zone):
+    t = time.gmtime(timestamp + zone * 15 * 60)
+    fields = [v % 100 for v in (t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec)]
+    out = bytes((v % 10) << 4 | v // 10 for v in fields)
+    return out + bytes(((abs(zone) % 10) << 4 | abs(zone) // 10 | (0x08 if zone < 0 else 0),))
+
+
+# --- PDUS ---
+def decode_deliver(pdu):
+    """(sender, text, timestamp) of an SMS-DELIVER PDU given as hex (SCA included, as the modem lists it)."""
+    try:
+        data = bytes.fromhex(pdu)
+        pos = 1 + data[0]  # skip the service centre address
+        first = data[pos]
+        if first & 0x03 != 0x00:
+            raise ValueError(f"not an SMS-DELIVER (first octet {first:#04x})")
+        sender, pos = _decode_address(data, pos + 1)
+        dcs = data[pos + 1]  # after TP-PID
+        timestamp = _decode_scts(data[pos + 2:pos + 9])
+        length = data[pos + 9]  # septets for 7-bit, else octets; includes the header
+        user_data = data[pos + 10:]
+        header = user_data[0] + 1 if first & 0x40 else 0  # TP-UDHI: octets of UDHL + header
+        alphabet = dcs_alphabet(dcs)
+        if alphabet == GSM_7BIT:
+            septets = _unpack_septets(user_data, length)
+            text = _septets_to_text(septets[(header * 8 + 6) // 7:])  # header plus fill bits
+        elif alphabet == UCS2:
+            text = user_data[header:length].decode("utf-16-be", "replace")
+        else:
+            text = user_data[header:length].decode("latin-1")
+    except (IndexError, ValueError) as e:
+        raise ValueError(f"bad SMS-DELIVER PDU: {e}") from None
+    return sender, text, timestamp
+
+
+def encode_deliver(sender, text, timestamp=None, zone=0):
+    """Hex SMS-DELIVER PDU (no SCA): GSM 7-bit if text fits the alphabet, else UCS2."""
+    if sender.startswith("+") and sender[1:].isdigit():
+        toa, address = TOA_INTERNATIONAL, _encode_semi_octets(sender[1:])
+        length = len(sender) - 1
+    elif sender.isdigit():
+        toa, address, length = TOA_UNKNOWN, _encode_semi_octets(sender), len(sender)
+    else:
+        name = _text_to_septets(sender[:11]) or []
+        toa, address, length = TOA_ALPHANUMERIC, _pack_septets(name), (7 * len(name) + 3) // 4
+    septets = _text_to_septets(text)
+    if septets is not None:
+        dcs, user_data, user_length = 0x00, _pack_septets(septets), len(septets)
+    else:
+        user_data = text.encode("utf-16-be")
+        dcs, user_length = 0x08, len(user_data)
+    pdu = (
+        bytes((0x00, 0x04, length, toa)) + address  # no SCA; SMS-DELIVER, no more messages to send
+        + bytes((0x00, dcs)) + _encode_scts(int(time.time() if timestamp is None else timestamp), zone)
+        + bytes((user_length,)) + user_data
+    )
+    return pdu.hex().upper()
@@ -0,0 +1,101 @@
+"""Phone number normalization and caller-ID resolution.
+
+`normalize()` turns the many ways a number gets typed or reported by the modem
+("+1 555-123-4567", "(555) 123 4567", "0015551234567", "5551234567") into one
+E.164-style key ("+15551234567"). Numbers without a country code that are not
+a full national number (e.g. 7-digit local "5551234") are kept as bare digits.
+
+The phonebook stores that key (`contacts.number_norm`) and the last
+SUFFIX_DIGITS digits (`contacts.number_suffix`), both indexed. `NumberResolver`
+looks a number up by exact key first, then by suffix when one side is a local
+number without a country code (so "+1 212-555-1234" and "5551234" still meet,
+but "+12125551234" never matches "+14155551234"), taking the suffix match only
+if it is unique. Every answer (including "no contact") is cached so resolving
+the sender of each listed message is a dict lookup; writes by other processes
+are noticed within VERSION_RECHECK seconds.
+"""
+
+from __future__ import annotations
+
+import threading
+
+DEFAULT_COUNTRY_CODE = "1"     # NANP
+NATIONAL_NUMBER_DIGITS = 10
+INTERNATIONAL_PREFIX = "00"
+SUFFIX_DIGITS = 7
+
+
+def normalize(number, country_code=DEFAULT_COUNTRY_CODE):
+    """Returns the E.164-style key for number ("" if it has no digits)."""
+    if not number:
+        return ""
+    number = number.strip()
+    digits = "".join(ch for ch in number if ch.isdigit())
+    if not digits:
+        return ""
+    if number.startswith("+"):
+        return "+" + digits
+    if digits.startswith(INTERNATIONAL_PREFIX):
+        return "+" + digits[len(INTERNATIONAL_PREFIX):]
+    if len(digits) == NATIONAL_NUMBER_DIGITS:
+        return "+" + country_code + digits
+    if len(digits) == NATIONAL_NUMBER_DIGITS + len(country_code) and digits.startswith(country_code):
+        return "+" + digits
+    return digits
+
+
+def suffix(number, digits=SUFFIX_DIGITS):
+    """Last `digits` digits of number (all of them if shorter)."""
+    only_digits = "".join(ch for ch in (number or "") if ch.isdigit())
+    return only_digits[-digits:]
+
+
+class NumberResolver:
+    def __init__(self, data):
+        from System.core.DataService import PHONEBOOK_DB, VERSION_RECHECK # Local import to avoid circular dep
+        self.data = data
+        self.db = PHONEBOOK_DB
+        self.recheck = VERSION_RECHECK
+        self.cache = {}  # raw number -> Contact or None
+        self.version = None
+        self.lock = threading.Lock()
+        data.subscribe(PHONEBOOK_DB, self._on_change)
+
+    def _on_change(self, event, row_id):
+        with self.lock:
+            self.cache.clear()
+
+    def resolve(self, number):
+        """Returns the contact for number, or None."""
+        if not number:
+            return None
+        with self.lock:
+            version = self.data.data_version(self.db, max_age=self.recheck)
+            if version != self.version:
+                # Another process wrote the phonebook: its rows may lack number keys.
+                self.data.backfill_number_keys()
+                self.cache.clear()
+                self.version = version
+            if number not in self.cache:
+                self.cache[number] = self.data.contact_by_number(normalize(number), suffix(number))
+            return self.cache[number]
+
+    def display_name(self, number):
+        """Contact name for number, or the number itself."""
+        contact = self.resolve(number)
+        return contact.name if contact else number
+
+
+RESOLVER = None
+
+
+def get_resolver(ui):
+    """The UI's resolver, or a process-wide one (isolated apps, tools)."""
+    global RESOLVER
+    resolver = getattr(ui, "resolver", None)
+    if resolver is not None:
+        return resolver
+    if RESOLVER is None:
+        from System.core.DataService import DATA # Local import to avoid circular dep
+        RESOLVER = NumberResolver(DATA)
+    return RESOLVER
@@ -0,0 +1,212 @@
+"""Idle power manager.
+
+Steps the display down while nobody touches the phone:
+
+    ACTIVE --dim_after--> DIMMED --blank_after--> BLANKED
+
+- DIMMED lowers the backlight via sysfs (`<sysfs>/class/backlight/*/brightness`).
+  Rendering continues and keys are delivered normally.
+- BLANKED powers the panel down with FBIOBLANK and suspends rendering:
+  `NeoDCT_UI.read_keypress()` parks inside `wait_blanked()`, so the main loop and
+  every app's redraw/poll loop stop ticking until a key arrives. That first key
+  only wakes the display and is not delivered as an action.
+
+Idle time is checked every TICK_INTERVAL by a timer on the UI runtime (and on
+every key-read timeout), so the display steps down even while a screen keeps
+reading keys with short timeouts. Incoming calls and messages wake it, and it
+stays on for as long as the modem is not IDLE (ringing, dialing or in a call).
+
+Timeouts come from `/NeoDCT/User/power.json` (seconds, 0 disables a stage):
+
+    {"dim_after": 30, "blank_after": 60, "dim_percent": 20}
+
+The sysfs root can be pointed at a fake tree (`NEODCT_SYSFS_ROOT` or the
+`sysfs_root` argument) for testing without a backlight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import os
+
+from System.core.Clock import get_clock
+
+SYSFS_ROOT = os.environ.get("NEODCT_SYSFS_ROOT", "/sys")
+CONFIG_PATH = "/NeoDCT/User/power.json"
+DEFAULT_CONFIG = {"dim_after": 30, "blank_after": 60, "dim_percent": 20}
+BLANKED_POLL = 1.0  # seconds; housekeeping cadence while the display is off
+TICK_INTERVAL = 1.0  # seconds between idle checks
+WAKE_EVENTS = ("ring", "sms")  # modem events that turn the display on
+
+FBIOBLANK = 0x4611
+FB_BLANK_UNBLANK = 0
+FB_BLANK_POWERDOWN = 4
+
+ACTIVE = "ACTIVE"
+DIMMED = "DIMMED"
+BLANKED = "BLANKED"
+
+
+def load_config(path=CONFIG_PATH):
+    config = dict(DEFAULT_CONFIG)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config.update(json.load(f))
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[POWER] Ignoring unreadable power config: {e}")
+    return config
+
+
+class Backlight:
+    """First device under <sysfs_root>/class/backlight, or a no-op if there is none."""
+
+    def __init__(self, sysfs_root=SYSFS_ROOT):
+        self.path = None
+        self.max_brightness = 0
+        base = f"{sysfs_root}/class/backlight"
+        try:
+            devices = sorted(os.listdir(base))
+        except OSError:
+            devices = []
+        for device in devices:
+            try:
+                with open(f"{base}/{device}/max_brightness", "r") as f:
+                    self.max_brightness = int(f.read().strip())
+                self.path = f"{base}/{device}/brightness"
+                break
+            except (OSError, ValueError):
+                continue
+
+    @property
+    def available(self):
+        return self.path is not None
+
+    def get(self):
+        if not self.path:
+            return None
+        try:
+            with open(self.path, "r") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def set(self, value):
+        if not self.path:
+            return
+        value = max(0, min(self.max_brightness, int(value)))
+        try:
+            with open(self.path, "w") as f:
+                f.write(str(value))
+        except OSError as e:
+            print(f"[POWER] Could not set backlight: {e}")
+
+
+class PowerManager:
+    def __init__(self, ui, sysfs_root=SYSFS_ROOT, config=None):
+        self.ui = ui
+        self.clock = get_clock(ui)
+        self.config = config if config is not None else load_config()
+        self.backlight = Backlight(sysfs_root)
+        self.state = ACTIVE
+        self.saved_brightness = None
+        self.last_activity = self.clock.time()
+        self.modem = None
+
+    @property
+    def blanked(self):
+        return self.state == BLANKED
+
+    # --- DISPLAY ---
+    def _fb_blank(self, mode):
+        fd = getattr(self.ui.fb, "fd", None)
+        if fd is None:
+            return
+        try:
+            fcntl.ioctl(fd, FBIOBLANK, mode)
+        except OSError as e:
+            print(f"[POWER] FBIOBLANK failed: {e}")
+
+    def dim(self):
+        if self.state != ACTIVE:
+            return
+        current = self.backlight.get()
+        if current is not None:
+            self.saved_brightness = current
+            self.backlight.set(current * self.config["dim_percent"] // 100)
+        self.state = DIMMED
+        print("[POWER] Display dimmed")
+
+    def blank(self):
+        if self.state == BLANKED:
+            return
+        if self.state == ACTIVE:
+            self.saved_brightness = self.backlight.get()
+        self.backlight.set(0)
+        self._fb_blank(FB_BLANK_POWERDOWN)
+        self.state = BLANKED
+        print("[POWER] Display blanked, rendering suspended")
+
+    def wake(self):
+        """Restores full brightness. Safe to call from the UI thread at any time."""
+        self.last_activity = self.clock.time()
+        if self.state == ACTIVE:
+            return
+        if self.state == BLANKED:
+            self._fb_blank(FB_BLANK_UNBLANK)
+        if self.saved_brightness is not None:
+            self.backlight.set(self.saved_brightness)
+            self.saved_brightness = None
+        print(f"[POWER] Display on (was {self.state.lower()})")
+        self.state = ACTIVE
+
+    # --- EVENTS ---
+    def start(self, runtime, modem=None):
+        """Ticks from a timer on runtime's loop; modem "ring" and "sms" events wake the display."""
+        self.modem = modem
+        if modem is not None:
+            for event in WAKE_EVENTS:
+                modem.subscribe(event, lambda *args: self.wake())
+        return runtime.spawn(self._tick_forever())
+
+    async def _tick_forever(self):
+        while True:
+            await asyncio.sleep(TICK_INTERVAL)
+            self.tick()
+
+    # --- INPUT HOOKS ---
+    def on_key(self):
+        """Call for every key press. Returns True if the key only woke a blanked display."""
+        swallowed = self.state == BLANKED
+        self.wake()
+        return swallowed
+
+    def tick(self):
+        """Call when input is idle; advances ACTIVE -> DIMMED -> BLANKED."""
+        if self.modem is not None and self.modem.state != "IDLE":
+            self.wake() # The call screen stays lit for the whole call
+            return
+        idle = self.clock.time() - self.last_activity
+        dim_after = self.config["dim_after"]
+        blank_after = self.config["blank_after"]
+        if blank_after and idle >= blank_after:
+            self.blank()
+        elif dim_after and idle >= dim_after:
+            self.dim()
+
+    def wait_blanked(self, read_key, service=None):
+        """
+        Blocks while the display is blanked (rendering suspended).
+        read_key(timeout) returns a key or None; service() runs every BLANKED_POLL.
+        Returns once a key (swallowed) or wake() ends the blanked state.
+        """
+        while self.state == BLANKED:
+            key = read_key(BLANKED_POLL)
+            if key is not None:
+                self.on_key()
+                print(f"[POWER] Wake key {key} swallowed")
+            elif service:
+                service()
@@ -0,0 +1,101 @@
+"""Asyncio-based UI runtime.
+
+`NeoDCT_UI` owns one `UIRuntime`. The keypad fd is registered with the event
+loop and decoded key presses land in an `asyncio.Queue`.
+
+- Coroutines read keys with `await runtime.next_key(timeout)`. Screens don't:
+  they read through `ui.read_keypress()`, which also applies the power
+  manager's wake-key handling and memory housekeeping.
+- The blocking API (`ui.read_keypress()` / `ui.wait_for_key()`) is a thin wrapper
+  around `read_key()`, which runs the loop until a key arrives. Existing apps
+  therefore keep working, and background coroutines started with `spawn()`
+  (modem events, DB writes, metadata loading) make progress whenever the UI is
+  waiting for input, which is nearly all of the time.
+- Threads hand results back with `call_soon_threadsafe()`.
+- Blocking reads wait through the UI's clock (`Clock.wait()`), so with a
+  simulated clock a read that times out returns at once and moves the clock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from System.core.Clock import SYSTEM_CLOCK
+
+
+class UIRuntime:
+    def __init__(self, keypad_fd, read_event, clock=None):
+        """read_event() reads one input event from keypad_fd and returns a key code or None."""
+        self.keypad_fd = keypad_fd
+        self.read_event = read_event
+        self.clock = clock or SYSTEM_CLOCK
+        self.loop = asyncio.new_event_loop()
+        self.keys = asyncio.Queue()
+        self.tasks = set()
+        self.events_read = 0
+        self.loop.add_reader(keypad_fd, self._on_keypad)
+
+    def _on_keypad(self):
+        try:
+            key = self.read_event()
+        except OSError:
+            return
+        self.events_read += 1
+        if key is not None:
+            self.keys.put_nowait(key)
+
+    async def next_key(self, timeout=None):
+        """Awaits the next key press. Returns None if timeout (seconds) expires first."""
+        if timeout is not None and timeout <= 0:
+            await asyncio.sleep(0)
+            return self.keys.get_nowait() if not self.keys.empty() else None
+        try:
+            return await asyncio.wait_for(self.keys.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def read_key(self, timeout=None):
+        """Blocking form of next_key(); runs the loop (and background tasks) while waiting."""
+        if not self.keys.empty():
+            return self.keys.get_nowait()
+        if self.loop.is_running():
+            raise RuntimeError("blocking key read inside a coroutine; use 'await runtime.next_key()'")
+        return self.clock.wait(self._run_until_key, timeout)
+
+    def _run_until_key(self, timeout):
+        return self.loop.run_until_complete(self.next_key(timeout))
+
+    def flush(self):
+        """Drops queued key presses and the events still buffered on keypad_fd (the widgets' input flush)."""
+        if not self.loop.is_running():
+            # One event is read per loop pass; pass until a pass reads nothing.
+            while True:
+                before = self.events_read
+                self.loop.run_until_complete(asyncio.sleep(0))
+                if self.events_read == before:
+                    break
+        while not self.keys.empty():
+            self.keys.get_nowait()
+
+    def spawn(self, coro):
+        """Starts a background coroutine. It runs whenever the UI waits for input."""
+        task = self.loop.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"[RUNTIME] Background task failed: {task.exception()!r}")
+
+    def run_in_executor(self, func, *args):
+        """Runs blocking work on a thread; returns an awaitable for its result."""
+        return self.loop.run_in_executor(None, func, *args)
+
+    def call_soon_threadsafe(self, callback, *args):
+        return self.loop.call_soon_threadsafe(callback, *args)
+
+    def run(self, coro):
+        """Runs an async screen to completion from blocking code and returns its result."""
+        return self.loop.run_until_complete(coro)
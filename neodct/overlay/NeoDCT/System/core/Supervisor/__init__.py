@@ -0,0 +1,145 @@
+"""UI supervisor with a pre-forked warm template.
+
+The launcher process imports everything, opens the framebuffer and runs the
+boot steps once, then becomes the *template*: it forks a fresh UI child from
+that warm state and waits. When the child crashes, a new one is forked from the
+template (no re-import, no font/wallpaper/app scan), after a short backoff, and
+reopens the screen the user was on.
+
+If the UI crashes too often in a short window, the supervisor gives up and
+returns the exit code so `run_neodct.sh` can show the crash shell.
+
+The UI side records the current screen with `save_last_screen()` /
+`clear_last_screen()`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import traceback
+
+STATE_PATH = "/NeoDCT/User/.last_screen.json"
+MAX_CRASHES = 5
+CRASH_WINDOW = 60.0
+BASE_BACKOFF = 0.1
+MAX_BACKOFF = 5.0
+
+
+def save_last_screen(screen, path=STATE_PATH):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(screen, f)
+    except Exception as e:
+        print(f"[SUPERVISOR] Could not save screen state: {e}")
+
+
+def clear_last_screen(path=STATE_PATH):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[SUPERVISOR] Could not clear screen state: {e}")
+
+
+def load_last_screen(path=STATE_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def recent_crashes(crash_times, now, window=CRASH_WINDOW):
+    """crash_times without the crashes older than window seconds, plus one at now."""
+    return [t for t in crash_times if now - t < window] + [now]
+
+
+def backoff_delay(crash_count, base=BASE_BACKOFF, maximum=MAX_BACKOFF):
+    """Seconds to wait before the next fork after crash_count crashes in the window: doubling, capped."""
+    return min(maximum, base * (2 ** (crash_count - 1)))
+
+
+def next_restore(screen, restore):
+    """Screen to reopen after a crash: the last saved one, unless reopening it (restore) is what just crashed."""
+    return screen if screen and screen != restore else None
+
+
+class Supervisor:
+    def __init__(
+        self,
+        run_child,
+        *,
+        max_crashes=MAX_CRASHES,
+        crash_window=CRASH_WINDOW,
+        base_backoff=BASE_BACKOFF,
+        max_backoff=MAX_BACKOFF,
+        state_path=STATE_PATH,
+    ):
+        """run_child(restore) runs the UI in the forked child; restore is a saved screen or None."""
+        self.run_child = run_child
+        self.max_crashes = max_crashes
+        self.crash_window = crash_window
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state_path = state_path
+        self.crash_times = []
+        self.total_crashes = 0
+
+    def _spawn(self, restore):
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid:
+            return pid
+
+        # --- CHILD ---
+        code = 0
+        try:
+            self.run_child(restore)
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            except Exception:
+                pass
+        os._exit(code)
+
+    def _wait(self, pid):
+        _, status = os.waitpid(pid, 0)
+        return os.waitstatus_to_exitcode(status)
+
+    def serve(self):
+        """Forks UI children until one exits cleanly or crashes too often. Returns the exit code."""
+        restore = None
+
+        while True:
+            started = time.monotonic()
+            code = self._wait(self._spawn(restore))
+
+            if code == 0:
+                print("[SUPERVISOR] UI exited normally.")
+                return 0
+
+            now = time.monotonic()
+            self.total_crashes += 1
+            self.crash_times = recent_crashes(self.crash_times, now, self.crash_window)
+            print(f"[SUPERVISOR] UI crashed (code {code}) after {now - started:.1f}s, "
+                  f"{len(self.crash_times)} in the last {self.crash_window:.0f}s, {self.total_crashes} total")
+
+            if len(self.crash_times) >= self.max_crashes:
+                print("[SUPERVISOR] Too many crashes, giving up.")
+                return code if code > 0 else 1
+
+            restore = next_restore(load_last_screen(self.state_path), restore)
+            if restore is None:
+                clear_last_screen(self.state_path)
+
+            time.sleep(backoff_delay(len(self.crash_times), self.base_backoff, self.max_backoff))
@@ -3,134 +3,131 @@
 # It is based on buildroot embedded Linux with the NeoDCT frontend written in python.
 
 import sys
-import mmap
 import os
 import struct
 import time
-import select
 import json
-import fcntl
-# --- THE FIX: Import ImageFile to handle "broken" JPEGs ---
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance, ImageFile 
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PIL import Image, ImageDraw
+from System.ui.assets import (
+    HEIGHT, LAYOUT_PATH, WALLPAPER_PATH, WIDTH, load_fonts, load_layout, load_wallpaper, render_element,
+)
 from System.ui.framework import AppSelector, SoftKeyBar
-import importlib.util
-import sqlite3
+from System.core.MessageIngest import MessageIngest
 from System.core.ModemService import ModemService
-import System.ui.Dialer.call_screen as dialer_ui
-import System.apps.PhoneBook.shared.list_ui as contact_manager
+from System.core.Clock import SystemClock
+from System.core.Framebuffer import Framebuffer
+from System.core.AppRegistry import AppRegistry
+from System.core.AppLoader import AppLoader
+from System.core.BootProfiler import BOOT, lazy_import
+from System.core.Supervisor import save_last_screen, clear_last_screen
+from System.core.MemoryMonitor import MemoryMonitor
+from System.core.AppHost import AppHost
+from System.core.Runtime import UIRuntime
+from System.core.DataService import DATA, DB_DIR, MESSAGES_DB, DataService
+from System.core.DbMaintenance import DbMaintenance
+from System.core.PhoneNumbers import NumberResolver
+from System.core.PowerManager import PowerManager
 from System.core.ErrorScreen import show_alpha_security_notice_once
+from System.apps.PhoneBook.shared.t9 import T9Index
 
-# --- CONFIG ---
-# 1. Allow loading images even if they are missing EOF markers
-ImageFile.LOAD_TRUNCATED_IMAGES = True
+# Only needed once the user dials or opens the contact selector.
+dialer_ui = lazy_import("System.ui.Dialer.call_screen")
+contact_manager = lazy_import("System.apps.PhoneBook.shared.list_ui")
 
-FB_PATH = "/dev/fb0"
+# --- CONFIG ---
 KEYPAD_PATH = "/dev/input/event0"
-WIDTH = 240
-HEIGHT = 240
-WALLPAPER_PATH = "/NeoDCT/User/wallpaper.jpg" 
-
-# --- HARDWARE DRIVER ---
-class Framebuffer:
-    def __init__(self):
-        self.fd = os.open(FB_PATH, os.O_RDWR)
-        
-        # Get Screen Info
-        vinfo = fcntl.ioctl(self.fd, 0x4600, b'\0'*160)
-        self.xres, self.yres = struct.unpack_from("II", vinfo, 0)
-        self.bpp = struct.unpack_from("I", vinfo, 24)[0]
-        
-        # Get Line Length (Stride)
-        finfo = fcntl.ioctl(self.fd, 0x4602, b'\0'*64)
-        self.line_length = struct.unpack_from("I", finfo, 48)[0]
-        if self.line_length == 0: self.line_length = self.xres * (self.bpp // 8)
-
-        self.size = self.line_length * self.yres
-        self.mm = mmap.mmap(self.fd, self.size, mmap.MAP_SHARED, mmap.PROT_WRITE | mmap.PROT_READ)
-
-    def update(self, pil_image):
-        stride_pixels = self.line_length // (self.bpp // 8)
-        
-        if self.bpp == 32:
-            native_img = Image.new("RGB", (stride_pixels, self.yres), "black")
-            native_img.paste(pil_image, (0, 0))
-            data = native_img.convert("RGBA").tobytes("raw", "BGRA")
-        elif self.bpp == 16:
-            native_img = Image.new("RGB", (stride_pixels, self.yres), "black")
-            native_img.paste(pil_image, (0, 0))
-            data = native_img.convert("RGB").tobytes("raw", "BGR;16")
-            
-        self.mm.seek(0)
-        self.mm.write(data[:self.size])
+BOOT_WORKERS = 4
+TEXT_SIZE_CACHE_MAX = 1024
 
 def init_databases():
         """ Checks for User DBs and creates them if missing. """
         
-        db_path = "/NeoDCT/User/db"
+        db_path = DB_DIR
         if not os.path.exists(db_path):
             print(f"[KERNEL] Creating User DB directory: {db_path}")
             os.makedirs(db_path)
-            
-        # --- PHONEBOOK DB ---
-        pb_file = f"{db_path}/phonebook.db"
-        conn = sqlite3.connect(pb_file)
-        c = conn.cursor()
-        
-        c.execute('''CREATE TABLE IF NOT EXISTS contacts
-                     (id INTEGER PRIMARY KEY AUTOINCREMENT, 
-                      name TEXT, 
-                      number TEXT, 
-                      speed_dial INTEGER)''')
-                      
-        c.execute("SELECT count(*) FROM contacts")
-        if c.fetchone()[0] == 0:
-            print("[KERNEL] Seeding default contacts...")
-            c.execute("INSERT INTO contacts (name, number, speed_dial) VALUES (?, ?, ?)", 
-                      ("NeoDCT Support", "555-1234", 2))
-            conn.commit()
-            
-        conn.close()
-
-        # --- INBOX DB ---
-        inbox_file = f"{db_path}/sms_inbox.db"
-        conn = sqlite3.connect(inbox_file)
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS inbox
-                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                      message TEXT,
-                      sender TEXT,
-                      timestamp INTEGER,
-                      is_read INTEGER DEFAULT 0)''')
-        conn.commit()
-        conn.close()
-
-        # --- OUTBOX DB ---
-        outbox_file = f"{db_path}/sms_outbox.db"
-        conn = sqlite3.connect(outbox_file)
-        c = conn.cursor()
-        c.execute('''CREATE TABLE IF NOT EXISTS outbox
-                     (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                      message TEXT,
-                      timestamp INTEGER)''')
-        conn.commit()
-        conn.close()
+
+        # Opening each database applies its schema (see System.core.DataService).
+        # A throwaway service is used so no connection outlives the boot thread.
+        data = DataService(db_path)
+        try:
+            if data.contact_count() == 0:
+                print("[KERNEL] Seeding default contacts...")
+                data.add_contact("NeoDCT Support", "555-1234", 2)
+            data.connection(MESSAGES_DB)
+        finally:
+            data.close()
 
         print("[KERNEL] Databases initialized successfully.")
 
+def _timed(name, func, *args):
+    with BOOT.step(name):
+        return func(*args)
+
+def prepare_boot(on_progress=None):
+    """
+    Runs the independent boot steps on a thread pool and returns their results.
+    on_progress(done, total) is called from the calling thread as each one finishes.
+    The supervisor calls this once in its template process so restarts skip it.
+    """
+    registry = AppRegistry()
+    tasks = {
+        "databases": (init_databases,),
+        "fonts": (load_fonts,),
+        "layout": (load_layout, LAYOUT_PATH),
+        "wallpaper": (load_wallpaper, WALLPAPER_PATH),
+        "app scan": (registry.load,),
+    }
+    results = {"app registry": registry}
+    with ThreadPoolExecutor(max_workers=BOOT_WORKERS, thread_name_prefix="boot") as pool:
+        futures = {pool.submit(_timed, name, *task): name for name, task in tasks.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, len(tasks))
+    return results
+
 # --- UI LOGIC ---
 class NeoDCT_UI:
-    def __init__(self, fb_driver):
-        init_databases()       
-    
-        self.modem = ModemService()
+    def __init__(self, fb_driver, clock=None, on_progress=None, warm=None):
+        self.clock = clock or SystemClock()
+        self.image_cache = {}
+        self.text_size_cache = {}
+
+        # --- BOOT ---
+        # `warm` is the result of prepare_boot() when forked from the supervisor template.
+        if warm is None:
+            warm = prepare_boot(on_progress)
+        self.app_registry = warm["app registry"]
+        self.font_s, self.font_md, self.font_n, self.font_xl = warm["fonts"]
+        self.home_layout = warm["layout"]
+        self.wallpaper = warm["wallpaper"]
+        self.apps = warm["app scan"]
+        self.app_loader = AppLoader()
+        self.data = DATA
+        self.resolver = NumberResolver(self.data)
+
+        with BOOT.step("modem"):
+            self.modem = ModemService(self.data)
         self.dial_buffer = "" 
+        self.t9 = T9Index(self.data)
+        self.t9_matches = []  # contacts matching dial_buffer
+        self.t9_selected = -1 # highlighted match, -1 = the typed number itself
         
         self.DEV_KEYMAP = {
             2: "1", 3: "2", 4: "3", 5: "4", 6: "5", 
             7: "6", 8: "7", 9: "8", 10: "9", 11: "0",
             12: "-", 52: ".", 51: ",", 42: "*", 28: "#"
         }
-        self.keypad_fd = os.open(KEYPAD_PATH, os.O_RDONLY | os.O_NONBLOCK)
+        with BOOT.step("keypad"):
+            self.keypad_fd = os.open(KEYPAD_PATH, os.O_RDONLY | os.O_NONBLOCK)
+        self.runtime = UIRuntime(self.keypad_fd, self.read_event, clock=self.clock)
+        # Incoming SMS are group-committed off the UI thread; listeners are called back on it.
+        self.ingest = MessageIngest(self.data, dispatch=self.runtime.call_soon_threadsafe)
+        # Modem I/O runs on the runtime's loop; received SMS are stored through the ingest queue.
+        self.modem.subscribe("sms", self.ingest.submit)
+        self.modem.start(self.runtime.loop)
         self.softkey = SoftKeyBar(self)
 
         self.fb = fb_driver
@@ -139,90 +136,28 @@ class NeoDCT_UI:
         
         self.state = "HOME"
         
-        font_path = "/NeoDCT/System/ui/resources/fonts/font.ttf"
-        try:
-            self.font_s = ImageFont.truetype(font_path, 14)
-            self.font_md = ImageFont.truetype(font_path, 18) 
-            self.font_n = ImageFont.truetype(font_path, 20)
-            self.font_xl = ImageFont.truetype(font_path, 28) 
-            print("[UI] Custom font loaded.")
-        except:
-            print("[UI] Font load failed, using default.")
-            self.font_s = ImageFont.load_default()
-            self.font_n = ImageFont.load_default()
-            self.font_xl = ImageFont.load_default()
+        # --- MEMORY BUDGET ---
+        # Cheapest-to-rebuild caches are shed first under memory pressure.
+        self.memory = MemoryMonitor()
+        self.memory.register("images", self._image_cache_bytes, self.image_cache.clear, priority=10)
+        self.memory.register("text metrics", self._text_size_cache_bytes, self.text_size_cache.clear, priority=20)
+        self.memory.register("sqlite page cache", self.data.page_cache_bytes, self.data.shrink, priority=25)
+        self.memory.register("app modules", self.app_loader.resident_bytes, self.app_loader.evict, priority=30)
+        self.memory.start()
+
+        # --- IDLE POWER ---
+        self.power = PowerManager(self)
+        self.power.start(self.runtime, self.modem)
+        self.maintenance = DbMaintenance(self.data)
 
         show_alpha_security_notice_once(self)
-        self.home_layout = self.load_layout("/NeoDCT/System/ui/resources/ui_home.json")
-        self.image_cache = {}
-        
-        # --- WALLPAPER LOADING ---
-        self.wallpaper = self.load_wallpaper(WALLPAPER_PATH)
-        
-        self.apps = []
-        app_dir = "/NeoDCT/System/apps"
-        
-        if not os.path.exists(app_dir):
-            try: os.makedirs(app_dir)
-            except: pass
 
-        try:
-            if os.path.exists(app_dir):
-                for folder in os.listdir(app_dir):
-                    manifest_path = f"{app_dir}/{folder}/manifest.json"
-                    if os.path.exists(manifest_path):
-                        try:
-                            with open(manifest_path, "r") as f:
-                                data = json.load(f)
-                                self.apps.append({
-                                    "name": data.get("name", folder),
-                                    "icon": f"{app_dir}/{folder}/" + data.get("icon", "icon.png"),
-                                    "path": f"{app_dir}/{folder}",
-                                    "exec": data.get("exec", "main.py"),
-                                    "id": int(data.get("id", 999)) 
-                                })
-                        except: pass
-            
-            self.apps.sort(key=lambda x: x["id"])
-            
-        except Exception as e:
-            print(f"[OS] App scan error: {e}")
-
-    def load_layout(self, path):
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except: return None
+    def _image_cache_bytes(self):
+        return sum(img.width * img.height * len(img.getbands()) for img in self.image_cache.values())
+
+    def _text_size_cache_bytes(self):
+        return sum(sys.getsizeof(key[0]) + 64 for key in self.text_size_cache)
 
-    def load_wallpaper(self, path):
-        """ Loads wallpaper, resizes to fit, and dims it by 70%. """
-        if not os.path.exists(path):
-            print("[UI] No wallpaper found.")
-            return None
-        
-        try:
-            print(f"[UI] Loading wallpaper: {path}")
-            # Ensure we can load truncated/imperfect JPEGs
-            ImageFile.LOAD_TRUNCATED_IMAGES = True 
-            
-            img = Image.open(path)
-            img.load() # Force load pixel data
-            
-            # Convert and Resize
-            img = img.convert("RGB")
-            img = img.resize((WIDTH, HEIGHT), Image.Resampling.LANCZOS)
-            
-            # Dim the image by 70% (Brightness 0.3) for text readability
-            enhancer = ImageEnhance.Brightness(img)
-            dimmed_img = enhancer.enhance(0.3)
-            
-            return dimmed_img
-
-        except Exception as e:
-            print(f"[UI] Wallpaper load error: {e}")
-            return None
-            
-            
     def get_image(self, path):
         if path.startswith("/home"):
             if "System" in path:
@@ -241,40 +176,19 @@ class NeoDCT_UI:
         except: return None
 
     def get_text_size(self, text, font):
-        bbox = self.draw.textbbox((0, 0), text, font=font)
-        return (bbox[2] - bbox[0], bbox[3] - bbox[1])
+        key = (text, font)
+        size = self.text_size_cache.get(key)
+        if size is None:
+            bbox = self.draw.textbbox((0, 0), text, font=font)
+            size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+            if len(self.text_size_cache) >= TEXT_SIZE_CACHE_MAX:
+                self.text_size_cache.clear()
+            self.text_size_cache[key] = size
+        return size
 
     # --- HOME SCREEN ---
     def render_element(self, el):
-        if el["type"] == "text":
-            text = el["text"]
-            if text == "12:00": text = time.strftime("%H:%M")
-            
-            # Font Selection
-            if el["font_size"] >= 20: font = self.font_xl
-            elif el["font_size"] >= 16: font = self.font_n
-            else: font = self.font_s
-            
-            w, h = self.get_text_size(text, font)
-            x, y = el["x"], el["y"]
-            
-            if "center_h" in el["anchor"]: x -= w // 2
-            elif "right" in el["anchor"]: x -= w
-            
-            self.draw.text((x, y), text, font=font, fill=el["color"])
-
-        elif el["type"] == "icon_set":
-            val = 3 
-            custom_path = el.get("custom_images", {}).get(str(val))
-            if custom_path:
-                img = self.get_image(custom_path)
-                if img: self.canvas.paste(img, (el["x"], el["y"]), img)
-            else:
-                for i in range(el["count"]):
-                    h = (i + 1) * 3
-                    color = "white" if i <= val else "#333333"
-                    bx = el["x"] + (i * 5)
-                    self.draw.rectangle((bx, el["y"] + 15 - h, bx + 3, el["y"] + 15), fill=color)
+        render_element(self, el)
 
     def render_home(self):
         # 1. Background Logic
@@ -297,6 +211,26 @@ class NeoDCT_UI:
         else:
             self.draw.text((10,10), "No Layout Found", fill="red")
 
+        # 3. Notification badges (in-memory counter snapshot, no query per frame)
+        self.render_badges()
+
+    def render_badges(self):
+        summary = self.data.summary()
+        lines = []
+        if summary["unread"]:
+            n = summary["unread"]
+            lines.append(f"{n} new message" + ("s" if n != 1 else ""))
+        if summary["missed_calls"]:
+            n = summary["missed_calls"]
+            lines.append(f"{n} missed call" + ("s" if n != 1 else ""))
+
+        y = 150
+        for text in lines:
+            w, h = self.get_text_size(text, self.font_s)
+            self.draw.rectangle(((WIDTH - w)//2 - 4, y - 2, (WIDTH + w)//2 + 4, y + h + 4), fill="black")
+            self.draw.text(((WIDTH - w)//2, y), text, font=self.font_s, fill="white")
+            y += h + 10
+
     def render_home_dialing(self):
         if self.wallpaper:
              self.canvas.paste(self.wallpaper, (0, 0))
@@ -306,20 +240,36 @@ class NeoDCT_UI:
         if self.dial_buffer:
             w, h = self.get_text_size(self.dial_buffer, self.font_xl)
             self.draw.text(((WIDTH - w)//2, 80), self.dial_buffer, font=self.font_xl, fill="white")
+
+        # T9 matches (name or number) under the typed digits
+        y = 125
+        for i, contact in enumerate(self.t9_matches):
+            if i == self.t9_selected:
+                self.draw.rectangle((10, y - 2, 230, y + 24), fill="white")
+                color = "black"
+            else:
+                color = "white"
+            num_w, _ = self.get_text_size(contact.number, self.font_s)
+            self.draw.text((225 - num_w, y + 4), contact.number, font=self.font_s, fill=color)
+            name = contact.name
+            while len(name) > 1 and self.get_text_size(name, self.font_n)[0] > 215 - num_w - 15:
+                name = name[:-1]
+            if name != contact.name:
+                name = name[:-1] + ".."
+            self.draw.text((15, y), name, font=self.font_n, fill=color)
+            y += 27
         
         w, h = self.get_text_size("Call", self.font_n)
         self.draw.text(((WIDTH - w)//2, 210), "Call", font=self.font_n, fill="white")
 
 
     def launch_app(self, app):
-        path = os.path.join(app["path"], app["exec"])
-
-        spec = importlib.util.spec_from_file_location("neodct_app", path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        if hasattr(module, "run"):
-            module.run(self)
+        save_last_screen({"app": app["path"]})
+        if app.get("isolated"):
+            AppHost(self, app).run()
+        else:
+            self.app_loader.launch(app, self)
+        clear_last_screen()
 
     def render_menu(self):
         menu = AppSelector("Main Menu", self.apps, self, background=self.wallpaper)
@@ -343,11 +293,8 @@ class NeoDCT_UI:
         elif self.state == "MENU":
             self.render_menu()
 
-    def read_keypress(self, timeout=0.1):
-        r, _, _ = select.select([self.keypad_fd], [], [], timeout)
-        if not r:
-            return None
-
+    def read_event(self):
+        """ Reads one input event from the keypad. Returns the key code on key-press, else None. """
         data = os.read(self.keypad_fd, 24)
         if len(data) == 24:
             sec, usec, type, code, val = struct.unpack('llHHI', data)
@@ -360,28 +307,66 @@ class NeoDCT_UI:
             return code
         return None
 
+    def read_keypress(self, timeout=0.1):
+        """ Blocking key read; background coroutines on self.runtime keep running meanwhile. """
+        key = self.runtime.read_key(timeout)
+        if key is None:
+            self.memory.service()
+            self.power.tick()
+            if self.power.blanked:
+                # Display is off: park here so no caller keeps redrawing.
+                self.power.wait_blanked(self.runtime.read_key, self.idle_service)
+                self.maintenance.cancel()
+            return None
+        if self.power.on_key():
+            return None
+        return key
+
+    def idle_service(self):
+        """ Housekeeping while the display is blanked. """
+        self.memory.service()
+        self.maintenance.service()
+
     def wait_for_key(self):
         while True:
             key = self.read_keypress(0.1)
             if key is not None:
                 return key
 
+    def update_t9(self):
+        digits = "".join(ch for ch in self.dial_buffer if ch.isdigit())
+        self.t9_matches = self.t9.lookup(digits)
+        self.t9_selected = -1
+
     def handle_input(self, code):
         if code == 28: 
             if self.state == "HOME":
                 self.state = "MENU"
             elif self.state == "HOME_DIALING":
-                self.modem.dial(self.dial_buffer)
-                dialer_ui.show_calling(self, self.dial_buffer)
+                if self.t9_selected >= 0:
+                    contact = self.t9_matches[self.t9_selected]
+                    self.modem.dial(contact.number)
+                    dialer_ui.show_calling(self, contact.number, contact.name)
+                else:
+                    self.modem.dial(self.dial_buffer)
+                    dialer_ui.show_calling(self, self.dial_buffer)
                 self.dial_buffer = ""
+                self.update_t9()
                 self.state = "HOME"
 
         elif code == 14:
             if self.state == "HOME_DIALING":
                 self.dial_buffer = self.dial_buffer[:-1]
+                self.update_t9()
                 if not self.dial_buffer:
                     self.state = "HOME"
 
+        elif code in (103, 108) and self.state == "HOME_DIALING":
+            # Move the highlight through the T9 matches (above the first = the typed number)
+            if self.t9_matches:
+                step = 1 if code == 108 else -1
+                self.t9_selected = max(-1, min(len(self.t9_matches) - 1, self.t9_selected + step))
+
         elif code in (103, 108) and self.state == "HOME":
             target = contact_manager.show_contact_selector(self, title="Select", btn_text="Call")
             if target:
@@ -393,14 +378,29 @@ class NeoDCT_UI:
         elif code in self.DEV_KEYMAP and self.state in ("HOME", "HOME_DIALING"):
             char = self.DEV_KEYMAP[code]
             self.dial_buffer += char
+            self.update_t9()
             self.state = "HOME_DIALING"
 
-def run(fb):
-    ui = NeoDCT_UI(fb)
+def run(fb, on_progress=None, warm=None, restore=None):
+    ui = NeoDCT_UI(fb, on_progress=on_progress, warm=warm)
+    ui.app_loader.preload(ui.apps)
+    ui.t9.preload()
+
+    # Reopen the app that was on screen before a crash (see System.core.Supervisor).
+    if restore and restore.get("app"):
+        for app in ui.apps:
+            if app["path"] == restore["app"]:
+                print(f"[KERNEL] Restoring {app['name']} after crash")
+                ui.launch_app(app)
+                break
+
     print("[KERNEL] Entering Main Loop...")
 
     while True:
         ui.update()
+        if not BOOT.reported:
+            BOOT.mark("home screen")
+            BOOT.report()
         key = ui.read_keypress(0.1)
         if key is not None:
             print(f"[INPUT] Code: {key}")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Fake SIM7600 on a pty, for exercising ModemService without hardware.
+
+- Opens a pseudo-terminal and prints its path; point NeoDCT at it with
+  NEODCT_MODEM_PORT=<path> (or "port" in /NeoDCT/User/modem.json), or use
+  --link to keep a stable symlink
+- Answers the AT commands ModemService sends (echo, init settings, +CSQ,
+  +CREG?, ATD/ATA/AT+CHUP, +CMGR/+CMGL/+CMGD) including ';'-concatenated
+  command lines; anything else gets ERROR. Stored SMS are listed in text or
+  PDU mode (+CMGF), honouring the "don't mark read" mode of +CMGR/+CMGL
+- Console commands inject network events as unsolicited result codes:
+
+      ring <number>          RING + +CLIP (repeat for more rings)
+      answer                 the dialed party picks up (VOICE CALL: BEGIN)
+      hangup                 the other party hangs up / stops ringing
+      sms <number> <text>    store an SMS on the "SIM" and send +CMTI
+      csq <rssi>             signal change (+CSQ, 0-31 or 99)
+      creg <stat>            registration change (+CREG)
+      delay <seconds>        answer commands late (exercises timeouts)
+      raw <line>             send any line
+      quit
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import select
+import sys
+import time
+import tty
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from System.core.ModemService.pdu import encode_deliver
+
+DEFAULT_RSSI = 20
+SMS_STORAGE = 30  # SIM slots
+SMS_STATS = ("REC UNREAD", "REC READ", "STO UNSENT", "STO SENT", "ALL")  # PDU mode <stat> 0-4
+
+
+class FakeModem:
+    def __init__(self, fd: int, auto_answer: float = 0.0, delay: float = 0.0) -> None:
+        self.fd = fd
+        self.auto_answer = auto_answer  # seconds until a dialed call is picked up, 0 = wait for 'answer'
+        self.delay = delay
+        self.echo = True
+        self.creg_mode = 0
+        self.autocsq = False
+        self.rssi = DEFAULT_RSSI
+        self.stat = 1  # registered, home network
+        self.call: Optional[Dict[str, object]] = None  # {"number", "incoming", "active", "since"}
+        self.pdu_mode = True  # +CMGF=0 (the default)
+        self.sms: Dict[int, Tuple[str, str, int, str]] = {}  # index: (stat, number, timestamp, body)
+        self.rx = b""
+        self.outbox: List[Tuple[float, bytes]] = []  # (due, data)
+
+    # --- OUTPUT ---
+    def _send(self, data: bytes, delay: float = 0.0) -> None:
+        self.outbox.append((time.monotonic() + delay, data))
+
+    def urc(self, line: str) -> None:
+        print(f"[FAKEMODEM] <- {line}")
+        self._send(f"\r\n{line}\r\n".encode())
+
+    def flush(self) -> Optional[float]:
+        """Writes what is due; returns seconds until the next queued write (None if nothing is queued)."""
+        now = time.monotonic()
+        while self.outbox and self.outbox[0][0] <= now:
+            os.write(self.fd, self.outbox.pop(0)[1])
+        return max(0.0, self.outbox[0][0] - now) if self.outbox else None
+
+    # --- COMMANDS ---
+    def feed(self, data: bytes) -> None:
+        self.rx += data
+        while b"\r" in self.rx:
+            raw, self.rx = self.rx.split(b"\r", 1)
+            line = raw.decode("utf-8", "replace").strip("\n ")
+            if not line:
+                continue
+            print(f"[FAKEMODEM] -> {line}")
+            reply = b""
+            if self.echo:
+                reply += line.encode() + b"\r"
+            lines, result = self.execute(line)
+            reply += b"".join(f"\r\n{text}\r\n".encode() for text in lines + [result])
+            for text in lines + [result]:
+                print(f"[FAKEMODEM] <- {text}")
+            # Responses stay in order behind any earlier, delayed ones.
+            due = max([time.monotonic() + self.delay] + [d for d, _ in self.outbox])
+            self.outbox.append((due, reply))
+
+    def execute(self, line: str) -> Tuple[List[str], str]:
+        if not line.upper().startswith("AT"):
+            return [], "ERROR"
+        body = line[2:]
+        if body[:1].upper() == "D":
+            parts = [body]  # the ';' ends a voice dial string
+        else:
+            parts = [part for part in body.split(";") if part]
+        lines: List[str] = []
+        for part in parts or [""]:
+            result = self.command(part, lines)
+            if result != "OK":
+                return lines, result
+        return lines, "OK"
+
+    def command(self, cmd: str, lines: List[str]) -> str:
+        upper = cmd.upper()
+        if upper == "":
+            return "OK"
+        if upper in ("E0", "E1"):
+            self.echo = upper == "E1"
+            return "OK"
+        if upper.startswith(("+CMEE=", "+CLIP=", "+CNMI=", "+CSCS=")):
+            return "OK"
+        if upper.startswith("+CMGF="):
+            self.pdu_mode = upper.split("=", 1)[1] == "0"
+            return "OK"
+        if upper.startswith("+AUTOCSQ="):
+            self.autocsq = upper.split("=", 1)[1].startswith("1")
+            return "OK"
+        if upper.startswith("+CREG="):
+            self.creg_mode = int(upper.split("=", 1)[1] or 0)
+            return "OK"
+        if upper == "+CREG?":
+            lines.append(f"+CREG: {self.creg_mode},{self.stat}")
+            return "OK"
+        if upper == "+CSQ":
+            lines.append(f"+CSQ: {self.rssi},99")
+            return "OK"
+        if upper.startswith("D"):
+            if self.call is not None or self.stat not in (1, 5):
+                return "NO CARRIER"
+            self.call = {"number": cmd[1:].rstrip(";"), "incoming": False, "active": False, "since": time.monotonic()}
+            if self.auto_answer:
+                self._send(b"\r\nVOICE CALL: BEGIN\r\n", self.auto_answer)
+                self.call["active"] = True
+            return "OK"
+        if upper == "A":
+            if not self.call or not self.call["incoming"]:
+                return "NO CARRIER"
+            self.call["active"] = True
+            self.call["since"] = time.monotonic()
+            self._send(b"\r\nVOICE CALL: BEGIN\r\n", 0.05)
+            return "OK"
+        if upper in ("+CHUP", "H"):
+            if self.call and self.call["active"]:
+                self._send(f"\r\nVOICE CALL: END: {self._call_seconds():06d}\r\n".encode(), 0.05)
+            self.call = None
+            return "OK"
+        if upper.startswith("+CMGR="):
+            args = upper.split("=", 1)[1].split(",")
+            index = int(args[0])
+            if index not in self.sms:
+                return "+CMS ERROR: 321"
+            self._list_sms("+CMGR", index, lines, mark_read=args[1:] != ["1"])
+            return "OK"
+        if upper.startswith("+CMGL"):
+            args = cmd.split("=", 1)[1].split(",") if "=" in cmd else ["0" if self.pdu_mode else "REC UNREAD"]
+            wanted = args[0].strip('"')
+            if self.pdu_mode:
+                if not wanted.isdigit() or int(wanted) >= len(SMS_STATS):
+                    return "+CMS ERROR: 302"
+                wanted = SMS_STATS[int(wanted)]
+            for index, (stat, *_) in sorted(self.sms.items()):
+                if wanted in (stat, "ALL"):
+                    self._list_sms("+CMGL", index, lines, mark_read=args[1:] != ["1"])
+            return "OK"
+        if upper.startswith("+CMGD="):
+            self.sms.pop(int(upper.split("=", 1)[1].split(",")[0]), None)
+            return "OK"
+        return "ERROR"
+
+    def _list_sms(self, verb: str, index: int, lines: List[str], mark_read: bool) -> None:
+        stat, number, timestamp, text = self.sms[index]
+        listed = f"{index}," if verb == "+CMGL" else ""
+        if self.pdu_mode:
+            pdu = encode_deliver(number, text, timestamp, -time.timezone // 900)
+            lines.append(f"{verb}: {listed}{SMS_STATS.index(stat)},,{len(pdu) // 2 - 1}")
+            lines.append(pdu)
+        else:
+            tz = -time.timezone // 900
+            scts = time.strftime("%y/%m/%d,%H:%M:%S", time.localtime(timestamp)) + f"{tz:+03d}"
+            lines.append(f'{verb}: {listed}"{stat}","{number}","","{scts}"')
+            lines.extend(text.split("\n"))
+        if mark_read:
+            self.sms[index] = ("REC READ", number, timestamp, text)
+
+    def _call_seconds(self) -> int:
+        return int(time.monotonic() - self.call["since"]) if self.call else 0
+
+    # --- NETWORK EVENTS ---
+    def ring(self, number: str) -> None:
+        if self.call is None:
+            self.call = {"number": number, "incoming": True, "active": False, "since": time.monotonic()}
+        self.urc("RING")
+        self.urc(f'+CLIP: "{number}",129,"",0,"",0')
+
+    def remote_answer(self) -> None:
+        if self.call and not self.call["incoming"] and not self.call["active"]:
+            self.call["active"] = True
+            self.call["since"] = time.monotonic()
+            self.urc("VOICE CALL: BEGIN")
+
+    def remote_hangup(self) -> None:
+        if self.call is None:
+            return
+        if self.call["active"]:
+            self.urc(f"VOICE CALL: END: {self._call_seconds():06d}")
+        elif self.call["incoming"]:
+            self.urc(f"MISSED_CALL: {time.strftime('%I:%M%p')} {self.call['number']}")
+        else:
+            self.urc("NO CARRIER")
+        self.call = None
+
+    def receive_sms(self, number: str, text: str) -> None:
+        free = [index for index in range(SMS_STORAGE) if index not in self.sms]
+        if not free:
+            print("[FAKEMODEM] SIM storage full")
+            return
+        self.sms[free[0]] = ("REC UNREAD", number, int(time.time()), text)
+        self.urc(f'+CMTI: "SM",{free[0]}')
+
+    def set_signal(self, rssi: int) -> None:
+        self.rssi = rssi
+        if self.autocsq:
+            self.urc(f"+CSQ: {rssi},99")
+
+    def set_registration(self, stat: int) -> None:
+        self.stat = stat
+        if self.creg_mode:
+            self.urc(f"+CREG: {stat}")
+
+    def console(self, line: str) -> bool:
+        """Runs one console command; False to quit."""
+        words = line.split()
+        if not words:
+            return True
+        verb, args = words[0].lower(), words[1:]
+        try:
+            if verb == "quit":
+                return False
+            if verb == "ring":
+                self.ring(args[0])
+            elif verb == "answer":
+                self.remote_answer()
+            elif verb == "hangup":
+                self.remote_hangup()
+            elif verb == "sms":
+                self.receive_sms(args[0], " ".join(args[1:]))
+            elif verb == "csq":
+                self.set_signal(int(args[0]))
+            elif verb == "creg":
+                self.set_registration(int(args[0]))
+            elif verb == "delay":
+                self.delay = float(args[0])
+            elif verb == "raw":
+                self.urc(line.split(None, 1)[1])
+            else:
+                print(__doc__)
+        except (IndexError, ValueError):
+            print(f"[FAKEMODEM] Bad arguments: {line}")
+        return True
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fake SIM7600 AT modem on a pty.")
+    parser.add_argument("--link", help="Symlink to the pty (e.g. /tmp/neodct-modem)")
+    parser.add_argument("--auto-answer", type=float, default=0.0,
+                        help="Seconds until dialed calls are picked up (0: wait for 'answer')")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering commands")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    if args.link:
+        if os.path.islink(args.link):
+            os.unlink(args.link)
+        os.symlink(path, args.link)
+        path = args.link
+    print(f"[FAKEMODEM] Listening on {path} (NEODCT_MODEM_PORT={path})")
+
+    modem = FakeModem(master, auto_answer=args.auto_answer, delay=args.delay)
+    inputs = [master, sys.stdin.fileno()]
+    try:
+        while True:
+            wait = modem.flush()
+            readable, _, _ = select.select(inputs, [], [], wait)
+            if master in readable:
+                try:
+                    modem.feed(os.read(master, 1024))
+                except OSError:
+                    time.sleep(0.1)  # no client has the pty open (yet)
+            if sys.stdin.fileno() in readable:
+                line = sys.stdin.readline()
+                if not line:
+                    inputs.remove(sys.stdin.fileno())
+                elif not modem.console(line.strip()):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.link and os.path.islink(args.link):
+            os.unlink(args.link)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Generate a realistic, reproducible phonebook + SMS dataset offline.
+
+- Deterministic: the same --seed and --scale always give the same rows
+  (timestamps count back from a fixed BASE_TIME, not from "now")
+- Contacts: first/last names from built-in lists, NANP numbers written in the
+  mixed formats people actually type ("+1 415-555-0142", "(415) 555 0142", ...)
+- Threads: a few contacts get most of the traffic (Zipf-like), plus short codes
+  and unknown numbers; messages arrive in back-and-forth bursts
+- Bodies: chat lines, one-time codes, addresses, links and reminders, so search
+  benchmarks see realistic vocabulary
+- Writes through the DataService (batched transactions, same schema/migrations
+  as the phone)
+- Refuses to add to databases that already hold contacts or messages, since a
+  second run would duplicate every message; --truncate replaces them instead
+
+Scales: 1k / 10k / 100k messages (see SCALES for the contact counts).
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import random
+import sys
+from typing import Iterator, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from System.core.DataService import (
+    DB_DIR, INCOMING, MESSAGES_DB, OUTGOING, PHONEBOOK_DB, RECEIVED, SENT, DataService,
+)
+
+BASE_TIME = 1_700_000_000  # fixed "now" so runs are reproducible
+DEFAULT_SEED = 1
+BATCH = 1000
+SCALES = {
+    # name: (contacts, messages)
+    "1k": (200, 1_000),
+    "10k": (1_000, 10_000),
+    "100k": (5_000, 100_000),
+}
+
+FIRST_NAMES = [
+    "Aaliyah", "Aaron", "Abigail", "Adam", "Aiden", "Alejandro", "Alexis", "Ali", "Amara", "Amelia",
+    "Ana", "Andre", "Anika", "Ava", "Benjamin", "Bianca", "Brandon", "Camila", "Carlos", "Chen",
+    "Chloe", "Daniel", "Darius", "David", "Diego", "Dmitri", "Elena", "Eli", "Emily", "Emma",
+    "Fatima", "Felix", "Gabriel", "Grace", "Hannah", "Hiro", "Ibrahim", "Isabella", "Jack", "Jamal",
+    "James", "Javier", "Jin", "John", "Jose", "Julia", "Kai", "Kenji", "Khalid", "Laila",
+    "Leah", "Liam", "Lucas", "Luis", "Maya", "Mei", "Mia", "Michael", "Mohammed", "Nadia",
+    "Naomi", "Nia", "Noah", "Olivia", "Omar", "Priya", "Rafael", "Ravi", "Rosa", "Ryan",
+    "Sakura", "Samuel", "Sara", "Sofia", "Tariq", "Thomas", "Valentina", "Wei", "Yara", "Zoe",
+]
+LAST_NAMES = [
+    "Adams", "Ahmed", "Alvarez", "Anderson", "Bailey", "Brown", "Chen", "Clark", "Cohen", "Costa",
+    "Davis", "Diaz", "Evans", "Fischer", "Garcia", "Gonzalez", "Green", "Gupta", "Hall", "Harris",
+    "Hernandez", "Hill", "Ito", "Jackson", "Johnson", "Khan", "Kim", "Kowalski", "Lee", "Lopez",
+    "Martin", "Martinez", "Moore", "Muller", "Nguyen", "Novak", "Okafor", "Patel", "Perez", "Petrov",
+    "Ramirez", "Reyes", "Roberts", "Rossi", "Sanchez", "Santos", "Schmidt", "Silva", "Singh", "Smith",
+    "Suzuki", "Tanaka", "Taylor", "Thomas", "Thompson", "Walker", "Wang", "White", "Williams", "Wilson",
+]
+AREA_CODES = ["212", "303", "312", "415", "503", "512", "617", "646", "702", "718", "808", "917"]
+SHORT_CODES = ["32665", "72975", "22000", "89203", "454545"]
+
+GREETINGS = ["hey", "hi", "yo", "morning", "hello", "ok so", "quick q"]
+CHAT = [
+    "are you free tonight", "running 10 min late", "did you see the game", "can you call me back",
+    "thanks for dinner", "see you at the station", "just landed", "leaving work now",
+    "what time works for you", "happy birthday!!", "lol yes", "sounds good", "on my way",
+    "can you pick up milk", "the meeting moved to friday", "did the package arrive",
+    "I left my keys at yours", "movie starts at 8", "let me know when you're home", "miss you",
+]
+PLACES = [
+    "221 Baker St", "4 Privet Drive", "742 Evergreen Terrace", "1600 Amphitheatre Pkwy",
+    "31 Spooner St", "12 Grimmauld Pl", "gate B14", "platform 9", "the north entrance", "cafe on 5th",
+]
+SERVICES = ["Bank", "Courier", "Pharmacy", "Airline", "Clinic", "Mobile"]
+
+
+def _number(rng: random.Random, used: set) -> str:
+    """A unique NANP number in one of several human-typed formats."""
+    while True:
+        area, line = rng.choice(AREA_CODES), rng.randint(0, 9999)
+        key = (area, line)
+        if key not in used:
+            used.add(key)
+            break
+    fmt = rng.randrange(4)
+    if fmt == 0:
+        return f"+1 {area}-555-{line:04d}"
+    if fmt == 1:
+        return f"({area}) 555 {line:04d}"
+    if fmt == 2:
+        return f"{area}555{line:04d}"
+    return f"{area}-555-{line:04d}"
+
+
+def generate_contacts(rng: random.Random, count: int, used: set) -> List[Tuple[str, str]]:
+    contacts = []
+    for _ in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        contacts.append((name, _number(rng, used)))
+    return contacts
+
+
+def _body(rng: random.Random, sender_name: str) -> str:
+    kind = rng.random()
+    if kind < 0.55:
+        text = rng.choice(CHAT)
+        if rng.random() < 0.3:
+            text = f"{rng.choice(GREETINGS)} {sender_name.split()[0].lower()}, {text}"
+        return text
+    if kind < 0.75:
+        return f"meet at {rng.choice(PLACES)} around {rng.randint(1, 12)}:{rng.choice(['00', '15', '30', '45'])}"
+    if kind < 0.9:
+        return f"{rng.choice(SERVICES)}: your verification code is {rng.randint(0, 999999):06d}. Do not share it."
+    return f"{rng.choice(SERVICES)} reminder: appointment #{rng.randint(1000, 99999)} see https://ex.invalid/{rng.randint(0, 1 << 24):x}"
+
+
+def generate_messages(
+    rng: random.Random, contacts: List[Tuple[str, str]], count: int, used: set
+) -> Iterator[Tuple[str, str, str, str, int, bool]]:
+    """Yields DataService.add_messages rows, oldest first, in conversational bursts."""
+    unknown = [(f"Unknown {i}", _number(rng, used)) for i in range(max(1, len(contacts) // 10))]
+    peers = contacts + unknown + [(code, code) for code in SHORT_CODES]
+    # Zipf-like weights: the first few peers dominate.
+    weights = [1.0 / (rank + 1) for rank in range(len(peers))]
+    rng.shuffle(peers)
+
+    timestamp = BASE_TIME - count * 600
+    emitted = 0
+    while emitted < count:
+        name, number = rng.choices(peers, weights)[0]
+        is_short_code = number in SHORT_CODES
+        burst = 1 if is_short_code else rng.randint(1, 8)
+        for _ in range(min(burst, count - emitted)):
+            timestamp += rng.randint(5, 1200)
+            outgoing = not is_short_code and rng.random() < 0.45
+            unread = not outgoing and emitted > count * 0.97 and rng.random() < 0.5
+            yield (
+                OUTGOING if outgoing else INCOMING,
+                SENT if outgoing else RECEIVED,
+                _body(rng, name),
+                number,
+                timestamp,
+                not unread,
+            )
+            emitted += 1
+
+
+def generate(db_dir: str, scale: str, seed: int = DEFAULT_SEED, truncate: bool = False) -> Tuple[int, int]:
+    """
+    Fills db_dir's phonebook.db and sms.db. Returns (contacts added, messages added).
+    Raises RuntimeError if they already hold data and truncate is False.
+    """
+    contact_count, message_count = SCALES[scale]
+    rng = random.Random(seed)
+    data = DataService(db_dir)
+    try:
+        if truncate:
+            data.execute(PHONEBOOK_DB, "DELETE FROM contacts")
+            data.execute(MESSAGES_DB, "DELETE FROM messages")  # triggers drop the emptied threads
+        elif data.contact_count() or data.query(MESSAGES_DB, "SELECT 1 FROM messages LIMIT 1"):
+            raise RuntimeError(f"{db_dir} already holds contacts or messages; use --truncate to replace them")
+
+        used: set = set()
+        contacts = generate_contacts(rng, contact_count, used)
+        added, skipped = data.import_contacts(contacts)
+        logging.info("Contacts: %d added, %d duplicates skipped", added, skipped)
+
+        batch: List[Tuple[str, str, str, str, int, bool]] = []
+        stored = 0
+        for row in generate_messages(rng, contacts, message_count, used):
+            batch.append(row)
+            if len(batch) >= BATCH:
+                stored += len(data.add_messages(batch))
+                batch = []
+                logging.info("Messages: %d/%d", stored, message_count)
+        if batch:
+            stored += len(data.add_messages(batch))
+        logging.info("Messages: %d stored", stored)
+        return added, stored
+    finally:
+        data.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a reproducible NeoDCT phonebook/SMS dataset offline.")
+    parser.add_argument("--db-dir", default=DB_DIR, help="Directory holding phonebook.db and sms.db")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="1k", help="Dataset size (messages)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed (same seed, same data)")
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="Delete existing contacts and messages first",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="[DATASET] %(message)s")
+    args = parse_args()
+    try:
+        generate(args.db_dir, args.scale, args.seed, args.truncate)
+    except RuntimeError as e:
+        logging.error("%s", e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
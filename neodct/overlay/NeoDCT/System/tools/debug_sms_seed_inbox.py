@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-"""Seed NeoDCT SMS inbox with random messages."""
+"""Seed NeoDCT SMS inbox with random messages (unified messages table in sms.db)."""
 
 from __future__ import annotations
 
@@ -7,11 +7,15 @@ import argparse
 import logging
 import os
 import random
-import sqlite3
+import sys
 import time
 from typing import Iterable, List
 
-DEFAULT_DB = "/NeoDCT/User/db/sms_inbox.db"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from System.core.DataService import INCOMING, MESSAGES_DB, RECEIVED, DataService
+
+DEFAULT_DB = "/NeoDCT/User/db/sms.db"
 DEFAULT_SENDER = "555-1234"
 DEFAULT_COUNT = 50
 WORDS = [
@@ -44,18 +48,11 @@ WORDS = [
 ]
 
 
-def ensure_schema(conn: sqlite3.Connection) -> None:
-    conn.execute(
-        """
-        CREATE TABLE IF NOT EXISTS inbox
-        (id INTEGER PRIMARY KEY AUTOINCREMENT,
-         message TEXT,
-         sender TEXT,
-         timestamp INTEGER,
-         is_read INTEGER DEFAULT 0)
-        """
-    )
-    conn.commit()
+def open_db(db_path: str) -> DataService:
+    """Opens db_path's directory through the DataService so the schema is migrated like on the phone."""
+    if os.path.basename(db_path) != f"{MESSAGES_DB}.db":
+        raise ValueError(f"Not the NeoDCT messages database: {db_path}")
+    return DataService(os.path.dirname(db_path))
 
 
 def iter_messages(word_pool: Iterable[str], count: int, words_per_message: int) -> List[str]:
@@ -73,18 +70,16 @@ def seed_inbox(db_path: str, sender: str, count: int, words_per_message: int) ->
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
 
     logging.info("Opening inbox database: %s", db_path)
-    with sqlite3.connect(db_path) as conn:
-        ensure_schema(conn)
+    data = open_db(db_path)
+    try:
         now = int(time.time())
         messages = iter_messages(WORDS, count, words_per_message)
-        rows = [(message, sender, now + idx, 0) for idx, message in enumerate(messages)]
-        for message, sender_number, timestamp, _ in rows:
+        rows = [(INCOMING, RECEIVED, message, sender, now + idx, False) for idx, message in enumerate(messages)]
+        for _, _, message, sender_number, timestamp, _ in rows:
             logging.info("Queueing message from %s at %d: %s", sender_number, timestamp, message)
-        conn.executemany(
-            "INSERT INTO inbox (message, sender, timestamp, is_read) VALUES (?, ?, ?, ?)",
-            rows,
-        )
-        conn.commit()
+        data.add_messages(rows)
+    finally:
+        data.close()
 
     logging.info("Inserted %d messages into %s", count, db_path)
     return count
@@ -92,7 +87,7 @@ def seed_inbox(db_path: str, sender: str, count: int, words_per_message: int) ->
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Seed NeoDCT SMS inbox with random messages.")
-    parser.add_argument("--db", default=DEFAULT_DB, help="Path to sms_inbox.db")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Path to sms.db")
     parser.add_argument("--sender", default=DEFAULT_SENDER, help="Sender number for messages")
     parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="Number of messages to insert")
     parser.add_argument(
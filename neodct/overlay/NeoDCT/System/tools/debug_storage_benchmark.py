@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Benchmark the NeoDCT data layer (DataService and the indexes built on it).
+
+- Runs against a throwaway copy: either a generated dataset (--scale/--seed,
+  see debug_generate_dataset.py) or a copy of an existing --db-dir, so deletes
+  and inserts never touch real user data
+- Measures what the apps actually do: opening and scrolling Inbox/Outbox/
+  Conversations, listing and searching contacts, T9 and caller-ID lookups,
+  message search, badge summary, single inserts, ingest bursts and deletes,
+  and the call log (ring-capped inserts, per-type and per-number lists)
+- Reports median / p95 / max latency per operation in milliseconds
+- --json saves the results; --compare prints the change against a saved run,
+  so storage changes can be judged on numbers
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from System.apps.PhoneBook.shared.t9 import T9Index, word_to_digits
+from System.core.DataService import (
+    CALL_LOG_LIMIT, CALL_TYPES, CALLS_DB, MESSAGES_DB, PHONEBOOK_DB, DataService,
+)
+from System.core.MessageIngest import MessageIngest
+from System.core.PhoneNumbers import NumberResolver
+from System.tools.debug_generate_dataset import DEFAULT_SEED, SCALES, generate
+
+DEFAULT_REPEAT = 50
+SCROLL_PAGES = 10
+INGEST_BURST = 100
+SEARCH_TERMS = ["code", "baker", "gate b14", "running late", "appointment", "zzzz"]
+
+
+class Bench:
+    def __init__(self, repeat: int) -> None:
+        self.repeat = repeat
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, samples: List[float]) -> None:
+        samples = sorted(samples)
+        self.results[name] = {
+            "n": len(samples),
+            "median_ms": statistics.median(samples) * 1000,
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+            "max_ms": samples[-1] * 1000,
+        }
+
+    def time(self, name: str, func: Callable[[int], object], repeat: Optional[int] = None) -> None:
+        """Runs func(i) `repeat` times and records each call's latency."""
+        samples = []
+        for i in range(repeat or self.repeat):
+            started = time.perf_counter()
+            func(i)
+            samples.append(time.perf_counter() - started)
+        self.record(name, samples)
+
+
+def _copy_db_dir(src: str, dst: str) -> None:
+    for name in (PHONEBOOK_DB, MESSAGES_DB, CALLS_DB):
+        path = os.path.join(src, f"{name}.db")
+        if not os.path.exists(path):
+            continue
+        # sqlite backup API: a consistent copy even with a live WAL
+        source = sqlite3.connect(path)
+        target = sqlite3.connect(os.path.join(dst, f"{name}.db"))
+        with target:
+            source.backup(target)
+        source.close()
+        target.close()
+
+
+def _scroll(page: Callable, pages: int) -> None:
+    after = None
+    for _ in range(pages):
+        rows = page(after)
+        if not rows:
+            return
+        after = rows[-1]
+
+
+def run_benchmarks(db_dir: str, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    rng = random.Random(seed)
+    bench = Bench(repeat)
+
+    # --- OPEN (cold: new connection, pragmas, migration check, first page) ---
+    def cold_open(_):
+        service = DataService(db_dir)
+        service.inbox_page()
+        service.close()
+    bench.time("inbox open (cold)", cold_open, repeat=min(repeat, 10))
+
+    data = DataService(db_dir)
+    contacts = data.contacts()
+    threads = data.threads_page(limit=1000)
+
+    # --- LISTS ---
+    bench.time("inbox open", lambda _: data.inbox_page())
+    bench.time("outbox open", lambda _: data.outbox_page())
+    samples = []
+    for _ in range(max(1, repeat // SCROLL_PAGES)):
+        after = None
+        for _ in range(SCROLL_PAGES):
+            started = time.perf_counter()
+            rows = data.inbox_page(after)
+            samples.append(time.perf_counter() - started)
+            if not rows:
+                break
+            after = rows[-1]
+    bench.record(f"inbox scroll ({SCROLL_PAGES} pages deep)", samples)
+    bench.time("conversations open", lambda _: data.threads_page())
+    if threads:
+        busiest = max(threads, key=lambda t: t.message_count)
+        bench.time("conversation open", lambda _: data.thread_page(busiest.id))
+        bench.time(
+            f"conversation scroll ({SCROLL_PAGES} pages)",
+            lambda _: _scroll(lambda after: data.thread_page(busiest.id, after), SCROLL_PAGES),
+            repeat=max(1, repeat // SCROLL_PAGES),
+        )
+
+    # --- CONTACTS ---
+    bench.time("contacts list (all)", lambda _: data.contacts(), repeat=min(repeat, 20))
+    names = [c.name for c in contacts] or ["nobody"]
+    for length in (1, 2, 4):
+        queries = [rng.choice(names)[:length] for _ in range(repeat)]
+        bench.time(f"contact search ({length} chars)", lambda i: data.search_contacts(queries[i], 50))
+
+    started = time.perf_counter()
+    t9 = T9Index(data)
+    t9.load()
+    bench.record("t9 index build", [time.perf_counter() - started])
+    digits = [word_to_digits(rng.choice(names))[:3] for _ in range(repeat)]
+    bench.time("t9 lookup (3 digits)", lambda i: t9.lookup(digits[i]))
+
+    numbers = [c.number for c in contacts] or ["5550000"]
+    lookups = [rng.choice(numbers) for _ in range(repeat)]
+    resolver = NumberResolver(data)
+    resolver.resolve(lookups[0])  # version check / backfill out of the way
+
+    def resolve_cold(i):
+        resolver.cache.clear()
+        resolver.resolve(lookups[i])
+    bench.time("caller id resolve (uncached)", resolve_cold)
+
+    # --- SEARCH / BADGES ---
+    for term in SEARCH_TERMS:
+        bench.time(f"message search '{term}'", lambda _: data.search_messages(term), repeat=min(repeat, 20))
+
+    def summary_cold(_):
+        data.summary_cache = None
+        data.summary()
+    bench.time("badge summary (uncached)", summary_cold)
+
+    # --- WRITES ---
+    senders = [rng.choice(numbers) for _ in range(repeat)]
+    inserted: List[int] = []
+    bench.time("insert message (own commit)", lambda i: inserted.append(
+        data.save_incoming_message(senders[i], f"benchmark message {i}")))
+
+    ingest = MessageIngest(data, config={"window_ms": 50, "max_batch": 32, "durability": "normal"})
+    samples = []
+    for burst in range(max(1, repeat // 10)):
+        started = time.perf_counter()
+        for i in range(INGEST_BURST):
+            ingest.submit(rng.choice(numbers), f"burst {burst} message {i}")
+        ingest.flush()
+        samples.append((time.perf_counter() - started) / INGEST_BURST)
+    bench.record(f"ingest burst (per message, {INGEST_BURST}/burst)", samples)
+
+    newest = [row.id for row in data.inbox_page(limit=repeat)]
+    bench.time("delete message", lambda i: data.delete_message(newest[i]), repeat=len(newest))
+
+    # --- CALL LOG (filled past the cap, so every timed insert also drops the oldest call) ---
+    for i in range(CALL_LOG_LIMIT):
+        data.add_call(rng.choice(CALL_TYPES), rng.choice(numbers), duration=rng.randint(0, 600))
+    bench.time("log call (ring full)", lambda i: data.add_call(CALL_TYPES[i % 3], senders[i], duration=60))
+    for call_type in CALL_TYPES:
+        bench.time(f"call list open ({call_type})", lambda _: data.calls_page(call_type))
+    bench.time("call history open (one number)", lambda i: data.number_calls_page(lookups[i]))
+
+    data.close()
+    return bench.results
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Optional[Dict[str, Dict[str, float]]]) -> None:
+    header = f"{'operation (ms)':<44} {'n':>5} {'median':>9} {'p95':>9} {'max':>9}"
+    if baseline:
+        header += f" {'vs base':>9}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = f"{name:<44} {r['n']:>5} {r['median_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['max_ms']:>9.3f}"
+        if baseline and name in baseline and baseline[name]["median_ms"]:
+            change = (r["median_ms"] / baseline[name]["median_ms"] - 1) * 100
+            line += f" {change:>+8.0f}%"
+        print(line)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark NeoDCT storage (phonebook + SMS data layer).")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k", help="Generated dataset size")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Dataset and query seed")
+    parser.add_argument("--db-dir", help="Benchmark a copy of this database directory instead of generated data")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Samples per operation")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Results file from an earlier run to compare medians against")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="neodct-bench-")
+    try:
+        if args.db_dir:
+            _copy_db_dir(args.db_dir, workdir)
+            source = args.db_dir
+        else:
+            print(f"Generating {args.scale} dataset (seed {args.seed})...")
+            generate(workdir, args.scale, args.seed)
+            source = f"generated {args.scale}, seed {args.seed}"
+
+        results = run_benchmarks(workdir, args.repeat, args.seed)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print(f"\nData: {source} | SQLite {sqlite3.sqlite_version} | {args.repeat} samples\n")
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"source": source, "sqlite": sqlite3.sqlite_version, "repeat": args.repeat, "results": results},
+                f,
+                indent=2,
+            )
+        print(f"\nSaved results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,57 +4,14 @@
 # Invoked by kernel/main.py via:
 #   dialer_ui.show_calling(self, number, name=None)
 
-import os
-import time
-import struct
-import select
+from System.core.Clock import get_clock
+from System.core.PhoneNumbers import get_resolver
 from System.ui.framework import SoftKeyBar
 
-KEYPAD_PATH = "/dev/input/event0"
 WIDTH = 240
 HEIGHT = 240
 
 
-def _flush_input(fd):
-    """Drain any pending key events so we don't instantly 'End' due to buffered input."""
-    try:
-        while True:
-            r, _, _ = select.select([fd], [], [], 0.0)
-            if not r:
-                break
-            os.read(fd, 24)
-    except Exception:
-        pass
-
-
-def _read_keypress(fd, timeout=0.10):
-    """
-    Returns a Linux input key code on key-press, else None.
-    Matches the event unpacking style used in kernel/main.py.
-    """
-    try:
-        r, _, _ = select.select([fd], [], [], timeout)
-        if not r:
-            return None
-
-        data = os.read(fd, 24)
-        if len(data) == 24:
-            sec, usec, etype, code, val = struct.unpack('llHHI', data)
-            if etype == 1 and val == 1:
-                return code
-
-        # Some platforms return 16-byte events
-        if len(data) == 16:
-            sec, usec, etype, code, val = struct.unpack('IIHHI', data)
-            if etype == 1 and val == 1:
-                return code
-
-    except Exception:
-        return None
-
-    return None
-
-
 def _draw_handset_icon(draw, x, y):
     """
     Simple fallback icon (you can replace with a PNG later).
@@ -140,8 +97,10 @@ def draw_call_screen(ui, number, name=None):
     num_y = label_y + 26  # Nokia-ish spacing under the label
     ui.draw.text((label_x, num_y), fitted_num, font=num_font, fill="white")
 
-    # Optional: if you ever want the contact name too, you can add it above/below.
-    # Keeping it off by default to match your request.
+    # Contact name (caller ID) under the number, when known.
+    if name:
+        fitted_name, name_font = _fit_text(ui, name, max_width=WIDTH - label_x - 10, prefer_font=label_font)
+        ui.draw.text((label_x, num_y + 26), fitted_name, font=name_font, fill="white")
 
     for el in ui.home_layout.get("elements", []):
         if el.get("type") == "text" and el.get("text") == "12:00":
@@ -155,31 +114,32 @@ def draw_call_screen(ui, number, name=None):
 
 def show_calling(ui, number, name=None):
     """
-    Blocking call UI. Exits when user presses End.
+    Blocking call UI. Exits when user presses End or the network ends the call.
     Uses key 14 (Backspace/C) and also allows 28 (center) as End.
+    Keys are read through ui.read_keypress, so modem events keep being handled
+    and a key that only wakes the display is not taken as End.
     """
     softkey = SoftKeyBar(ui)
-    # Open keypad if not already open on ui
-    fd = None
-    if hasattr(ui, "keypad_fd"):
-        fd = ui.keypad_fd
-    else:
-        fd = os.open(KEYPAD_PATH, os.O_RDONLY | os.O_NONBLOCK)
-        ui.keypad_fd = fd
-
-    _flush_input(fd)
+    clock = get_clock(ui)
+    if name is None and number:
+        contact = get_resolver(ui).resolve(number)
+        name = contact.name if contact else None
+    ui.runtime.flush()
 
     # Main loop: update screen periodically so clock updates
     last_draw = 0.0
     while True:
-        now = time.time()
+        now = clock.time()
         if now - last_draw >= 0.25:
             draw_call_screen(ui, number, name=name)
             ui.fb.update(ui.canvas)
             last_draw = now
             softkey.update("End")
 
-        key = _read_keypress(fd, timeout=0.10)
+        if ui.modem.state == "IDLE":
+            return
+
+        key = ui.read_keypress(0.10)
         if key is None:
             continue
 
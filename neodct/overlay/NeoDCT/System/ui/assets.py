@@ -0,0 +1,105 @@
+"""Shared UI assets: fonts, the home layout and the wallpaper.
+
+Used by the UI process (`System.core.main`) and by isolated app processes
+(`System.core.AppHost`), which load the same assets without importing the
+whole UI. `render_element()` draws one home layout element (clock, signal and
+battery icons) for screens that reuse them, such as the call screen.
+"""
+
+import json
+import os
+
+from PIL import Image, ImageEnhance, ImageFile, ImageFont
+
+# Allow loading images even if they are missing EOF markers
+ImageFile.LOAD_TRUNCATED_IMAGES = True
+
+WIDTH = 240
+HEIGHT = 240
+WALLPAPER_PATH = "/NeoDCT/User/wallpaper.jpg"
+FONT_PATH = "/NeoDCT/System/ui/resources/fonts/font.ttf"
+LAYOUT_PATH = "/NeoDCT/System/ui/resources/ui_home.json"
+
+def load_fonts(font_path=FONT_PATH):
+    """ Returns (small, medium, normal, xl) fonts, falling back to PIL's default font. """
+    try:
+        fonts = (
+            ImageFont.truetype(font_path, 14),
+            ImageFont.truetype(font_path, 18),
+            ImageFont.truetype(font_path, 20),
+            ImageFont.truetype(font_path, 28),
+        )
+        print("[UI] Custom font loaded.")
+        return fonts
+    except:
+        print("[UI] Font load failed, using default.")
+        default = ImageFont.load_default()
+        return (default, default, default, default)
+
+def load_layout(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except: return None
+
+def load_wallpaper(path):
+    """ Loads wallpaper, resizes to fit, and dims it by 70%. """
+    if not os.path.exists(path):
+        print("[UI] No wallpaper found.")
+        return None
+    
+    try:
+        print(f"[UI] Loading wallpaper: {path}")
+        # Ensure we can load truncated/imperfect JPEGs
+        ImageFile.LOAD_TRUNCATED_IMAGES = True 
+        
+        img = Image.open(path)
+        img.load() # Force load pixel data
+        
+        # Convert and Resize
+        img = img.convert("RGB")
+        img = img.resize((WIDTH, HEIGHT), Image.Resampling.LANCZOS)
+        
+        # Dim the image by 70% (Brightness 0.3) for text readability
+        enhancer = ImageEnhance.Brightness(img)
+        dimmed_img = enhancer.enhance(0.3)
+        
+        return dimmed_img
+
+    except Exception as e:
+        print(f"[UI] Wallpaper load error: {e}")
+        return None
+
+def render_element(ui, el):
+    """ Draws one element of the home layout (ui_home.json) onto ui's canvas. """
+    if el["type"] == "text":
+        text = el["text"]
+        if text == "12:00": text = ui.clock.strftime("%H:%M")
+
+        # Font Selection
+        if el["font_size"] >= 20: font = ui.font_xl
+        elif el["font_size"] >= 16: font = ui.font_n
+        else: font = ui.font_s
+
+        w, h = ui.get_text_size(text, font)
+        x, y = el["x"], el["y"]
+
+        if "center_h" in el["anchor"]: x -= w // 2
+        elif "right" in el["anchor"]: x -= w
+
+        ui.draw.text((x, y), text, font=font, fill=el["color"])
+
+    elif el["type"] == "icon_set":
+        val = 3 
+        if el.get("prefix") == "sig" and ui.modem.signal_bars() is not None:
+            val = ui.modem.signal_bars()
+        custom_path = el.get("custom_images", {}).get(str(val))
+        if custom_path:
+            img = ui.get_image(custom_path)
+            if img: ui.canvas.paste(img, (el["x"], el["y"]), img)
+        else:
+            for i in range(el["count"]):
+                h = (i + 1) * 3
+                color = "white" if i <= val else "#333333"
+                bx = el["x"] + (i * 5)
+                ui.draw.rectangle((bx, el["y"] + 15 - h, bx + 3, el["y"] + 15), fill=color)
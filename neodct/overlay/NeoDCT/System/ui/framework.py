@@ -1,10 +1,19 @@
 # NeoDCT framework.py
 
-import select
-import os
 import math
 import time
 
+from System.core.Clock import get_clock
+
+# Returned by a widget's handle_key() while it should stay open.
+CONTINUE = object()
+
+def flush_keys(ui):
+    """ Drains pending key events (runtime queue and keypad buffer) so a new screen doesn't act on stale input. """
+    runtime = getattr(ui, "runtime", None)
+    if runtime is not None:
+        runtime.flush()
+
 class AppSelector:
     def __init__(self, title, items, ui, background=None):
         self.title = title
@@ -73,36 +82,35 @@ class AppSelector:
 
         self.ui.fb.update(self.ui.canvas)
 
-    def show(self):
-        """ Blocking loop """
-        
-        # --- INPUT FLUSH ---
-        if hasattr(self.ui, 'keypad_fd'):
-            while True:
-                r, w, x = select.select([self.ui.keypad_fd], [], [], 0.01)
-                if r:
-                    try: os.read(self.ui.keypad_fd, 24)
-                    except: pass
-                else: break 
-
+    def open(self):
+        flush_keys(self.ui)
         self.draw() 
+
+    def handle_key(self, key):
+        """ Returns the selected index, -1 for back, or CONTINUE. """
+        if key == 108: # DOWN (Next App)
+            self.selected_index = (self.selected_index + 1) % len(self.items)
+            self.draw() 
+                    
+        elif key == 103: # UP (Previous App)
+            self.selected_index = (self.selected_index - 1) % len(self.items)
+            self.draw() 
+                    
+        elif key == 28: # ENTER Only (Legacy '50' Removed)
+            return self.selected_index 
         
+        elif key == 14: # BACKSPACE Only (Legacy '46' Removed)
+            return -1
+
+        return CONTINUE
+
+    def show(self):
+        """ Blocking loop """
+        self.open()
         while True:
-            key = self.ui.wait_for_key()
-            
-            if key == 108: # DOWN (Next App)
-                self.selected_index = (self.selected_index + 1) % len(self.items)
-                self.draw() 
-                        
-            elif key == 103: # UP (Previous App)
-                self.selected_index = (self.selected_index - 1) % len(self.items)
-                self.draw() 
-                        
-            elif key == 28: # ENTER Only (Legacy '50' Removed)
-                return self.selected_index 
-            
-            elif key == 14: # BACKSPACE Only (Legacy '46' Removed)
-                return -1
+            result = self.handle_key(self.ui.wait_for_key())
+            if result is not CONTINUE:
+                return result
 
 """
 
@@ -246,38 +254,96 @@ class VerticalList:
         # 6. Flush
         self.ui.fb.update(self.ui.canvas)
 
-    def show(self):
-        """ Blocking loop. Returns the selected index OR -1 for back. """
+    def open(self):
         self.draw()
+
+    def handle_key(self, key):
+        """ Returns the selected index, -1 for back, or CONTINUE. """
+        if key == 108: # DOWN
+            if self.selected_index < len(self.items) - 1:
+                self.selected_index += 1
+                if self.selected_index >= self.window_start + self.max_lines:
+                    self.window_start += 1
+            self.draw()
+                    
+        elif key == 103: # UP
+            if self.selected_index > 0:
+                self.selected_index -= 1
+                if self.selected_index < self.window_start:
+                    self.window_start -= 1
+            self.draw()
+        
+        # --- NUMBER SHORTCUTS ---
+        elif 2 <= key <= 10: 
+            shortcut_idx = key - 2
+            if shortcut_idx < len(self.items):
+                return shortcut_idx
+                    
+        elif key == 28: # ENTER Only (Legacy '50' Removed)
+            return self.selected_index 
         
+        elif key == 14: # BACKSPACE Only (Legacy '46' Removed)
+            return -1           
+
+        return CONTINUE
+
+    def show(self):
+        """ Blocking loop. Returns the selected index OR -1 for back. """
+        self.open()
         while True:
-            key = self.ui.wait_for_key()
-            
-            if key == 108: # DOWN
-                if self.selected_index < len(self.items) - 1:
-                    self.selected_index += 1
-                    if self.selected_index >= self.window_start + self.max_lines:
-                        self.window_start += 1
-                self.draw()
-                        
-            elif key == 103: # UP
-                if self.selected_index > 0:
-                    self.selected_index -= 1
-                    if self.selected_index < self.window_start:
-                        self.window_start -= 1
-                self.draw()
-            
-            # --- NUMBER SHORTCUTS ---
-            elif 2 <= key <= 10: 
-                shortcut_idx = key - 2
-                if shortcut_idx < len(self.items):
-                    return shortcut_idx
-                        
-            elif key == 28: # ENTER Only (Legacy '50' Removed)
-                return self.selected_index 
-            
-            elif key == 14: # BACKSPACE Only (Legacy '46' Removed)
-                return -1           
+            result = self.handle_key(self.ui.wait_for_key())
+            if result is not CONTINUE:
+                return result
+
+"""
+
+WindowedList is a VerticalList over a query that is read a page at a time.
+
+fetch_page(after, limit) returns up to `limit` rows following row `after` (None for the first page),
+e.g. a keyset query on (timestamp, id), `page_size` rows at a time. label(row) turns a row into its list text.
+Opening costs one page no matter how many rows exist; more are pulled as the selection nears the end.
+
+"""
+class WindowedList(VerticalList):
+    def __init__(self, ui, title, fetch_page, label, page_size, app_id=99):
+        super().__init__(ui, title, [], app_id=app_id)
+        self.fetch_page = fetch_page
+        self.label = label
+        self.page_size = page_size
+        self.rows = []
+        self.exhausted = False
+        self._load_more()
+
+    def _load_more(self):
+        if self.exhausted:
+            return
+        page = self.fetch_page(self.rows[-1] if self.rows else None, self.page_size)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        self.rows.extend(page)
+        self.items.extend(self.label(row) for row in page)
+
+    def remove(self, index):
+        """ Drops a row from the loaded window in place (e.g. after it was deleted) instead of reloading. """
+        del self.rows[index]
+        del self.items[index]
+        if len(self.rows) < self.max_lines:
+            self._load_more()
+        if self.selected_index >= len(self.items):
+            self.selected_index = max(0, len(self.items) - 1)
+        self.window_start = max(0, min(self.window_start, len(self.items) - self.max_lines))
+        if self.selected_index < self.window_start:
+            self.window_start = self.selected_index
+
+    def update_row(self, index, row):
+        """ Replaces a loaded row (e.g. after marking it read) and relabels it. """
+        self.rows[index] = row
+        self.items[index] = self.label(row)
+
+    def handle_key(self, key):
+        if key == 108 and self.selected_index >= len(self.items) - 2:
+            self._load_more()
+        return super().handle_key(key)
 
 """
 
@@ -323,45 +389,159 @@ class TextInput:
         
         self.ui.fb.update(self.ui.canvas)
 
-    def show(self):
-        """ Blocking Loop. Returns STRING if confirmed, NONE if cancelled. """
+    def open(self):
         from System.ui.framework import SoftKeyBar # Local import to avoid circular dep
         softkey = SoftKeyBar(self.ui)
         softkey.update("OK")
+        self.cursor_on = True
+        self.draw(self.cursor_on)
+
+    def handle_key(self, key):
+        """ Returns the text if confirmed, None if cancelled, or CONTINUE. """
+        # ENTER / NAVI-CENTER -> Confirm (Legacy '50' Removed)
+        if key in (28, 96): 
+            return self.text
+
+        # BACKSPACE / C BUTTON
+        elif key == 14:
+            if len(self.text) > 0:
+                self.text = self.text[:-1]
+                self.draw(self.cursor_on)
+            else:
+                return None
         
-        cursor_on = True
-        last_blink = time.time()
-        self.draw(cursor_on)
+        # TYPING
+        elif key in self.DEV_KEYMAP:
+            char = self.DEV_KEYMAP[key]
+            if len(self.text) == 0: char = char.upper()
+            self.text += char
+            self.draw(self.cursor_on)
+
+        return CONTINUE
+
+    def show(self):
+        """ Blocking Loop. Returns STRING if confirmed, NONE if cancelled. """
+        self.open()
+        
+        clock = get_clock(self.ui)
+        last_blink = clock.time()
         
         while True:
             # --- Blink Logic ---
-            if time.time() - last_blink > 0.5:
-                cursor_on = not cursor_on
-                last_blink = time.time()
-                self.draw(cursor_on)
+            if clock.time() - last_blink > 0.5:
+                self.cursor_on = not self.cursor_on
+                last_blink = clock.time()
+                self.draw(self.cursor_on)
             
             # --- Input ---
             key = self.ui.wait_for_key() 
             if key is None: continue
 
-            # ENTER / NAVI-CENTER -> Confirm (Legacy '50' Removed)
-            if key in (28, 96): 
-                return self.text
+            result = self.handle_key(key)
+            if result is not CONTINUE:
+                return result
 
-            # BACKSPACE / C BUTTON
-            elif key == 14:
-                if len(self.text) > 0:
-                    self.text = self.text[:-1]
-                    self.draw(cursor_on)
-                else:
-                    return None
-            
-            # TYPING
-            elif key in self.DEV_KEYMAP:
-                char = self.DEV_KEYMAP[key]
-                if len(self.text) == 0: char = char.upper()
-                self.text += char
-                self.draw(cursor_on)
+"""
+
+SearchInput is an as-you-type search: every keystroke calls search(text, limit)
+and the result list under the input box refines immediately.
+
+"""
+class SearchInput(TextInput):
+    """
+    search(text, limit) returns the rows for the typed text; label(row) gives
+    each row's text. show() returns (row, index), or None when the user backs
+    out of an empty input. Text and selection are kept across show() calls.
+    """
+    MAX_RESULTS = 50
+    VISIBLE_ROWS = 4
+    ROW_HEIGHT = 30
+
+    def __init__(self, ui, title, prompt, search, label, btn_text="Select", header_root=None):
+        super().__init__(ui, title, prompt)
+        self.search = search
+        self.label = label
+        self.btn_text = btn_text
+        self.header = HeaderWidget(ui, header_root)
+        self.softkey = SoftKeyBar(ui)
+        self.results = []
+        self.selected_index = 0
+        self.window_start = 0
+
+    def refresh(self):
+        self.results = self.search(self.text, self.MAX_RESULTS) if self.text.strip() else []
+        self.selected_index = min(self.selected_index, max(len(self.results) - 1, 0))
+        self.window_start = min(self.window_start, self.selected_index)
+
+    def draw(self, blink_state=True):
+        ui = self.ui
+        ui.draw.rectangle((0, 0, 240, 210), fill="black")
+        ui.draw.text((5, 5), self.title, font=ui.font_xl, fill="white")
+        self.header.draw(self.selected_index + 1 if self.results else None)
+        ui.draw.line((0, 35, 240, 35), fill="white")
+
+        # Input box
+        ui.draw.rectangle((5, 42, 235, 72), outline="white")
+        ui.draw.text((10, 47), self.text + ("_" if blink_state else ""), font=ui.font_n, fill="white")
+
+        # Results
+        y = 78
+        if self.text.strip() and not self.results:
+            ui.draw.text((10, y + 5), "No Results", font=ui.font_n, fill="gray")
+        for i in range(self.VISIBLE_ROWS):
+            idx = self.window_start + i
+            if idx >= len(self.results):
+                break
+            text = self.label(self.results[idx])
+            if idx == self.selected_index:
+                ui.draw.rectangle((0, y, 240, y + self.ROW_HEIGHT - 2), fill="white")
+                ui.draw.text((10, y + 3), text, font=ui.font_n, fill="black")
+            else:
+                ui.draw.text((10, y + 3), text, font=ui.font_n, fill="white")
+            y += self.ROW_HEIGHT
+
+        self.softkey.update(self.btn_text if self.results else "", present=False)
+        ui.fb.update(ui.canvas)
+
+    def open(self):
+        self.cursor_on = True
+        self.refresh()
+        self.draw(self.cursor_on)
+
+    def handle_key(self, key):
+        if key == 108: # DOWN
+            if self.selected_index < len(self.results) - 1:
+                self.selected_index += 1
+                if self.selected_index >= self.window_start + self.VISIBLE_ROWS:
+                    self.window_start += 1
+            self.draw(self.cursor_on)
+
+        elif key == 103: # UP
+            if self.selected_index > 0:
+                self.selected_index -= 1
+                if self.selected_index < self.window_start:
+                    self.window_start -= 1
+            self.draw(self.cursor_on)
+
+        elif key in (28, 96): # ENTER
+            if self.results:
+                return self.results[self.selected_index], self.selected_index
+
+        elif key == 14: # BACKSPACE: edit, or leave when empty
+            if not self.text:
+                return None
+            self.text = self.text[:-1]
+            self.selected_index = self.window_start = 0
+            self.refresh()
+            self.draw(self.cursor_on)
+
+        elif key in self.DEV_KEYMAP:
+            self.text += self.DEV_KEYMAP[key]
+            self.selected_index = self.window_start = 0
+            self.refresh()
+            self.draw(self.cursor_on)
+
+        return CONTINUE
 
 """
 
@@ -485,7 +665,7 @@ class TextInputLong:
 
     def handle_key(self, key):
         if key == 14:
-            now = time.time()
+            now = get_clock(self.ui).time()
             if len(self.text) == 0:
                 if callable(self.on_empty_backspace):
                     self.on_empty_backspace()
@@ -558,17 +738,7 @@ class MessageDialog:
 
     def _flush_input(self):
         """Drain pending key events so OK doesn't instantly dismiss."""
-        fd = getattr(self.ui, "keypad_fd", None)
-        if fd is None:
-            return
-        while True:
-            r, _, _ = select.select([fd], [], [], 0.0)
-            if not r:
-                break
-            try:
-                os.read(fd, 24)
-            except Exception:
-                break
+        flush_keys(self.ui)
 
     def _wrap_text(self, text, font, max_w):
         """Word-wrap text to max_w pixels using ui.get_text_size."""
@@ -665,15 +835,22 @@ class MessageDialog:
         # Present once
         ui.fb.update(ui.canvas)
 
-    def show(self):
-        """Blocking modal. Returns the key that dismissed it."""
+    def open(self):
         self._flush_input()
         self._draw()
 
+    def handle_key(self, key):
+        if key in self.accept_keys or key in self.cancel_keys:
+            return key
+        return CONTINUE
+
+    def show(self):
+        """Blocking modal. Returns the key that dismissed it."""
+        self.open()
         while True:
-            key = self.ui.wait_for_key()
-            if key in self.accept_keys or key in self.cancel_keys:
-                return key
+            result = self.handle_key(self.ui.wait_for_key())
+            if result is not CONTINUE:
+                return result
                 
 
 
@@ -828,40 +1005,39 @@ class PagedList:
 
         self.ui.fb.update(self.ui.canvas)
 
-    def show(self):
-        """Blocking loop. Returns selected index or -1 for back."""
+    def open(self):
         # Input flush (mirrors AppSelector behavior)
-        if hasattr(self.ui, "keypad_fd"):
-            while True:
-                r, _, _ = select.select([self.ui.keypad_fd], [], [], 0.01)
-                if r:
-                    try:
-                        os.read(self.ui.keypad_fd, 24)
-                    except:
-                        pass
-                else:
-                    break
+        flush_keys(self.ui)
 
         if self.selected_index >= len(self.items):
             self.selected_index = 0
 
         self.draw()
 
-        while True:
-            key = self.ui.wait_for_key()
+    def handle_key(self, key):
+        """Returns selected index, -1 for back, or CONTINUE."""
+        if key == 108:  # DOWN
+            if self.items:
+                self.selected_index = (self.selected_index + 1) % len(self.items)
+                self.draw()
 
-            if key == 108:  # DOWN
-                if self.items:
-                    self.selected_index = (self.selected_index + 1) % len(self.items)
-                    self.draw()
+        elif key == 103:  # UP
+            if self.items:
+                self.selected_index = (self.selected_index - 1) % len(self.items)
+                self.draw()
+
+        elif key == 28:  # ENTER
+            return self.selected_index
 
-            elif key == 103:  # UP
-                if self.items:
-                    self.selected_index = (self.selected_index - 1) % len(self.items)
-                    self.draw()
+        elif key == 14:  # BACKSPACE
+            return -1
 
-            elif key == 28:  # ENTER
-                return self.selected_index
+        return CONTINUE
 
-            elif key == 14:  # BACKSPACE
-                return -1
+    def show(self):
+        """Blocking loop. Returns selected index or -1 for back."""
+        self.open()
+        while True:
+            result = self.handle_key(self.ui.wait_for_key())
+            if result is not CONTINUE:
+                return result
@@ -1,14 +1,17 @@
 import sys
 import os
-import time
 # Redirect all print() output to Serial
 sys.stdout = open('/dev/ttyAMA0', 'w')
 sys.stderr = sys.stdout
 # Add current directory to path so we can import 'System' modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import the Hardware Driver and UI
-from System.core import main as ui_engine
+from System.core.BootProfiler import BOOT
+
+# Only what the splash needs is imported up front; the UI, its services and
+# sqlite3 load behind the splash (see main()).
+with BOOT.track_imports(), BOOT.step("import framebuffer"):
+    from System.core.Framebuffer import Framebuffer
 
 def show_boot_logo(fb):
     from PIL import Image, ImageDraw, ImageFont
@@ -39,19 +42,46 @@ def show_boot_logo(fb):
     # --- FIX END ---
     
     fb.update(canvas)
+    return canvas
+
+def show_boot_progress(fb, canvas, done, total):
+    """ Draws the boot progress bar under the splash text. """
+    from PIL import ImageDraw
+
+    draw = ImageDraw.Draw(canvas)
+    x0, y0, width = 40, 170, 160
+    draw.rectangle((x0, y0, x0 + width, y0 + 6), outline="gray", fill="black")
+    if total:
+        draw.rectangle((x0, y0, x0 + (width * done) // total, y0 + 6), fill="white")
+    fb.update(canvas)
 
 def main():
     # 1. Init Hardware
     print("[Launcher] Initializing Hardware...")
-    fb = ui_engine.Framebuffer() # We reuse the driver from main.py
+    with BOOT.step("framebuffer"):
+        fb = Framebuffer()
     
     # 2. Show Boot Splash
-    show_boot_logo(fb)
-    time.sleep(1) # Let it shine for 1 second
+    with BOOT.step("splash"):
+        splash = show_boot_logo(fb)
+        show_boot_progress(fb, splash, 0, 1)
+    BOOT.mark("splash shown")
     
-    # 3. Launch Main UI
+    # 3. Import the UI and run boot init (the splash stays up until it is done)
     print("[Launcher] Starting UI...")
-    ui_engine.run(fb)
+    with BOOT.track_imports(), BOOT.step("import System.core.main"):
+        from System.core import main as ui_engine
+        from System.core.Supervisor import Supervisor
+    warm = ui_engine.prepare_boot(on_progress=lambda done, total: show_boot_progress(fb, splash, done, total))
+
+    # 4. Launch Main UI. By default this process stays a warm template and the UI
+    #    runs in a forked child that is re-forked on crash (NEODCT_SUPERVISOR=0 disables).
+    if os.environ.get("NEODCT_SUPERVISOR", "1") == "0":
+        ui_engine.run(fb, warm=warm)
+        return
+
+    supervisor = Supervisor(lambda restore: ui_engine.run(fb, warm=warm, restore=restore))
+    sys.exit(supervisor.serve())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,18 @@
+#!/bin/sh
+#
+# NeoDCT post-build hook (runs after the rootfs overlay is copied).
+#
+# Precompiles the NeoDCT UI and system apps to bytecode with the host Python
+# (same version as the target), so the first boot and first app launches don't
+# pay for compiling every module.
+
+set -e
+
+TARGET_DIR="$1"
+NEODCT_DIR="${TARGET_DIR}/NeoDCT"
+
+if [ -d "${NEODCT_DIR}" ]; then
+    "${HOST_DIR}/bin/python3" -m compileall -q -j 0 \
+        -s "${TARGET_DIR}" -p / \
+        "${NEODCT_DIR}/launcher.py" "${NEODCT_DIR}/System"
+fi
@@ -0,0 +1,106 @@
+"""
+pytest setup for the NeoDCT tests.
+
+Run from the repository root with `python3 -m pytest neodct/tests`. The
+overlay's NeoDCT directory goes on sys.path, as /NeoDCT is on the device, so
+tests import `System.*` exactly like the UI does. Nothing here touches
+/NeoDCT/User: services get a temporary directory or explicit config.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+NEODCT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "overlay", "NeoDCT")
+sys.path.insert(0, NEODCT_ROOT)
+
+
+@pytest.fixture
+def data(tmp_path):
+    """A DataService on an empty temporary database directory."""
+    from System.core.DataService import DataService
+
+    service = DataService(str(tmp_path / "db"))
+    yield service
+    service.close()
+
+
+class RecordingFramebuffer:
+    def __init__(self):
+        self.frames = 0
+        self.last = None
+
+    def update(self, image):
+        self.frames += 1
+        self.last = image.copy()
+
+
+class HeadlessUI:
+    """
+    Just enough of NeoDCT_UI for widgets and apps: canvas, fonts, framebuffer,
+    clock and a UIRuntime whose keypad is a pipe. press() queues key codes.
+    """
+
+    def __init__(self, clock):
+        from PIL import Image, ImageDraw, ImageFont
+        from System.core.Runtime import UIRuntime
+
+        self.clock = clock
+        self.keypad_fd, self.keypad_w = os.pipe()
+        self.runtime = UIRuntime(self.keypad_fd, lambda: None, clock=clock)
+        self.canvas = Image.new("RGB", (240, 240), "black")
+        self.draw = ImageDraw.Draw(self.canvas)
+        self.font_s = self.font_md = self.font_n = self.font_xl = ImageFont.load_default()
+        self.fb = RecordingFramebuffer()
+        self.home_layout = {"elements": []}
+
+    def get_text_size(self, text, font):
+        bbox = self.draw.textbbox((0, 0), text, font=font)
+        return (bbox[2] - bbox[0], bbox[3] - bbox[1])
+
+    def press(self, *keys):
+        for key in keys:
+            self.runtime.keys.put_nowait(key)
+
+    def read_keypress(self, timeout=0.1):
+        # NeoDCT_UI.read_keypress, minus memory and maintenance, once a test sets self.power.
+        key = self.runtime.read_key(timeout)
+        power = getattr(self, "power", None)
+        if power is None:
+            return key
+        if key is None:
+            power.tick()
+            if power.blanked:
+                power.wait_blanked(self.runtime.read_key)
+            return None
+        return None if power.on_key() else key
+
+    def wait_for_key(self):
+        while True:
+            key = self.read_keypress(0.1)
+            if key is not None:
+                return key
+
+    def close(self):
+        for task in list(self.runtime.tasks):
+            task.cancel()
+        self.runtime.loop.run_until_complete(asyncio.sleep(0))
+        self.runtime.loop.close()
+        os.close(self.keypad_fd)
+        os.close(self.keypad_w)
+
+
+@pytest.fixture
+def clock():
+    from System.core.Clock import SimulatedClock
+
+    return SimulatedClock(start=1_700_000_000)
+
+
+@pytest.fixture
+def ui(clock):
+    headless = HeadlessUI(clock)
+    yield headless
+    headless.close()
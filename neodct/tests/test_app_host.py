@@ -0,0 +1,151 @@
+"""AppHost wire protocol: host and SurfaceUI ends on one socketpair, in-process."""
+
+import socket
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from System.core.AppHost import MESSAGE_MAX, AppHost, create_surface
+from System.core.AppHost.__main__ import SurfaceUI
+
+
+class FakeModem:
+    def __init__(self):
+        self.state = "IDLE"
+        self.calls = []
+
+    def signal_bars(self):
+        return 2
+
+    def dial(self, number):
+        self.calls.append(("dial", number))
+        self.state = "CALLING"
+
+    def hangup(self):
+        self.calls.append(("hangup",))
+        self.state = "IDLE"
+
+
+@pytest.fixture
+def pair(clock):
+    modem = FakeModem()
+    host = AppHost(SimpleNamespace(clock=clock, modem=modem), {"name": "Test", "path": ".", "exec": "main.py"})
+    host.surface = create_surface()
+    host.sock, app_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+    app = SurfaceUI(host.surface, app_sock, clock=clock)
+    yield host, app, modem
+    app.runtime.loop.close()
+    app_sock.close()
+    host.stop()
+
+
+def deliver(host):
+    """Handles the next message the app sent. Returns _handle_message's result."""
+    return host._handle_message(host.sock.recv(MESSAGE_MAX))
+
+
+def test_keys_are_read_through_the_runtime_and_acked(pair):
+    host, app, _ = pair
+    host._forward_key(28)
+    assert host.pending_keys == 1
+    assert app.read_keypress(1.0) == 28
+    deliver(host)
+    assert host.pending_keys == 0
+    assert app.read_keypress(0) is None
+
+
+def test_frames_reach_the_host(pair):
+    host, app, _ = pair
+    app.draw.rectangle((0, 0, 10, 10), fill="white")
+    app.fb.update(app.canvas)
+    assert deliver(host)
+    assert host.frame.getpixel((5, 5)) == (255, 255, 255)
+    assert host.frame.getpixel((50, 50)) == (0, 0, 0)
+
+
+def test_app_waits_for_the_host_before_reusing_a_buffer(pair):
+    host, app, _ = pair
+    for shade in (10, 20):
+        app.draw.rectangle((0, 0, 240, 240), fill=(shade, shade, shade))
+        app.fb.update(app.canvas)
+
+    # Frame 3 goes into frame 1's buffer, which the host has not copied yet.
+    app.draw.rectangle((0, 0, 240, 240), fill=(30, 30, 30))
+    third = threading.Thread(target=app.fb.update, args=(app.canvas,))
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+
+    deliver(host)
+    assert host.frame.getpixel((0, 0)) == (10, 10, 10)  # not torn by frame 3
+    third.join(2.0)
+    assert not third.is_alive()
+    deliver(host)
+    deliver(host)
+    assert host.frame.getpixel((0, 0)) == (30, 30, 30)
+
+
+def test_key_read_while_waiting_for_a_buffer_is_kept(pair):
+    host, app, _ = pair
+    app.fb.update(app.canvas)
+    app.fb.update(app.canvas)
+    host._forward_key(28)
+    deliver(host)  # releases buffer 0 after the key was sent
+    app.fb.update(app.canvas)
+    assert app.read_keypress(0) == 28
+
+
+def test_paused_app_drops_frames_and_redraws_on_resume(pair):
+    host, app, _ = pair
+    host._sync_paused(True)
+    app.read_keypress(0)
+    app.draw.rectangle((0, 0, 240, 240), fill="white")
+    app.fb.update(app.canvas)
+    host.sock.setblocking(False)
+    with pytest.raises(BlockingIOError):
+        host.sock.recv(MESSAGE_MAX)
+    host.sock.setblocking(True)
+
+    host._sync_paused(False)
+    app.read_keypress(0)
+    assert deliver(host)
+    assert host.frame.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_modem_calls_go_to_the_host_and_state_comes_back(pair):
+    host, app, modem = pair
+    host._sync_modem()
+    app.read_keypress(0)
+    assert (app.modem.state, app.modem.signal_bars()) == ("IDLE", 2)
+
+    app.modem.dial("+15550100")
+    assert app.modem.state == "CALLING"
+    deliver(host)
+    assert modem.calls == [("dial", "+15550100")]
+
+    modem.state = "CONNECTED"
+    host._sync_modem()
+    app.read_keypress(0)
+    assert app.modem.state == "CONNECTED"
+
+    app.modem.hangup()
+    deliver(host)
+    host._sync_modem()
+    app.read_keypress(0)
+    assert modem.calls[-1] == ("hangup",) and app.modem.state == "IDLE"
+
+
+def test_unknown_modem_calls_are_refused(pair):
+    host, app, modem = pair
+    app.modem._call("close")
+    deliver(host)
+    assert modem.calls == []
+
+
+def test_app_exits_when_the_host_goes_away(pair):
+    host, app, _ = pair
+    host.sock.close()
+    host.sock = None
+    with pytest.raises(SystemExit):
+        app.read_keypress(1.0)
@@ -0,0 +1,52 @@
+"""AppLoader: only apps whose top level is declarative are imported ahead of a launch."""
+
+import json
+
+import pytest
+
+from System.core.AppLoader import AppLoader, is_preloadable
+
+
+def make_app(tmp_path, source, **manifest):
+    folder = tmp_path / "App"
+    folder.mkdir()
+    (folder / "main.py").write_text(source)
+    return dict({"name": "App", "path": str(folder), "exec": "main.py"}, **manifest)
+
+
+@pytest.mark.parametrize("source", [
+    '"""Doc."""\nimport os\nfrom os import path\nLIMIT = 3\nKEYS = {"a": (1, 2)}\n\ndef run(ui):\n    print(ui)\n',
+    "try:\n    import mutagen\nexcept ImportError:\n    mutagen = None\n\nclass Player:\n    pass\n",
+])
+def test_declarative_apps_are_preloadable(tmp_path, source):
+    assert is_preloadable(make_app(tmp_path, source))
+
+
+@pytest.mark.parametrize("source", [
+    "import sys\nsys.stdout = open('/dev/ttyAMA0', 'w')\n",
+    "import os\nos.makedirs('/tmp/x', exist_ok=True)\n",
+    "print('hello')\n",
+    "def run(ui:\n",
+])
+def test_side_effects_block_preloading(tmp_path, source):
+    assert not is_preloadable(make_app(tmp_path, source))
+
+
+def test_manifest_flags(tmp_path):
+    app = make_app(tmp_path, "X = 1\n")
+    assert not is_preloadable(dict(app, isolated=True))
+    assert not is_preloadable(dict(app, preload=False))
+
+
+def test_preload_skips_unsafe_frequent_apps(tmp_path):
+    safe = make_app(tmp_path, "LOADED = True\n")
+    unsafe_dir = tmp_path / "Unsafe"
+    unsafe_dir.mkdir()
+    (unsafe_dir / "main.py").write_text("raise SystemExit('imported')\n")
+    unsafe = {"name": "Unsafe", "path": str(unsafe_dir), "exec": "main.py"}
+    usage = tmp_path / "usage.json"
+    usage.write_text(json.dumps({str(unsafe_dir / "main.py"): 9, str(tmp_path / "App" / "main.py"): 5}))
+
+    loader = AppLoader(str(usage))
+    loader.preload([safe, unsafe]).join()
+    assert list(loader.modules) == [str(tmp_path / "App" / "main.py")]
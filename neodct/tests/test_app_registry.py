@@ -0,0 +1,99 @@
+"""AppRegistry's cached manifest index on a temporary apps directory."""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from System.core.AppRegistry import AppRegistry
+
+
+def write_manifest(app_dir, folder, text, mtime_ns):
+    path = app_dir / folder / "manifest.json"
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def touch_dir(app_dir, mtime_ns):
+    # mkdir/rmdir bump the directory mtime; pin it so a change is never lost to timestamp granularity.
+    os.utime(app_dir, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def app_dir(tmp_path):
+    apps = tmp_path / "apps"
+    apps.mkdir()
+    write_manifest(apps, "Snake", json.dumps({"name": "Snake", "id": 5}), 1_000)
+    write_manifest(apps, "Notes", json.dumps({"name": "Notes", "id": 3}), 1_000)
+    touch_dir(apps, 1_000)
+    return apps
+
+
+@pytest.fixture
+def registry(app_dir, tmp_path, monkeypatch):
+    registry = AppRegistry(str(app_dir), str(tmp_path / "index" / ".app_index.json"))
+    parse = registry._parse_manifest
+    registry.parsed = []
+
+    def counting_parse(folder, manifest_path):
+        registry.parsed.append(folder)
+        return parse(folder, manifest_path)
+
+    monkeypatch.setattr(registry, "_parse_manifest", counting_parse)
+    return registry
+
+
+def names(apps):
+    return [app["name"] for app in apps]
+
+
+def test_unchanged_apps_are_served_from_the_index(registry):
+    assert names(registry.load()) == ["Notes", "Snake"]
+    assert sorted(registry.parsed) == ["Notes", "Snake"]
+    registry.parsed.clear()
+    assert names(registry.load()) == ["Notes", "Snake"]
+    assert registry.parsed == []
+
+
+def test_edited_manifest_is_parsed_again(registry, app_dir):
+    registry.load()
+    registry.parsed.clear()
+    write_manifest(app_dir, "Snake", json.dumps({"name": "Snake II", "id": 1}), 2_000)
+    assert names(registry.load()) == ["Snake II", "Notes"]
+    assert registry.parsed == ["Snake"]
+
+
+def test_added_and_removed_apps_follow_the_directory_mtime(registry, app_dir):
+    registry.load()
+    write_manifest(app_dir, "Radio", json.dumps({"name": "Radio", "id": 4}), 1_000)
+    touch_dir(app_dir, 2_000)
+    assert names(registry.load()) == ["Notes", "Radio", "Snake"]
+
+    shutil.rmtree(app_dir / "Notes")
+    touch_dir(app_dir, 3_000)
+    assert names(registry.load()) == ["Radio", "Snake"]
+    assert names(registry.load()) == ["Radio", "Snake"]  # not resurrected from the index
+
+
+def test_broken_manifest_is_reported_until_fixed(registry, app_dir):
+    write_manifest(app_dir, "Broken", "{not json", 1_000)
+    touch_dir(app_dir, 2_000)
+    assert names(registry.load()) == ["Notes", "Snake"]
+    (error,) = registry.errors
+    assert "Broken/manifest.json" in error
+
+    registry.parsed.clear()
+    registry.load()
+    assert registry.errors == [error] and registry.parsed == []  # kept in the index, not re-parsed
+
+    write_manifest(app_dir, "Broken", json.dumps({"name": "Fixed", "id": 9}), 2_000)
+    assert names(registry.load()) == ["Notes", "Snake", "Fixed"]
+    assert registry.errors == []
+
+
+def test_index_for_another_app_dir_is_ignored(registry, app_dir, tmp_path):
+    registry.load()
+    other = AppRegistry(str(tmp_path / "elsewhere"), registry.index_path)
+    assert other.load() == []
@@ -0,0 +1,53 @@
+"""BootProfiler.track_imports: first-time imports are recorded, nested ones included."""
+
+import sys
+
+import pytest
+
+from System.core.BootProfiler import BootProfiler, lazy_import
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / "bootpkg"
+    (root / "sub").mkdir(parents=True)
+    (root / "__init__.py").write_text("")
+    (root / "screen.py").write_text("from . import helpers\nfrom .sub import deep\n")
+    (root / "helpers.py").write_text("def helper():\n    return 1\n")
+    (root / "sub" / "__init__.py").write_text("")
+    (root / "sub" / "deep.py").write_text("import json\nVALUE = 2\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "bootpkg"
+    for name in [m for m in sys.modules if m == "bootpkg" or m.startswith("bootpkg.")]:
+        del sys.modules[name]
+
+
+def test_submodules_of_loaded_packages_are_recorded(package):
+    import bootpkg  # noqa: F401  the top-level package is already loaded
+
+    profiler = BootProfiler()
+    with profiler.track_imports():
+        from bootpkg import screen  # noqa: F401
+        from bootpkg.helpers import helper  # noqa: F401  already loaded by screen: not recorded again
+        from os import path  # noqa: F401
+
+    # "from .sub import deep" loads both in one statement; it is timed once, as the package.
+    recorded = {name: depth for name, _, depth in profiler.imports}
+    assert recorded == {"bootpkg.screen": 0, "bootpkg.helpers": 1, "bootpkg.sub": 1}
+    assert "bootpkg.sub.deep" in sys.modules
+
+
+def test_attribute_imports_are_not_recorded(package):
+    import bootpkg.helpers  # noqa: F401
+
+    profiler = BootProfiler()
+    with profiler.track_imports():
+        from bootpkg.helpers import helper  # noqa: F401
+    assert profiler.imports == []
+
+
+def test_lazy_import_defers_execution(package):
+    module = lazy_import("bootpkg.helpers")
+    assert type(module).__name__ == "_LazyModule"
+    assert module.helper() == 1
+    assert type(module).__name__ == "module"
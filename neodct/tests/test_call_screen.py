@@ -0,0 +1,77 @@
+"""The in-call screen against a fake modem, fake sysfs backlight and the simulated clock."""
+
+import pytest
+
+from System.core.PowerManager import ACTIVE, PowerManager
+from System.ui.Dialer.call_screen import show_calling
+
+CONFIG = {"dim_after": 30, "blank_after": 60, "dim_percent": 20}
+
+
+class CallModem:
+    """A connected call that ends after `duration` seconds or on hangup(). on_poll(n) runs on the n-th state read."""
+
+    def __init__(self, clock, duration, on_poll=None):
+        self.clock = clock
+        self.ends = clock.time() + duration
+        self.on_poll = on_poll
+        self.polls = 0
+        self.hangups = 0
+
+    def subscribe(self, event, callback):
+        pass
+
+    def hangup(self):
+        self.hangups += 1
+        self.ends = self.clock.time()
+
+    @property
+    def state(self):
+        self.polls += 1
+        if self.on_poll:
+            self.on_poll(self.polls)
+        return "IDLE" if self.clock.time() >= self.ends else "CONNECTED"
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    device = tmp_path / "class" / "backlight" / "panel"
+    device.mkdir(parents=True)
+    (device / "max_brightness").write_text("100\n")
+    (device / "brightness").write_text("80\n")
+    return tmp_path
+
+
+def brightness(sysfs):
+    return int((sysfs / "class" / "backlight" / "panel" / "brightness").read_text())
+
+
+def start_call(ui, sysfs, modem):
+    ui.modem = modem
+    ui.power = PowerManager(ui, sysfs_root=str(sysfs), config=dict(CONFIG))
+    ui.power.start(ui.runtime, modem)
+
+
+def test_display_stays_on_for_the_whole_call(ui, clock, sysfs):
+    states = []
+    modem = CallModem(clock, 180, on_poll=lambda n: states.append(ui.power.state))
+    start_call(ui, sysfs, modem)
+    show_calling(ui, "+15550100", name="Ada")
+    assert set(states) == {ACTIVE} and brightness(sysfs) == 80
+    assert modem.hangups == 0
+    assert ui.fb.frames > 180 * 3  # kept redrawing for the whole call
+
+
+def test_key_that_wakes_the_display_does_not_end_the_call(ui, clock, sysfs):
+    def on_poll(n):
+        if n == 1:
+            ui.power.blank()  # e.g. blanked just before the call came up
+            ui.press(14)
+        elif n == 3:
+            ui.press(14)
+
+    modem = CallModem(clock, 600, on_poll=on_poll)
+    start_call(ui, sysfs, modem)
+    show_calling(ui, "+15550100", name="Ada")
+    assert modem.hangups == 1 and modem.polls >= 3
+    assert (ui.power.state, brightness(sysfs)) == (ACTIVE, 80)
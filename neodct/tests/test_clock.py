@@ -0,0 +1,90 @@
+"""Time-driven screens against SimulatedClock: they must finish in milliseconds of real time."""
+
+import time
+
+from System.core.Clock import SimulatedClock, SystemClock
+
+
+def test_simulated_wait_takes_queued_input_without_advancing():
+    clock = SimulatedClock(start=10)
+    assert clock.wait(lambda timeout: "key" if timeout == 0 else None, 5) == "key"
+    assert clock.time() == 10
+
+
+def test_simulated_wait_times_out_instantly():
+    clock = SimulatedClock(start=10)
+    started = time.monotonic()
+    assert clock.wait(lambda timeout: None, 60) is None
+    assert clock.time() == 70
+    assert time.monotonic() - started < 0.1
+
+
+def test_system_wait_blocks_in_poll():
+    seen = []
+    assert SystemClock().wait(lambda timeout: seen.append(timeout), 0.25) is None
+    assert seen == [0.25]
+
+
+def test_runtime_key_reads_advance_the_clock(ui, clock):
+    start = clock.time()
+    assert ui.read_keypress(2.0) is None
+    assert clock.time() == start + 2.0
+    ui.press(28)
+    assert ui.read_keypress(2.0) == 28
+    assert clock.time() == start + 2.0
+
+
+def test_snake_runs_into_the_wall_in_simulated_time(ui, clock):
+    from System.apps.Games.main import GRID_H, SnakeGame
+
+    game = SnakeGame(ui)
+    start, started = clock.time(), time.monotonic()
+    assert game.loop() == "dead"
+    # The head starts one row above the middle: GRID_H // 2 - 1 moves reach the top row, the next hits the wall.
+    ticks = GRID_H // 2
+    assert abs(clock.time() - start - ticks * game.tick_delay()) < 1e-6
+    assert time.monotonic() - started < 1.0
+
+
+def test_snake_turns_on_key(ui, clock):
+    from System.apps.Games.main import GRID_W, KEY_RIGHT, SnakeGame
+
+    game = SnakeGame(ui)
+    head_x, head_y = game.snake[0]
+    start = clock.time()
+    ui.press(KEY_RIGHT)
+    assert game.loop() == "dead"
+    assert game.snake[0] == (GRID_W - 1, head_y)
+    assert abs(clock.time() - start - (GRID_W - head_x) * game.tick_delay()) < 1e-6
+
+
+class FakeTrack:
+    """Stands in for the mpv process: finishes once `length` simulated seconds have passed."""
+
+    def __init__(self, clock, length):
+        self.clock = clock
+        self.ends = clock.time() + length
+
+    def poll(self):
+        return 0 if self.clock.time() >= self.ends else None
+
+
+def test_three_minute_track_progress_bar(ui, clock, monkeypatch):
+    from System.apps.MusicPlayer import main as music
+
+    player = music.MusicPlayer(ui)
+    monkeypatch.setattr(player, "get_metadata", lambda path: {
+        "title": "Sermon", "artist": "Machine Girl", "album": "", "length": 180, "art": None,
+    })
+    player.current_process = FakeTrack(clock, 180)
+    monkeypatch.setattr(player, "stop", lambda: setattr(player, "current_process", None))
+
+    start, started = clock.time(), time.monotonic()
+    player.run_now_playing("/dev/null")
+    assert clock.time() - start >= 180
+    assert time.monotonic() - started < 2.0
+    # Redrawn once a second; the last frame (at 179 s) shows the bar (x 20-220, y 190) nearly full.
+    assert ui.fb.frames >= 180
+    assert ui.fb.last.getpixel((215, 191)) == (255, 255, 255)
+    assert ui.fb.last.getpixel((220, 191)) == (51, 51, 51)
+
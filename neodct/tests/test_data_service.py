@@ -0,0 +1,180 @@
+"""DataService schema migrations, triggers and keyset paging on a temporary database directory."""
+
+import sqlite3
+
+import pytest
+
+from System.core import DataService as data_module
+from System.core.DataService import (
+    CALL_DIALED,
+    CALL_MISSED,
+    CALLS_DB,
+    INCOMING,
+    MESSAGES_DB,
+    MIGRATIONS,
+    OUTGOING,
+    PHONEBOOK_DB,
+    DataService,
+    _split_statements,
+)
+
+
+def user_version(service, name):
+    return service.query(name, "PRAGMA user_version")[0][0]
+
+
+def create_at_version(path, name, version):
+    """A database file migrated only up to `version`, as an older build left it."""
+    conn = sqlite3.connect(path)
+    for step in MIGRATIONS[name][:version]:
+        assert not callable(step), "seed only through SQL steps"
+        for statement in _split_statements(step):
+            conn.execute(statement)
+    conn.execute(f"PRAGMA user_version={version}")
+    conn.commit()
+    return conn
+
+
+@pytest.mark.parametrize("name", [PHONEBOOK_DB, MESSAGES_DB, CALLS_DB])
+def test_new_database_runs_every_migration(data, name):
+    assert user_version(data, name) == len(MIGRATIONS[name])
+
+
+def test_reopening_does_not_migrate_again(tmp_path, capsys):
+    DataService(str(tmp_path)).contact_count()
+    capsys.readouterr()
+    service = DataService(str(tmp_path))
+    assert service.contact_count() == 0
+    assert "Migrating" not in capsys.readouterr().out
+    service.close()
+
+
+def test_number_keys_filled_for_old_phonebook(tmp_path):
+    conn = create_at_version(str(tmp_path / "phonebook.db"), PHONEBOOK_DB, 1)
+    conn.execute("INSERT INTO contacts (name, number, speed_dial) VALUES ('Ada', '+44 20 7946 0018', 0)")
+    conn.commit()
+    conn.close()
+
+    service = DataService(str(tmp_path))
+    assert service.contact_by_number("+442079460018", "9460018").name == "Ada"
+    assert [c.name for c in service.search_contacts("Ad")] == ["Ada"]
+    service.close()
+
+
+def test_legacy_inbox_and_outbox_imported(tmp_path):
+    inbox = sqlite3.connect(str(tmp_path / "sms_inbox.db"))
+    inbox.execute("CREATE TABLE inbox (id INTEGER PRIMARY KEY, sender TEXT, message TEXT, timestamp INTEGER, is_read INTEGER)")
+    inbox.executemany("INSERT INTO inbox (sender, message, timestamp, is_read) VALUES (?, ?, ?, ?)",
+                      [("+15550100", "hi", 100, 0), ("+15550100", "again", 200, 1), ("+15550111", "yo", 150, 0)])
+    inbox.commit()
+    inbox.close()
+    outbox = sqlite3.connect(str(tmp_path / "sms_outbox.db"))
+    outbox.execute("CREATE TABLE outbox (id INTEGER PRIMARY KEY, message TEXT, timestamp INTEGER)")
+    outbox.execute("INSERT INTO outbox (message, timestamp) VALUES ('draft', 300)")
+    outbox.commit()
+    outbox.close()
+
+    service = DataService(str(tmp_path))
+    assert [m.message for m in service.inbox_page()] == ["again", "yo", "hi"]
+    assert [m.message for m in service.outbox_page()] == ["draft"]
+    summary = service.summary()
+    assert summary["unread"] == 2
+    threads = service.threads_page()
+    assert [(t.display_address, t.message_count, t.last_body) for t in threads] == [
+        ("+15550100", 2, "again"), ("+15550111", 1, "yo"),
+    ]
+    assert summary["thread_unread"] == {threads[0].id: 1, threads[1].id: 1}
+    service.close()
+
+
+def test_unread_counters_follow_writes(data):
+    first = data.save_incoming_message("+15550100", "one", timestamp=1)
+    data.save_incoming_message("+1 555 0100", "two", timestamp=2)
+    assert data.summary()["unread"] == 2
+    data.mark_message_read(first)
+    assert data.summary()["unread"] == 1
+    (thread,) = data.threads_page()
+    data.mark_thread_read(thread.id)
+    assert data.summary() == {"unread": 0, "missed_calls": 0, "thread_unread": {}}
+
+
+def test_saved_message_joins_the_recipient_thread(data):
+    data.save_incoming_message("+1 555 0100", "hi", timestamp=1)
+    data.save_outbox_message("hello back", timestamp=2, recipient="+15550100")
+    data.save_outbox_message("unaddressed", timestamp=3)
+    (thread,) = data.threads_page()
+    assert (thread.message_count, thread.last_body) == (2, "hello back")
+    assert [(m.direction, m.body) for m in data.thread_page(thread.id)] == [
+        (OUTGOING, "hello back"), (INCOMING, "hi"),
+    ]
+    assert [(m.message, m.recipient) for m in data.outbox_page()] == [
+        ("unaddressed", None), ("hello back", "+15550100"),
+    ]
+
+
+def test_import_keeps_name_only_cards(data):
+    data.add_contact("Alice", "+1 555 0100")
+    records = [
+        ("Alice again", "+1 (555) 0100"),
+        ("Bob", "555-0199"),
+        ("Carol", ""),
+        ("carol", None),
+        ("Bob", "5550199"),
+    ]
+    assert data.import_contacts(records, batch_size=2) == (2, 3)
+    assert sorted((c.name, c.number) for c in data.contacts()) == [
+        ("Alice", "+1 555 0100"), ("Bob", "555-0199"), ("Carol", ""),
+    ]
+    assert data.import_contacts([("Carol", "")]) == (0, 1)
+
+
+def test_message_pages_are_keyset_continuations(data):
+    data.add_messages([(INCOMING, "received", f"m{i}", "+15550100", i // 2, False) for i in range(45)])
+    seen, after = [], None
+    while True:
+        page = data.inbox_page(after, limit=20)
+        seen += [m.message for m in page]
+        if len(page) < 20:
+            break
+        after = page[-1]
+    assert seen == [f"m{i}" for i in reversed(range(45))]
+
+
+def test_call_log_is_a_ring(data):
+    limit = data_module.CALL_LOG_LIMIT
+    for i in range(limit + 5):
+        data.add_call(CALL_MISSED if i % 2 else CALL_DIALED, "+15550100", timestamp=i, duration=10)
+    calls = data.calls_page(limit=limit + 10)
+    assert len(calls) == limit
+    assert calls[-1].timestamp == 5
+    assert data.call_timers()[CALL_DIALED] == 10 * ((limit + 5 + 1) // 2)  # timers outlive the rows
+    assert data.summary()["missed_calls"] == sum(1 for c in calls if c.type == CALL_MISSED)
+    data.mark_missed_calls_seen()
+    assert data.summary()["missed_calls"] == 0
+
+
+def test_failed_migration_rolls_back(tmp_path, monkeypatch):
+    def broken(service, conn):
+        conn.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(MIGRATIONS, CALLS_DB, MIGRATIONS[CALLS_DB] + (broken,))
+    service = DataService(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        service.connection(CALLS_DB)
+    conn = sqlite3.connect(str(tmp_path / "calls.db"))
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS[CALLS_DB]) - 1
+    assert not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'half_done'").fetchall()
+    conn.close()
+
+
+@pytest.mark.parametrize("after", [None, (100, 7)])
+def test_message_pages_walk_the_direction_index(data, after):
+    sql = "SELECT id, body FROM messages WHERE direction = ? ORDER BY timestamp DESC, id DESC LIMIT ?"
+    params = (INCOMING, 20)
+    if after:
+        sql = sql.replace("ORDER", "AND (timestamp, id) < (?, ?) ORDER")
+        params = (INCOMING,) + after + (20,)
+    plan = " ".join(row[-1] for row in data.query(MESSAGES_DB, "EXPLAIN QUERY PLAN " + sql, params))
+    assert "messages_direction_timestamp" in plan
+    assert "TEMP B-TREE" not in plan
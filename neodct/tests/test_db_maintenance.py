@@ -0,0 +1,77 @@
+"""DbMaintenance on a temporary database directory, without external power checks (no sysfs)."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from System.core import DbMaintenance as maintenance_module
+from System.core.DataService import MIGRATIONS, PHONEBOOK_DB, DataService
+from System.core.DbMaintenance import AUTO_VACUUM_INCREMENTAL, DEFAULT_CONFIG, DbMaintenance
+
+
+@pytest.fixture
+def legacy_data(tmp_path):
+    """A DataService whose phonebook predates auto_vacuum=INCREMENTAL."""
+    db_dir = tmp_path / "db"
+    db_dir.mkdir()
+    conn = sqlite3.connect(db_dir / f"{PHONEBOOK_DB}.db")
+    conn.execute("CREATE TABLE legacy (x)")
+    conn.close()
+    service = DataService(str(db_dir))
+    service.import_contacts([(f"Contact {i}", f"+1555{i:07d}") for i in range(500)])
+    yield service
+    service.close()
+
+
+def maintenance(data, tmp_path, **config):
+    return DbMaintenance(
+        data, sysfs_root=str(tmp_path / "sys"), config=dict(DEFAULT_CONFIG, **config),
+        state_path=str(tmp_path / "state.json"),
+    )
+
+
+def auto_vacuum(data):
+    # A fresh connection: an open one keeps reporting the mode it read at open.
+    conn = sqlite3.connect(data.path(PHONEBOOK_DB))
+    try:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_pass_does_not_wait_for_the_data_lock(data, tmp_path):
+    for name in MIGRATIONS:
+        data.connection(name)
+    maint = maintenance(data, tmp_path)
+    with data.lock:
+        thread = threading.Thread(target=maint.run)
+        thread.start()
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+    assert "complete" in maint.state["_run"]
+    assert maint.connections == {}
+
+
+def test_vacuum_out_of_budget_fails_the_pass_and_backs_off(legacy_data, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(maintenance_module, "PROGRESS_OPS", 1)
+    maint = maintenance(legacy_data, tmp_path, vacuum_budget=1e-9)
+    maint.run()
+    assert auto_vacuum(legacy_data) != AUTO_VACUUM_INCREMENTAL
+    assert "complete" not in maint.state["_run"] and "failed" in maint.state["_run"]
+    assert maint.state[PHONEBOOK_DB]["vacuum_failures"] == 1
+
+    # Backing off: neither a new pass nor another VACUUM attempt.
+    maint.service()
+    assert maint.thread is None
+    capsys.readouterr()
+    maint.vacuum(PHONEBOOK_DB)
+    assert "VACUUM" not in capsys.readouterr().out
+    assert maint.state[PHONEBOOK_DB]["vacuum_failures"] == 1
+
+    # Once the retry is due, a VACUUM with enough budget converts and clears the failures.
+    maint.config["vacuum_budget"] = 30.0
+    maint.state[PHONEBOOK_DB]["vacuum_failed"] = 0
+    maint.vacuum(PHONEBOOK_DB)
+    assert auto_vacuum(legacy_data) == AUTO_VACUUM_INCREMENTAL
+    assert "vacuum_failures" not in maint.state[PHONEBOOK_DB]
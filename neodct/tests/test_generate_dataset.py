@@ -0,0 +1,30 @@
+"""The seeded dataset generator is reproducible and never appends a second copy."""
+
+import pytest
+
+from System.core.DataService import MESSAGES_DB, DataService
+from System.tools.debug_generate_dataset import generate
+
+
+def snapshot(db_dir):
+    data = DataService(str(db_dir))
+    try:
+        return data.contact_count(), data.query(
+            MESSAGES_DB, "SELECT direction, sender, body, timestamp FROM messages ORDER BY id"
+        )
+    finally:
+        data.close()
+
+
+def test_rerun_refuses_to_append_and_truncate_reproduces(tmp_path):
+    db_dir = tmp_path / "db"
+    db_dir.mkdir()
+    generate(str(db_dir), "1k", seed=7)
+    first = snapshot(db_dir)
+
+    with pytest.raises(RuntimeError, match="--truncate"):
+        generate(str(db_dir), "1k", seed=7)
+    assert snapshot(db_dir) == first
+
+    generate(str(db_dir), "1k", seed=7, truncate=True)
+    assert snapshot(db_dir) == first
@@ -0,0 +1,96 @@
+"""MemoryMonitor pressure watcher against a fake /proc."""
+
+import select
+import types
+
+import pytest
+
+from System.core import MemoryMonitor as memory_module
+from System.core.AppLoader import AppLoader
+from System.core.MemoryMonitor import MemoryMonitor
+
+
+class ErrPoller:
+    """select.poll() stand-in whose trigger fd reports POLLERR."""
+
+    def register(self, fd, events):
+        pass
+
+    def poll(self, timeout):
+        return [(0, select.POLLERR)]
+
+
+@pytest.fixture
+def proc(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_module, "POLL_INTERVAL", 0.01)
+    (tmp_path / "meminfo").write_text("MemTotal: 1000000 kB\nMemAvailable: 20000 kB\n")
+    return tmp_path
+
+
+def test_without_psi_polls_meminfo(proc):
+    monitor = MemoryMonitor(proc_root=str(proc))
+    monitor.start()
+    try:
+        assert monitor.pressure.wait(2.0)
+    finally:
+        monitor.stop()
+
+
+def test_psi_pollerr_falls_back_to_meminfo(proc, monkeypatch):
+    (proc / "pressure").mkdir()
+    (proc / "pressure" / "memory").write_text("")
+    monkeypatch.setattr(memory_module.select, "poll", ErrPoller)
+    monitor = MemoryMonitor(proc_root=str(proc))
+    monitor.start()
+    try:
+        assert monitor.pressure.wait(2.0)
+        assert monitor.thread.is_alive()
+    finally:
+        monitor.stop()
+
+
+def test_service_sheds_in_priority_order(proc):
+    monitor = MemoryMonitor(proc_root=str(proc))
+    shrunk = []
+    monitor.register("late", lambda: 10, lambda: shrunk.append("late"), priority=90)
+    monitor.register("early", lambda: 10, lambda: shrunk.append("early"), priority=10)
+    assert monitor.service() == 0
+    monitor.pressure.set()
+    monitor.service()
+    assert shrunk == ["early"]  # one tier per pressure event
+    monitor.pressure.set()
+    monitor.service()
+    assert shrunk == ["early", "late"]  # sustained pressure escalates
+    monitor.pressure.set()
+    monitor.service()
+    assert shrunk == ["early", "late", "late"]
+
+
+def test_quiet_period_starts_over_at_the_cheapest_tier(proc):
+    monitor = MemoryMonitor(proc_root=str(proc))
+    shrunk = []
+    monitor.register("late", lambda: 10, lambda: shrunk.append("late"), priority=90)
+    monitor.register("early", lambda: 10, lambda: shrunk.append("early"), priority=10)
+    monitor.pressure.set()
+    monitor.service()
+    monitor.last_shed -= memory_module.ESCALATE_WITHIN + 1
+    monitor.pressure.set()
+    monitor.service()
+    assert shrunk == ["early", "early"]
+
+
+def test_page_cache_and_app_modules_report_sizes(data, tmp_path):
+    data.import_contacts([(f"Contact {i}", f"+1555{i:07d}") for i in range(2000)])
+    data.search_contacts("Contact 1")
+    loader = AppLoader(usage_path=str(tmp_path / "usage.json"))
+    module = types.ModuleType("app")
+    module.TABLE = list(range(1000))
+    loader.modules["/apps/App/main.py"] = (0, module)
+
+    monitor = MemoryMonitor()
+    monitor.register("sqlite page cache", data.page_cache_bytes, data.shrink, priority=25)
+    monitor.register("app modules", loader.resident_bytes, loader.evict, priority=30)
+    sizes = monitor.cache_sizes()
+    assert sizes["sqlite page cache"] > 0 and sizes["app modules"] > 8000
+    assert monitor.shed(priority=30) == sizes["app modules"]
+    assert loader.resident_bytes() == 0
@@ -0,0 +1,94 @@
+"""MessageIngest group commits against a DataService on a temporary directory."""
+
+import sqlite3
+
+from System.core import MessageIngest as ingest_module
+from System.core.DataService import MESSAGES_DB
+from System.core.MessageIngest import DEFAULT_CONFIG, MessageIngest
+
+WIDE_WINDOW = {"window_ms": 1000}
+
+
+def ingest(data, dispatch=None, **config):
+    return MessageIngest(data, dispatch=dispatch, config=dict(DEFAULT_CONFIG, **config))
+
+
+def committed_bodies(data):
+    # A separate connection sees only what was committed.
+    conn = sqlite3.connect(data.path(MESSAGES_DB))
+    try:
+        return [row[0] for row in conn.execute("SELECT body FROM messages ORDER BY timestamp")]
+    finally:
+        conn.close()
+
+
+def test_burst_lands_in_one_transaction(data):
+    writer = ingest(data, **WIDE_WINDOW)
+    for i in range(10):
+        writer.submit("+15550100", f"part {i}", timestamp=i)
+    writer.flush()
+    assert (writer.batches, writer.stored) == (1, 10)
+    assert committed_bodies(data) == [f"part {i}" for i in range(10)]
+
+
+def test_batches_close_at_max_batch(data):
+    writer = ingest(data, max_batch=4, **WIDE_WINDOW)
+    for i in range(10):
+        writer.submit("+15550100", f"part {i}", timestamp=i)
+    writer.flush()
+    assert (writer.batches, writer.stored) == (3, 10)
+
+
+def test_listeners_run_through_dispatch_after_commit(data):
+    pending = []
+    seen = []
+    data.subscribe(MESSAGES_DB, lambda event, row_id: seen.append((event, row_id, committed_bodies(data))))
+    stored = []
+    writer = ingest(data, dispatch=lambda callback, *args: pending.append((callback, args)))
+    writer.submit("+15550100", "hello", timestamp=1, on_stored=stored.append)
+    writer.flush()
+    assert seen == [] and stored == []  # nothing runs on the writer thread
+
+    for callback, args in pending:
+        callback(*args)
+    (message_id,) = stored
+    assert seen == [("insert", message_id, ["hello"])]
+
+
+def test_failed_commit_is_retried_without_losing_messages(data, monkeypatch):
+    monkeypatch.setattr(ingest_module, "RETRY_DELAY", 0.001)
+    add_messages = data.add_messages
+    calls = []
+
+    def flaky(rows, durable=False):
+        calls.append(len(rows))
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return add_messages(rows, durable=durable)
+
+    monkeypatch.setattr(data, "add_messages", flaky)
+    stored = []
+    writer = ingest(data, **WIDE_WINDOW)
+    for i in range(5):
+        writer.submit("+15550100", f"part {i}", timestamp=i, on_stored=stored.append)
+    writer.flush()
+    assert calls == [5, 5]
+    assert None not in stored and len(stored) == 5
+    assert committed_bodies(data) == [f"part {i}" for i in range(5)]
+
+
+def test_durable_mode_commits_with_synchronous_full(data, monkeypatch):
+    add_messages = data.add_messages
+    modes = []
+
+    def spy(rows, durable=False):
+        modes.append(durable)
+        return add_messages(rows, durable=durable)
+
+    monkeypatch.setattr(data, "add_messages", spy)
+    for durability in ("normal", "full"):
+        writer = ingest(data, durability=durability)
+        writer.submit("+15550100", durability, timestamp=1)
+        writer.flush()
+    assert modes == [False, True]
+    assert data.query(MESSAGES_DB, "PRAGMA synchronous")[0][0] == 1  # back to NORMAL
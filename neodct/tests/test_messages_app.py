@@ -0,0 +1,11 @@
+"""Messages app actions on the headless UI and a temporary DataService."""
+
+from System.apps.Messages.main import _save_outbox_message
+
+
+def test_saved_message_is_stamped_with_the_ui_clock(ui, clock, data):
+    ui.data = data
+    clock.advance(3600)
+    _save_outbox_message(ui, "on my way", "+15550100")
+    (message,) = data.outbox_page()
+    assert (message.message, message.recipient, message.timestamp) == ("on my way", "+15550100", 1_700_003_600)
@@ -0,0 +1,180 @@
+"""ModemService against debug_fake_modem's FakeModem on a pty, on one asyncio loop."""
+
+import asyncio
+import os
+import tty
+
+import pytest
+
+from System.core.DataService import CALL_DIALED, CALL_MISSED, CALL_RECEIVED
+from System.core.ModemService import ModemService
+from System.core.ModemService.pdu import decode_deliver, encode_deliver
+from System.tools.debug_fake_modem import FakeModem
+
+
+class Link:
+    """The fake modem on the master side of a pty, served from the test's event loop."""
+
+    def __init__(self, loop, data=None):
+        self.loop = loop
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.fake = FakeModem(self.master)
+        loop.add_reader(self.master, self._on_readable)
+        self.server = loop.create_task(self._serve())
+        config = {"port": os.ttyname(self.slave), "baud": 115200, "timeout": 1.0, "dial_timeout": 2.0,
+                  "signal_poll": 0}
+        self.modem = ModemService(data, config=config)
+
+    def _on_readable(self):
+        self.fake.feed(os.read(self.master, 1024))
+        self.fake.flush()
+
+    async def _serve(self):
+        while True:
+            self.fake.flush()
+            await asyncio.sleep(0.01)
+
+    def run_until(self, condition, timeout=3.0):
+        async def wait():
+            while not condition():
+                await asyncio.sleep(0.01)
+        self.loop.run_until_complete(asyncio.wait_for(wait(), timeout))
+
+    def run(self, seconds):
+        self.loop.run_until_complete(asyncio.sleep(seconds))
+
+    def close(self):
+        self.modem.close()
+        self.server.cancel()
+        self.loop.run_until_complete(asyncio.sleep(0))
+        self.loop.remove_reader(self.master)
+        os.close(self.master)
+        os.close(self.slave)
+
+
+@pytest.fixture
+def link(data):
+    loop = asyncio.new_event_loop()
+    link = Link(loop, data)
+    link.modem.start(loop)
+    link.run_until(lambda: link.modem.registration is not None)  # init sequence done
+    yield link
+    link.close()
+    loop.close()
+
+
+def collect_sms(modem, store=True):
+    received = []
+
+    def on_sms(sender, body, timestamp, on_stored):
+        received.append((sender, body, timestamp))
+        on_stored(len(received) if store else None)
+
+    modem.subscribe("sms", on_sms)
+    return received
+
+
+def test_init_reads_status(link):
+    assert link.modem.echo
+    assert link.fake.pdu_mode
+    assert link.modem.registration == 1
+    assert link.modem.signal_bars() == 4
+    link.fake.set_signal(8)
+    link.run_until(lambda: link.modem.signal == 8)
+    assert link.modem.signal_bars() == 1
+
+
+@pytest.mark.parametrize("body", ["OK", "ERROR", "RING me later", "NO CARRIER", "+CMTI: \"SM\",3",
+                                  "two\nlines", "Grüße ✓ ok"])
+def test_sms_body_is_never_taken_for_a_result_or_urc(link, body):
+    received = collect_sms(link.modem)
+    link.fake.receive_sms("+14155550123", body)
+    link.run_until(lambda: received and not link.fake.sms)
+    assert received[0][:2] == ("+14155550123", body)
+    assert link.modem.state == "IDLE"
+
+
+def test_sms_that_fails_to_store_stays_unread_on_the_sim(link):
+    received = collect_sms(link.modem, store=False)
+    link.fake.receive_sms("5551234", "keep me")
+    link.run_until(lambda: received)
+    link.run(0.1)
+    assert [stat for stat, *_ in link.fake.sms.values()] == ["REC UNREAD"]
+
+
+def test_unread_messages_are_fetched_at_startup(data):
+    loop = asyncio.new_event_loop()
+    link = Link(loop, data)
+    try:
+        # Stored while nobody was listening (phone off, or not stored last time).
+        link.fake.receive_sms("+4479", "first")
+        link.fake.receive_sms("+4479", "second")
+        link.fake.outbox.clear()
+        received = collect_sms(link.modem)
+        link.modem.start(loop)
+        link.run_until(lambda: len(received) == 2 and not link.fake.sms)
+        assert [body for _, body, _ in received] == ["first", "second"]
+    finally:
+        link.close()
+        loop.close()
+
+
+def test_pipelined_queries_fall_back_one_by_one(link):
+    async def queries():
+        return await asyncio.gather(link.modem.query("AT+CSQ"), link.modem.query("AT+FOO?"),
+                                    link.modem.query("AT+CREG?"), return_exceptions=True)
+
+    csq, foo, creg = link.loop.run_until_complete(queries())
+    assert csq == ["+CSQ: 20,99"]
+    assert repr(foo) == "ModemError('ERROR')"
+    assert creg == ["+CREG: 1,1"]
+
+
+def test_late_response_after_timeout_is_dropped(link):
+    link.modem.config["timeout"] = 0.2
+    link.fake.delay = 0.4
+    with pytest.raises(Exception, match="AT\\+CSQ"):
+        link.loop.run_until_complete(link.modem.command("AT+CSQ"))
+    link.modem.config["timeout"] = 1.0
+    link.fake.delay = 0
+    assert link.loop.run_until_complete(link.modem.command("AT+CREG?")) == ["+CREG: 1,1"]
+
+
+def test_calls_are_logged(link, data):
+    link.fake.ring("+14155550123")
+    link.run_until(lambda: link.modem.state == "RINGING")
+    link.fake.remote_hangup()
+    link.run_until(lambda: link.modem.state == "IDLE")
+
+    link.fake.ring("5551234")
+    link.run_until(lambda: link.modem.state == "RINGING")
+    link.modem.answer()
+    link.run_until(lambda: link.modem.state == "CONNECTED")
+    link.fake.remote_hangup()
+    link.run_until(lambda: link.modem.state == "IDLE")
+
+    link.modem.dial("+442075550142")
+    link.run_until(lambda: link.fake.call is not None)
+    link.fake.remote_answer()
+    link.run_until(lambda: link.modem.state == "CONNECTED")
+    link.modem.hangup()
+
+    calls = data.calls_page()
+    assert [(call.type, call.number) for call in calls] == [
+        (CALL_DIALED, "+442075550142"), (CALL_RECEIVED, "5551234"), (CALL_MISSED, "+14155550123"),
+    ]
+    assert data.summary()["missed_calls"] == 1
+
+
+@pytest.mark.parametrize("sender, text", [
+    ("+14155550123", "How are you?"), ("5551234", "{curly} [square] €5"), ("MyBank", "Code 1234"),
+    ("+4479", "Ünïcødé ✓"), ("+1", "x" * 160),
+])
+def test_pdu_round_trip(sender, text):
+    assert decode_deliver(encode_deliver(sender, text, 1729339200, zone=-5)) == (sender, text, 1729339200)
+
+
+def test_pdu_decodes_a_real_message():
+    pdu = "07911326040000F0040B911346610089F60000208062917314080CC8F71D14969741F977FD07"
+    assert decode_deliver(pdu) == ("+31641600986", "How are you?", 1030390661)
@@ -0,0 +1,90 @@
+"""Number normalization and caller-ID resolution on a temporary phonebook."""
+
+import pytest
+
+from System.core.DataService import DataService
+from System.core.PhoneNumbers import NumberResolver, normalize, suffix
+
+
+@pytest.mark.parametrize("raw, key", [
+    ("+1 555-123-4567", "+15551234567"),
+    ("(555) 123 4567", "+15551234567"),
+    ("0015551234567", "+15551234567"),
+    ("15551234567", "+15551234567"),
+    ("555-1234", "5551234"),
+    ("", ""),
+    ("ABC", ""),
+])
+def test_normalize(raw, key):
+    assert normalize(raw) == key
+
+
+def test_suffix():
+    assert suffix("+1 212-555-0142") == "5550142"
+    assert suffix("0142") == "0142"
+
+
+def name(resolver, number):
+    contact = resolver.resolve(number)
+    return contact.name if contact else None
+
+
+def test_exact_key_matches_any_format(data):
+    data.add_contact("Ada", "+1 212-555-0142")
+    resolver = NumberResolver(data)
+    assert name(resolver, "(212) 555 0142") == "Ada"
+    assert name(resolver, "0012125550142") == "Ada"
+
+
+def test_full_numbers_never_meet_on_the_suffix(data):
+    data.add_contact("San Francisco", "+1 415-555-0142")
+    resolver = NumberResolver(data)
+    assert name(resolver, "+12125550142") is None
+    assert name(resolver, "2125550142") is None  # a complete national number is full too
+
+
+def test_local_numbers_meet_full_ones_on_the_suffix(data):
+    data.add_contact("Local", "555-0142")
+    data.add_contact("Full", "+44 20 7946 0018")
+    resolver = NumberResolver(data)
+    assert name(resolver, "+12125550142") == "Local"
+    assert name(resolver, "9460018") == "Full"
+
+
+def test_ambiguous_suffix_matches_nobody(data):
+    data.add_contact("New York", "+1 212-555-0142")
+    data.add_contact("San Francisco", "+1 415-555-0142")
+    resolver = NumberResolver(data)
+    assert name(resolver, "555-0142") is None
+    assert name(resolver, "+1 415 555 0142") == "San Francisco"
+
+
+def test_cache_follows_phonebook_edits(data):
+    resolver = NumberResolver(data)
+    assert name(resolver, "+12125550142") is None
+    contact_id = data.add_contact("Ada", "+1 212-555-0142")
+    assert name(resolver, "+12125550142") == "Ada"
+    data.delete_contact(contact_id)
+    assert name(resolver, "+12125550142") is None
+
+
+def test_resolving_a_list_reuses_the_data_version(data, monkeypatch):
+    data.add_contact("Ada", "+1 212-555-0142")
+    resolver = NumberResolver(data)
+    resolver.resolve("+12125550142")
+    versions = []
+    query = data.query
+    monkeypatch.setattr(data, "query", lambda name, sql, *args: versions.append(sql) or query(name, sql, *args))
+    for _ in range(20):
+        assert name(resolver, "+12125550142") == "Ada"
+    assert versions == []
+
+
+def test_other_process_writes_are_seen_after_the_recheck(data):
+    resolver = NumberResolver(data)
+    resolver.recheck = 0
+    assert name(resolver, "+12125550142") is None
+    other = DataService(data.db_dir)
+    other.add_contact("Ada", "+1 212-555-0142")
+    other.close()
+    assert name(resolver, "+12125550142") == "Ada"
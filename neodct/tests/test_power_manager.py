@@ -0,0 +1,102 @@
+"""PowerManager against a fake sysfs backlight and the simulated clock."""
+
+import asyncio
+
+import pytest
+
+from System.core import PowerManager as power_module
+from System.core.PowerManager import ACTIVE, BLANKED, DIMMED, PowerManager
+
+CONFIG = {"dim_after": 30, "blank_after": 60, "dim_percent": 20}
+
+
+class FakeModem:
+    def __init__(self):
+        self.state = "IDLE"
+        self.listeners = {}
+
+    def subscribe(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def notify(self, event, *args):
+        for callback in self.listeners.get(event, ()):
+            callback(*args)
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    device = tmp_path / "class" / "backlight" / "panel"
+    device.mkdir(parents=True)
+    (device / "max_brightness").write_text("100\n")
+    (device / "brightness").write_text("80\n")
+    return tmp_path
+
+
+def brightness(sysfs):
+    return int((sysfs / "class" / "backlight" / "panel" / "brightness").read_text())
+
+
+@pytest.fixture
+def power(ui, sysfs):
+    return PowerManager(ui, sysfs_root=str(sysfs), config=dict(CONFIG))
+
+
+def test_steps_down_and_wakes_on_key(power, clock, sysfs):
+    clock.advance(29)
+    power.tick()
+    assert power.state == ACTIVE
+    clock.advance(2)
+    power.tick()
+    assert (power.state, brightness(sysfs)) == (DIMMED, 16)
+    clock.advance(30)
+    power.tick()
+    assert (power.state, brightness(sysfs)) == (BLANKED, 0)
+    assert power.on_key() is True  # the waking key is swallowed
+    assert (power.state, brightness(sysfs)) == (ACTIVE, 80)
+    assert power.on_key() is False
+
+
+def test_incoming_call_and_sms_wake_the_display(power, ui, clock, sysfs):
+    modem = FakeModem()
+    power.start(ui.runtime, modem)
+    for event, args in (("ring", ("+15550100",)), ("sms", ("+15550100", "hi", 0, lambda message_id: None))):
+        clock.advance(61)
+        power.tick()
+        assert power.blanked
+        modem.notify(event, *args)
+        assert (power.state, brightness(sysfs)) == (ACTIVE, 80)
+
+
+def test_stays_on_while_the_modem_is_busy(power, ui, clock, sysfs):
+    modem = FakeModem()
+    power.start(ui.runtime, modem)
+    modem.state = "CONNECTED"
+    clock.advance(120)
+    power.tick()
+    assert (power.state, brightness(sysfs)) == (ACTIVE, 80)
+    modem.state = "IDLE"
+    clock.advance(61)
+    power.tick()
+    assert power.blanked
+
+
+def test_timer_ticks_without_key_reads(power, ui, clock, monkeypatch):
+    monkeypatch.setattr(power_module, "TICK_INTERVAL", 0.01)
+    power.start(ui.runtime)
+    clock.advance(61)
+    ui.runtime.loop.run_until_complete(asyncio.sleep(0.05))
+    assert power.blanked
+
+
+def test_wait_blanked_returns_on_wake(power, clock):
+    clock.advance(61)
+    power.tick()
+    serviced = []
+
+    def read_key(timeout):
+        if len(serviced) == 3:
+            power.wake()  # e.g. a "ring" handled while the runtime loop ran
+        return None
+
+    power.wait_blanked(read_key, lambda: serviced.append(1))
+    assert len(serviced) == 4 and power.state == ACTIVE
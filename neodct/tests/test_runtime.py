@@ -0,0 +1,22 @@
+"""UIRuntime key handling over a pipe standing in for the keypad."""
+
+import os
+import struct
+
+
+def test_flush_drops_queued_and_buffered_keys(ui):
+    reads = []
+
+    def read_event():
+        data = os.read(ui.keypad_fd, 24)
+        reads.append(data)
+        _, _, etype, code, value = struct.unpack("llHHI", data)
+        return code if etype == 1 and value == 1 else None
+
+    ui.runtime.read_event = read_event
+    ui.press(5)
+    for code, value in ((28, 1), (28, 0), (14, 1)):
+        os.write(ui.keypad_w, struct.pack("llHHI", 0, 0, 1, code, value))
+    ui.runtime.flush()
+    assert len(reads) == 3
+    assert ui.read_keypress(0) is None
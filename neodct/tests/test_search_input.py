@@ -0,0 +1,25 @@
+"""The shared as-you-type SearchInput widget on the headless UI."""
+
+from System.ui.framework import SearchInput
+
+NAMES = ["Ada", "Adam", "Adele", "Bob", "Adrian", "Addy"]
+KEY_A, KEY_D, DOWN, ENTER, BACKSPACE = 30, 32, 108, 28, 14
+
+
+def test_results_refine_per_keystroke_and_enter_picks_the_row(ui):
+    queries = []
+
+    def search(text, limit):
+        queries.append(text)
+        return [name for name in NAMES if name.lower().startswith(text.lower())][:limit]
+
+    widget = SearchInput(ui, "Search", "Name:", search, str.upper, header_root="1-1")
+    ui.press(KEY_A, KEY_D, DOWN, DOWN, ENTER)
+    assert widget.show() == ("Adele", 2)
+    assert queries == ["a", "ad"]  # one query per typed key, none for an empty box
+
+    # Reopening keeps the text and selection; backing out of an empty box returns None.
+    ui.press(ENTER)
+    assert widget.show() == ("Adele", 2)
+    ui.press(BACKSPACE, BACKSPACE, BACKSPACE)
+    assert widget.show() is None
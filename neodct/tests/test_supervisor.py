@@ -0,0 +1,98 @@
+"""Supervisor crash accounting, backoff and screen restore, with the fork/wait replaced by a script."""
+
+import pytest
+
+from System.core import Supervisor as supervisor_module
+from System.core.Supervisor import (
+    Supervisor,
+    backoff_delay,
+    load_last_screen,
+    next_restore,
+    recent_crashes,
+    save_last_screen,
+)
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedSupervisor(Supervisor):
+    """Each "child" is a (screen it saves or None, seconds it runs, exit code) step."""
+
+    def __init__(self, steps, clock, **kwargs):
+        super().__init__(lambda restore: None, **kwargs)
+        self.steps = list(steps)
+        self.clock = clock
+        self.restores = []
+
+    def _spawn(self, restore):
+        self.restores.append(restore)
+        return len(self.restores)
+
+    def _wait(self, pid):
+        screen, runtime, code = self.steps.pop(0)
+        if screen is not None:
+            save_last_screen(screen, self.state_path)
+        self.clock.now += runtime
+        return code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(supervisor_module, "time", fake)
+    return fake
+
+
+def test_backoff_doubles_and_is_capped():
+    assert [backoff_delay(n) for n in range(1, 9)] == [0.1, 0.2, 0.4, 0.8, 1.6, 3.2, 5.0, 5.0]
+    assert backoff_delay(3, base=1.0, maximum=3.0) == 3.0
+
+
+def test_crash_window_forgets_old_crashes():
+    assert recent_crashes([10.0, 50.0, 69.0], 70.0, window=60.0) == [50.0, 69.0, 70.0]
+    assert recent_crashes([], 5.0) == [5.0]
+
+
+def test_restore_skips_the_screen_that_just_crashed():
+    assert next_restore({"app": "Messages"}, None) == {"app": "Messages"}
+    assert next_restore({"app": "Messages"}, {"app": "Messages"}) is None
+    assert next_restore({"app": "Messages"}, {"app": "Snake"}) == {"app": "Messages"}
+    assert next_restore(None, {"app": "Snake"}) is None
+
+
+def test_reopens_last_screen_once_then_gives_up_on_it(clock, tmp_path):
+    state = str(tmp_path / "last_screen.json")
+    screen = {"app": "Messages"}
+    supervisor = ScriptedSupervisor(
+        [(screen, 5, 1), (screen, 5, 1), (None, 5, 0)], clock, state_path=state,
+    )
+    assert supervisor.serve() == 0
+    assert supervisor.restores == [None, screen, None]
+    assert load_last_screen(state) is None  # cleared after the restored screen crashed
+    assert clock.sleeps == [0.1, 0.2]
+
+
+def test_gives_up_after_too_many_crashes_in_the_window(clock, tmp_path):
+    steps = [(None, 1, 3)] * 5
+    supervisor = ScriptedSupervisor(steps, clock, max_crashes=5, state_path=str(tmp_path / "s.json"))
+    assert supervisor.serve() == 3
+    assert clock.sleeps == [0.1, 0.2, 0.4, 0.8]
+
+
+def test_crashes_spread_out_never_give_up(clock, tmp_path):
+    steps = [(None, 120, -11)] * 8 + [(None, 1, 0)]
+    supervisor = ScriptedSupervisor(steps, clock, max_crashes=3, state_path=str(tmp_path / "s.json"))
+    assert supervisor.serve() == 0
+    assert supervisor.total_crashes == 8
+    assert clock.sleeps == [0.1] * 8  # each crash is alone in its window
@@ -0,0 +1,53 @@
+"""T9Index ranking and change tracking on a temporary phonebook."""
+
+from System.apps.PhoneBook.shared import t9 as t9_module
+from System.apps.PhoneBook.shared.t9 import T9Index
+from System.core.DataService import DataService
+
+
+def names(contacts):
+    return [c.name for c in contacts]
+
+
+def test_exact_and_shorter_keys_rank_first(data):
+    for name, number in (("Joanne", "555-0101"), ("John", "555-0102"), ("Jon", "555-0103"), ("Kim", "56")):
+        data.add_contact(name, number)
+    index = T9Index(data)
+    # Lexicographic key order would be Joanne (562663), John (5646), Jon (566).
+    assert names(index.lookup("56", limit=4)) == ["Kim", "Jon", "John", "Joanne"]
+    assert names(index.lookup("5646")) == ["John"]
+    assert names(index.lookup("5550103")) == ["Jon"]
+
+
+def test_follows_edits_made_through_the_service(data):
+    index = T9Index(data)
+    assert index.lookup("5646") == []
+    contact_id = data.add_contact("John", "555-0102")
+    assert names(index.lookup("5646")) == ["John"]
+    data.update_contact(contact_id, "Jane", "555-0102")
+    assert names(index.lookup("526")) == ["Jane"]
+    assert index.lookup("5646") == []
+    data.delete_contact(contact_id)
+    assert index.lookup("526") == []
+
+
+def test_keystrokes_reuse_the_data_version(data, monkeypatch):
+    data.add_contact("John", "555-0102")
+    index = T9Index(data)
+    index.lookup("5")
+    versions = []
+    query = data.query
+    monkeypatch.setattr(data, "query", lambda name, sql, *args: versions.append(sql) or query(name, sql, *args))
+    for digits in ("56", "564", "5646"):
+        index.lookup(digits)
+    assert "PRAGMA data_version" not in versions
+
+
+def test_other_process_writes_rebuild_the_index(data, tmp_path, monkeypatch):
+    monkeypatch.setattr(t9_module, "VERSION_RECHECK", 0)
+    index = T9Index(data)
+    assert index.lookup("5646") == []
+    other = DataService(data.db_dir)
+    other.add_contact("John", "555-0102")
+    other.close()
+    assert names(index.lookup("5646")) == ["John"]
@@ -0,0 +1,89 @@
+"""Streaming vCard reader and writer, and a round trip through the phonebook."""
+
+import io
+
+from System.apps.PhoneBook.shared import vcard
+from System.apps.PhoneBook.shared.vcard import VCard, iter_vcards, write_vcards
+
+
+def cards(text):
+    return list(iter_vcards(io.StringIO(text)))
+
+
+def test_quoted_printable_soft_line_breaks():
+    text = (
+        "BEGIN:VCARD\r\nVERSION:2.1\r\n"
+        "FN;CHARSET=UTF-8;ENCODING=QUOTED-PRINTABLE:J=C3=BCrgen M=C3=BC=\r\n"
+        "ller\r\n"
+        "TEL;CELL:+49 30 1234567\r\n"
+        "END:VCARD\r\n"
+    )
+    assert cards(text) == [VCard("Jürgen Müller", "+49 30 1234567")]
+
+
+def test_folded_lines_and_escapes():
+    text = (
+        "BEGIN:VCARD\nVERSION:3.0\n"
+        "FN:Smith\\, John the Thi\n"
+        " rd\n"
+        "TEL;TYPE=HOME:555 0100\n"
+        "END:VCARD\n"
+    )
+    assert cards(text) == [VCard("Smith, John the Third", "555 0100")]
+
+
+def test_bare_21_types_pick_pref_then_cell():
+    text = (
+        "BEGIN:VCARD\nVERSION:2.1\nFN:Ada\n"
+        "TEL;HOME:111\nTEL;CELL:222\nTEL;WORK;PREF:333\n"
+        "END:VCARD\n"
+        "BEGIN:VCARD\nVERSION:2.1\nFN:Bob\n"
+        "TEL;HOME:111\nitem1.TEL;CELL:222\n"
+        "END:VCARD\n"
+    )
+    assert cards(text) == [VCard("Ada", "333"), VCard("Bob", "222")]
+
+
+def test_name_falls_back_to_n_then_number():
+    text = (
+        "BEGIN:VCARD\nVERSION:3.0\nN:Lovelace;Ada;King;;\nTEL:111\nEND:VCARD\n"
+        "BEGIN:VCARD\nVERSION:3.0\nTEL:222\nEND:VCARD\n"
+    )
+    assert cards(text) == [VCard("Ada King Lovelace", "111"), VCard("222", "222")]
+
+
+def test_name_only_and_empty_cards():
+    text = (
+        "BEGIN:VCARD\nVERSION:3.0\nFN:Carol\nEND:VCARD\n"
+        "BEGIN:VCARD\nVERSION:3.0\nNOTE:nothing to keep\nEND:VCARD\n"
+    )
+    assert cards(text) == [VCard("Carol", "")]
+
+
+def test_long_lines_are_folded_on_export():
+    out = io.StringIO()
+    name = "A" * 100
+    write_vcards(out, [VCard(name, "+15550100")])
+    lines = out.getvalue().split("\r\n")
+    assert max(len(line) for line in lines) <= vcard.FOLD_WIDTH
+    assert cards(out.getvalue()) == [VCard(name, "+15550100")]
+
+
+def test_export_then_reimport_round_trips(data):
+    originals = [
+        ("Ada; Countess", "+44 20 7946 0018"),
+        ("Smith, John", "555-0100"),
+        ("Émile \\ Zola", "+33 1 23 45 67 89"),
+        ("Carol", ""),
+    ]
+    for name, number in originals:
+        data.add_contact(name, number)
+    out = io.StringIO()
+    assert write_vcards(out, data.contacts()) == len(originals)
+
+    assert sorted(cards(out.getvalue())) == sorted(VCard(name, number) for name, number in originals)
+    for contact in data.contacts():
+        data.delete_contact(contact.id)
+    assert data.import_contacts(iter_vcards(io.StringIO(out.getvalue()))) == (len(originals), 0)
+    assert sorted((c.name, c.number) for c in data.contacts()) == sorted(originals)
+    assert data.import_contacts(iter_vcards(io.StringIO(out.getvalue()))) == (0, len(originals))